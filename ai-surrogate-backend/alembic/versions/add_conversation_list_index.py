@@ -0,0 +1,33 @@
+"""Add covering (user_id, updated_at DESC) index to conversations
+
+Revision ID: add_conversation_list_index
+Revises: add_message_composite_indexes
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_conversation_list_index'
+down_revision = 'add_message_composite_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The conversation list pages by (updated_at, id) newest first;
+    # title/created_at ride along in the index leaf pages
+    op.create_index(
+        'ix_conversations_user_id_updated_at', 'conversations',
+        ['user_id', sa.text('updated_at DESC'), sa.text('id DESC')],
+        postgresql_include=['title', 'created_at']
+    )
+
+    # Prefix of the new index
+    op.execute("DROP INDEX IF EXISTS ix_conversations_user_id")
+
+
+def downgrade():
+    op.create_index('ix_conversations_user_id', 'conversations', ['user_id'])
+    op.drop_index('ix_conversations_user_id_updated_at', 'conversations')
@@ -0,0 +1,66 @@
+"""Add message counters and last_message_at to conversations
+
+Revision ID: add_conversation_message_counters
+Revises: add_conversation_list_index
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_conversation_message_counters'
+down_revision = 'add_conversation_list_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Maintained by the chat write path from now on
+    op.add_column(
+        'conversations',
+        sa.Column('message_count', sa.Integer(), nullable=False, server_default='0')
+    )
+    op.add_column(
+        'conversations',
+        sa.Column('user_message_count', sa.Integer(), nullable=False, server_default='0')
+    )
+    op.add_column('conversations', sa.Column('last_message_at', sa.DateTime(), nullable=True))
+
+    # One-off backfill from existing messages
+    op.execute("""
+        UPDATE conversations c
+        SET message_count = m.message_count,
+            user_message_count = m.user_message_count,
+            last_message_at = m.last_message_at
+        FROM (
+            SELECT conversation_id,
+                   COUNT(*) AS message_count,
+                   COUNT(*) FILTER (WHERE is_from_user) AS user_message_count,
+                   MAX(created_at) AS last_message_at
+            FROM messages
+            GROUP BY conversation_id
+        ) m
+        WHERE m.conversation_id = c.id
+    """)
+
+    # The conversation list reads the new columns too; include them so its
+    # conversations side can be served from the index alone
+    op.drop_index('ix_conversations_user_id_updated_at', 'conversations')
+    op.create_index(
+        'ix_conversations_user_id_updated_at', 'conversations',
+        ['user_id', sa.text('updated_at DESC'), sa.text('id DESC')],
+        postgresql_include=['title', 'created_at', 'message_count', 'last_message_at']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_conversations_user_id_updated_at', 'conversations')
+    op.create_index(
+        'ix_conversations_user_id_updated_at', 'conversations',
+        ['user_id', sa.text('updated_at DESC'), sa.text('id DESC')],
+        postgresql_include=['title', 'created_at']
+    )
+    op.drop_column('conversations', 'last_message_at')
+    op.drop_column('conversations', 'user_message_count')
+    op.drop_column('conversations', 'message_count')
@@ -0,0 +1,25 @@
+"""Add rolling summary to conversations
+
+Revision ID: add_conversation_summary
+Revises: add_message_token_count
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_conversation_summary'
+down_revision = 'add_message_token_count'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('conversations', sa.Column('summary', sa.Text, nullable=True))
+    op.add_column('conversations', sa.Column('summarized_until', sa.DateTime, nullable=True))
+
+
+def downgrade():
+    op.drop_column('conversations', 'summarized_until')
+    op.drop_column('conversations', 'summary')
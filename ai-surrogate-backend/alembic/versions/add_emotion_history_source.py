@@ -0,0 +1,40 @@
+"""Add source and unique message_id to emotion_history
+
+Revision ID: add_emotion_history_source
+Revises: add_conversation_summary
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_emotion_history_source'
+down_revision = 'add_conversation_summary'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Where the emotion came from: the model's EMOTION tag or the batch classifier
+    op.add_column(
+        'emotion_history',
+        sa.Column('source', sa.String(20), nullable=False, server_default='llm')
+    )
+
+    # One emotion per message, so the backfill can upsert on message_id.
+    # Keep the newest row for any message that was recorded twice.
+    op.execute("""
+        DELETE FROM emotion_history a
+        USING emotion_history b
+        WHERE a.message_id = b.message_id
+          AND (a.detected_at, a.id::text) < (b.detected_at, b.id::text)
+    """)
+    op.create_index(
+        'ix_emotion_history_message_id', 'emotion_history', ['message_id'], unique=True
+    )
+
+
+def downgrade():
+    op.drop_index('ix_emotion_history_message_id', 'emotion_history')
+    op.drop_column('emotion_history', 'source')
@@ -0,0 +1,51 @@
+"""Add llm_usage table and make emotion_history text copies nullable
+
+Revision ID: add_llm_usage
+Revises: add_emotion_history_source
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers, used by Alembic.
+revision = 'add_llm_usage'
+down_revision = 'add_emotion_history_source'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'llm_usage',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('conversation_id', UUID(as_uuid=True), sa.ForeignKey('conversations.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('message_id', UUID(as_uuid=True), sa.ForeignKey('messages.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('model', sa.String(100), nullable=True),
+        sa.Column('tier', sa.String(20), nullable=True),
+        sa.Column('cache', sa.String(10), nullable=True),
+        sa.Column('prompt_tokens', sa.Integer(), nullable=True),
+        sa.Column('completion_tokens', sa.Integer(), nullable=True),
+        sa.Column('ttft_ms', sa.Integer(), nullable=True),
+        sa.Column('total_ms', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_llm_usage_user_id', 'llm_usage', ['user_id'])
+    op.create_index('ix_llm_usage_created_at', 'llm_usage', ['created_at'])
+
+    # New emotion rows no longer copy the message text (it lives in messages)
+    op.alter_column('emotion_history', 'user_message', nullable=True)
+    op.alter_column('emotion_history', 'ai_response', nullable=True)
+
+
+def downgrade():
+    op.execute("UPDATE emotion_history SET user_message = '' WHERE user_message IS NULL")
+    op.execute("UPDATE emotion_history SET ai_response = '' WHERE ai_response IS NULL")
+    op.alter_column('emotion_history', 'ai_response', nullable=False)
+    op.alter_column('emotion_history', 'user_message', nullable=False)
+
+    op.drop_index('ix_llm_usage_created_at', 'llm_usage')
+    op.drop_index('ix_llm_usage_user_id', 'llm_usage')
+    op.drop_table('llm_usage')
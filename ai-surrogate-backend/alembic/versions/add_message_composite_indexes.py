@@ -0,0 +1,38 @@
+"""Add composite (conversation, time) and (user, time) indexes to messages
+
+Revision ID: add_message_composite_indexes
+Revises: add_llm_usage
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_message_composite_indexes'
+down_revision = 'add_llm_usage'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serves "messages of a conversation in time order" and keyset paging on
+    # (created_at, id) straight from the index, in either direction
+    op.create_index(
+        'ix_messages_conversation_id_created_at', 'messages',
+        ['conversation_id', 'created_at', 'id']
+    )
+    op.create_index(
+        'ix_messages_user_id_created_at', 'messages',
+        ['user_id', 'created_at']
+    )
+
+    # The single-column indexes are prefixes of the composites now
+    op.execute("DROP INDEX IF EXISTS ix_messages_conversation_id")
+    op.execute("DROP INDEX IF EXISTS ix_messages_user_id")
+
+
+def downgrade():
+    op.create_index('ix_messages_user_id', 'messages', ['user_id'])
+    op.create_index('ix_messages_conversation_id', 'messages', ['conversation_id'])
+    op.drop_index('ix_messages_user_id_created_at', 'messages')
+    op.drop_index('ix_messages_conversation_id_created_at', 'messages')
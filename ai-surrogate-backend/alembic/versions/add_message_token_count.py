@@ -0,0 +1,25 @@
+"""Add token_count to messages
+
+Revision ID: add_message_token_count
+Revises: add_emotion_history
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_message_token_count'
+down_revision = 'add_emotion_history'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Cached per-message token count, filled at insert time.
+    # Existing rows stay NULL and are estimated from length when selected.
+    op.add_column('messages', sa.Column('token_count', sa.Integer, nullable=True))
+
+
+def downgrade():
+    op.drop_column('messages', 'token_count')
@@ -44,9 +44,84 @@ class Settings:
     MISTRAL_API_KEY: str = os.getenv("MISTRAL_API_KEY", "")
     MISTRAL_CHAT_MODEL: str = os.getenv("MISTRAL_CHAT_MODEL", "mistral-large-2512")
     MISTRAL_TITLE_MODEL: str = os.getenv("MISTRAL_TITLE_MODEL", "mistral-small-latest")
+    # Point at a Mistral-compatible server (e.g. the local fake: python -m app.services.fake_llm)
+    MISTRAL_SERVER_URL: str = os.getenv("MISTRAL_SERVER_URL", "")
+    # "mistral" or "fake" (in-process stand-in, no network)
+    LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "mistral").lower()
+    # Chat turns are routed between these by complexity (see model_router)
+    MISTRAL_SMALL_MODEL: str = os.getenv("MISTRAL_SMALL_MODEL", "mistral-small-latest")
+    MISTRAL_LARGE_MODEL: str = os.getenv("MISTRAL_LARGE_MODEL", "mistral-large-latest")
+    MODEL_ROUTING_ENABLED: bool = os.getenv("MODEL_ROUTING_ENABLED", "true").lower() == "true"
+    ROUTER_SMALL_MAX_CHARS: int = int(os.getenv("ROUTER_SMALL_MAX_CHARS", "160"))
     AI_TEMPERATURE: float = float(os.getenv("AI_TEMPERATURE", "0.7"))
     MAX_RESPONSE_TOKENS: int = int(os.getenv("MAX_RESPONSE_TOKENS", "1000"))
     MAX_CONTEXT_MESSAGES: int = int(os.getenv("MAX_CONTEXT_MESSAGES", "10"))
+    # History is selected by token budget (Mistral tokenizer), scanning at most N recent messages
+    MAX_CONTEXT_TOKENS: int = int(os.getenv("MAX_CONTEXT_TOKENS", "3000"))
+    MAX_CONTEXT_SCAN_MESSAGES: int = int(os.getenv("MAX_CONTEXT_SCAN_MESSAGES", "50"))
+    
+    # Rolling conversation summaries (refreshed in the background every N turns)
+    SUMMARY_ENABLED: bool = os.getenv("SUMMARY_ENABLED", "true").lower() == "true"
+    SUMMARY_EVERY_N_TURNS: int = int(os.getenv("SUMMARY_EVERY_N_TURNS", "5"))
+    SUMMARY_KEEP_RECENT_MESSAGES: int = int(os.getenv("SUMMARY_KEEP_RECENT_MESSAGES", "6"))
+    SUMMARY_MAX_WORDS: int = int(os.getenv("SUMMARY_MAX_WORDS", "200"))
+    
+    # Per-conversation history cache (in-process, plus Redis when REDIS_URL is set)
+    HISTORY_CACHE_ENABLED: bool = os.getenv("HISTORY_CACHE_ENABLED", "true").lower() == "true"
+    HISTORY_CACHE_MAX_CONVERSATIONS: int = int(os.getenv("HISTORY_CACHE_MAX_CONVERSATIONS", "1000"))
+    HISTORY_CACHE_TTL_SECONDS: float = float(os.getenv("HISTORY_CACHE_TTL_SECONDS", "3600"))
+    REDIS_URL: str = os.getenv("REDIS_URL", "")
+    
+    # Semantic response cache for context-free turns (opt-in)
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+    RESPONSE_CACHE_TTL_SECONDS: float = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+    RESPONSE_CACHE_SIMILARITY: float = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.92"))
+    # Longest small-talk message whose reply may be cached (replies are shared across users)
+    RESPONSE_CACHE_MAX_CHARS: int = int(os.getenv("RESPONSE_CACHE_MAX_CHARS", "40"))
+    
+    # Shared LLM client (connection pool + timeouts)
+    LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", "200"))
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "50"))
+    LLM_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", "60"))
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "25"))
+    LLM_INTENT_TIMEOUT_SECONDS: float = float(os.getenv("LLM_INTENT_TIMEOUT_SECONDS", "5"))
+    LLM_TITLE_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TITLE_TIMEOUT_SECONDS", "10"))
+    
+    # LLM resilience: per-attempt timeout, fallback chain, circuit breaker, hedging
+    LLM_ATTEMPT_TIMEOUT_SECONDS: float = float(os.getenv("LLM_ATTEMPT_TIMEOUT_SECONDS", "12"))
+    # Comma-separated, tried in order; "groq:<model>" entries use Groq
+    LLM_FALLBACK_MODELS: str = os.getenv("LLM_FALLBACK_MODELS", "mistral-small-latest")
+    LLM_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+    LLM_BREAKER_RESET_SECONDS: float = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+    LLM_HEDGE_ENABLED: bool = os.getenv("LLM_HEDGE_ENABLED", "true").lower() == "true"
+    LLM_HEDGE_PERCENTILE: float = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+    LLM_HEDGE_MIN_SAMPLES: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+    GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
+    
+    # LLM scheduler: global concurrency cap + per-user token buckets
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+    LLM_USER_RATE_PER_MINUTE: float = float(os.getenv("LLM_USER_RATE_PER_MINUTE", "20"))
+    LLM_USER_BURST: int = int(os.getenv("LLM_USER_BURST", "5"))
+    LLM_SCHEDULER_MAX_WAIT_SECONDS: float = float(os.getenv("LLM_SCHEDULER_MAX_WAIT_SECONDS", "10"))
+    
+    # Fake LLM provider (LLM_PROVIDER=fake or the fake_llm HTTP server)
+    FAKE_LLM_TTFT_MS: float = float(os.getenv("FAKE_LLM_TTFT_MS", "400"))
+    FAKE_LLM_TOKENS_PER_SEC: float = float(os.getenv("FAKE_LLM_TOKENS_PER_SEC", "40"))
+    FAKE_LLM_ERROR_RATE: float = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+    FAKE_LLM_SCRIPT_PATH: str = os.getenv("FAKE_LLM_SCRIPT_PATH", "")
+    
+    # Pre-LLM pipeline (intent, search and history run concurrently)
+    PIPELINE_DEADLINE_SECONDS: float = float(os.getenv("PIPELINE_DEADLINE_SECONDS", "4"))
+    # Local embedding intent classifier; the LLM is asked only below the confidence floor
+    INTENT_CLASSIFIER_ENABLED: bool = os.getenv("INTENT_CLASSIFIER_ENABLED", "true").lower() == "true"
+    INTENT_CLASSIFIER_MIN_CONFIDENCE: float = float(os.getenv("INTENT_CLASSIFIER_MIN_CONFIDENCE", "0.6"))
+    SPECULATIVE_SEARCH_MIN_CONFIDENCE: float = float(os.getenv("SPECULATIVE_SEARCH_MIN_CONFIDENCE", "0.6"))
+    
+    # Write-behind buffer for telemetry rows (emotion history, LLM usage)
+    WRITE_BEHIND_FLUSH_ROWS: int = int(os.getenv("WRITE_BEHIND_FLUSH_ROWS", "100"))
+    WRITE_BEHIND_FLUSH_INTERVAL_MS: float = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL_MS", "500"))
+    WRITE_BEHIND_MAX_ROWS: int = int(os.getenv("WRITE_BEHIND_MAX_ROWS", "10000"))
     
     # Voice Processing (Google Cloud)
     GOOGLE_APPLICATION_CREDENTIALS: Optional[str] = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", None)
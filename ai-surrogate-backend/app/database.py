@@ -1,17 +1,29 @@
 """
 Database configuration and session management.
 
-This module sets up the SQLAlchemy engine, session factory, and base class
+This module sets up the SQLAlchemy engines, session factories, and base class
 for all database models.
+
+Async routes use the asyncpg engine (AsyncSessionLocal / get_async_db) so a
+query never blocks the event loop. The sync psycopg2 engine remains for sync
+routes, background threads, scripts and Alembic.
+
+Both pools are monitored (app/pool_monitor.py): checkout wait and hold
+times are reported by /metrics.
 """
 
 import os
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from dotenv import load_dotenv
 
+from app.pool_monitor import PoolMonitor
+
 # Load environment variables
 load_dotenv()
 
@@ -21,14 +33,20 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
+# Pool statistics for /metrics
+sync_pool_monitor = PoolMonitor("sync")
+async_pool_monitor = PoolMonitor("async")
+
 # Create SQLAlchemy engine with connection pooling
 engine = create_engine(
     DATABASE_URL,
+    poolclass=sync_pool_monitor.pool_class(QueuePool),
     pool_size=5,
     max_overflow=10,
     pool_pre_ping=True,  # Verify connections before using
     echo=False,  # Set to True for SQL query logging during development
 )
+sync_pool_monitor.attach(engine)
 
 # Create SessionLocal class for database sessions
 SessionLocal = sessionmaker(
@@ -37,6 +55,43 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+
+def to_async_url(url: str) -> str:
+    """
+    Convert a sync PostgreSQL URL to its asyncpg equivalent.
+    
+    asyncpg does not understand libpq's ``sslmode`` parameter, so it is
+    passed on as ``ssl``.
+    """
+    parsed = make_url(url)
+    if not parsed.drivername.startswith("postgresql"):
+        return url
+    query = dict(parsed.query)
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return parsed.set(drivername="postgresql+asyncpg", query=query).render_as_string(hide_password=False)
+
+
+# Async engine for async routes (same pool sizing as the sync engine)
+async_engine = create_async_engine(
+    to_async_url(DATABASE_URL),
+    poolclass=async_pool_monitor.pool_class(AsyncAdaptedQueuePool),
+    pool_size=5,
+    max_overflow=10,
+    pool_pre_ping=True,
+    echo=False,
+)
+async_pool_monitor.attach(async_engine.sync_engine)
+
+# expire_on_commit=False: objects stay readable after commit without a
+# lazy refresh, which an AsyncSession cannot do implicitly
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -64,6 +119,25 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function that yields async database sessions.
+    
+    Use in ``async def`` routes so database round trips await instead of
+    blocking the event loop.
+    
+    Yields:
+        AsyncSession: SQLAlchemy async database session
+        
+    Example:
+        @app.get("/moods")
+        async def get_moods(db: AsyncSession = Depends(get_async_db)):
+            return (await db.scalars(select(MoodEntry))).all()
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db() -> None:
     """
     Initialize database by creating all tables.
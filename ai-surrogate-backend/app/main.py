@@ -4,6 +4,7 @@ Main FastAPI application.
 This is the entry point for the AI Surrogate backend API.
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 from datetime import datetime
 
@@ -11,7 +12,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from app.database import init_db
+from app.database import async_engine, async_pool_monitor, init_db, sync_pool_monitor
 from app.config import settings
 from app.routes import auth_router, chat_router
 from app.routes.preferences import router as preferences_router
@@ -20,6 +21,20 @@ from app.routes.mood import router as mood_router
 from app.routes.insights import router as insights_router
 from app.routes.voice import router as voice_router
 from app.routes.tools import router as tools_router
+from app.services.history_cache import close_history_cache, get_history_cache
+from app.services.intent_classifier import get_intent_classifier
+from app.services.llm_client import close_llm_client, get_llm_client
+from app.services.llm_scheduler import get_llm_scheduler
+from app.services.model_router import get_model_router
+from app.services.response_cache import get_response_cache
+from app.services.single_flight import get_single_flight_stats
+from app.services.write_behind import close_write_behind, get_write_behind
+
+
+def _report_background_failure(task: asyncio.Task) -> None:
+    """Done-callback for startup background tasks: surface their errors."""
+    if not task.cancelled() and task.exception() is not None:
+        print(f"⚠️ Background task {task.get_name()} failed: {task.exception()}")
 
 
 @asynccontextmanager
@@ -33,10 +48,30 @@ async def lifespan(app: FastAPI):
     init_db()
     print("✅ Database initialized successfully!")
     
+    # Embed intent seed examples in the background so the first chat doesn't pay for it
+    app.state.intent_fit_task = None
+    if settings.INTENT_CLASSIFIER_ENABLED and get_intent_classifier().available:
+        app.state.intent_fit_task = asyncio.create_task(
+            asyncio.to_thread(get_intent_classifier().fit), name="intent-classifier-fit"
+        )
+        app.state.intent_fit_task.add_done_callback(_report_background_failure)
+    
     yield
     
     # Shutdown
     print("👋 Shutting down AI Surrogate API...")
+    if app.state.intent_fit_task is not None and not app.state.intent_fit_task.done():
+        # Stops waiting for it; the worker thread finishes the embedding batch on its own
+        app.state.intent_fit_task.cancel()
+        try:
+            await app.state.intent_fit_task
+        except asyncio.CancelledError:
+            pass
+    await close_llm_client()
+    # Flush queued telemetry rows before the engine goes away
+    await close_write_behind()
+    await close_history_cache()
+    await async_engine.dispose()
 
 
 # Create FastAPI application
@@ -144,6 +179,32 @@ def health_check():
     }
 
 
+@app.get(
+    "/metrics",
+    tags=["Health"],
+    summary="Service metrics",
+    description="In-process performance counters (caches, queues, pools)"
+)
+def service_metrics():
+    """
+    Performance counters for this worker process.
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "response_cache": get_response_cache().stats(),
+        "history_cache": get_history_cache().stats(),
+        "single_flight": get_single_flight_stats(),
+        "model_router": get_model_router().stats(),
+        "llm": get_llm_client().stats(),
+        "llm_scheduler": get_llm_scheduler().stats(),
+        "write_behind": get_write_behind().stats(),
+        "db_pool": {
+            "sync": sync_pool_monitor.stats(),
+            "async": async_pool_monitor.stats(),
+        },
+    }
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """
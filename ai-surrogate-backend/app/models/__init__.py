@@ -7,6 +7,7 @@ from app.models.conversation import Conversation
 from app.models.message import Message
 from app.models.emotion_history import EmotionHistory
 from app.models.mood_entry import MoodEntry
+from app.models.llm_usage import LLMUsage
 
-__all__ = ["User", "Conversation", "Message", "EmotionHistory", "MoodEntry"]
+__all__ = ["User", "Conversation", "Message", "EmotionHistory", "MoodEntry", "LLMUsage"]
 
@@ -4,7 +4,7 @@ Conversation model for grouping related messages.
 
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Index, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -19,6 +19,11 @@ class Conversation(Base):
         id: Unique identifier (UUID)
         user_id: Foreign key to User
         title: Optional conversation title
+        summary: Rolling summary of messages up to summarized_until
+        summarized_until: created_at of the last message folded into summary
+        message_count: Number of messages (maintained by the chat write path)
+        user_message_count: Number of messages sent by the user
+        last_message_at: created_at of the most recent message
         created_at: Timestamp of conversation creation
         updated_at: Timestamp of last update
         
@@ -39,8 +44,7 @@ class Conversation(Base):
     user_id = Column(
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
+        nullable=False
     )
     
     title = Column(
@@ -48,6 +52,36 @@ class Conversation(Base):
         nullable=True
     )
     
+    summary = Column(
+        Text,
+        nullable=True
+    )
+    
+    summarized_until = Column(
+        DateTime,
+        nullable=True
+    )
+    
+    # Denormalized counters, updated in the same transaction as each message insert
+    message_count = Column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False
+    )
+    
+    user_message_count = Column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False
+    )
+    
+    last_message_at = Column(
+        DateTime,
+        nullable=True
+    )
+    
     created_at = Column(
         DateTime,
         default=datetime.utcnow,
@@ -76,3 +110,16 @@ class Conversation(Base):
     
     def __repr__(self) -> str:
         return f"<Conversation(id={self.id}, user_id={self.user_id}, title={self.title})>"
+
+
+# Conversation list: a user's conversations, most recently active first.
+# Includes every conversations column the list reads, so PostgreSQL can page
+# it with an index-only scan where the visibility map allows. The last-message
+# preview is a separate lookup per row on ix_messages_conversation_id_created_at.
+Index(
+    "ix_conversations_user_id_updated_at",
+    Conversation.user_id,
+    Conversation.updated_at.desc(),
+    Conversation.id.desc(),
+    postgresql_include=["title", "created_at", "message_count", "last_message_at"]
+)
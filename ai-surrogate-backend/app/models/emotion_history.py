@@ -21,16 +21,18 @@ class EmotionHistory(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id"), nullable=False)
-    message_id = Column(UUID(as_uuid=True), ForeignKey("messages.id"), nullable=False)
+    message_id = Column(UUID(as_uuid=True), ForeignKey("messages.id"), nullable=False, unique=True, index=True)
     
     # Detected emotion
     emotion = Column(String(50), nullable=False)  # happy, sad, angry, etc.
     confidence = Column(Float, default=0.8)  # How confident we are
     intensity = Column(Float, default=0.5)  # How intense the emotion is
+    source = Column(String(20), nullable=False, default="llm")  # llm (EMOTION tag) or local (batch classifier)
     
-    # Context
-    user_message = Column(String, nullable=False)
-    ai_response = Column(String, nullable=False)
+    # Context (legacy copies; new rows leave these NULL, the text lives in
+    # messages and message_id points at the AI reply)
+    user_message = Column(String, nullable=True)
+    ai_response = Column(String, nullable=True)
     
     # Metadata
     detected_at = Column(DateTime, default=datetime.utcnow)
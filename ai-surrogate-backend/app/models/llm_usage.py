@@ -0,0 +1,41 @@
+"""
+LLM Usage Model
+
+One row per generated chat turn: which model served it and what it cost.
+Written through the write-behind buffer, so rows land a moment after the turn.
+"""
+
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+
+from app.database import Base
+
+
+class LLMUsage(Base):
+    """Token usage and latency of one LLM generation."""
+
+    __tablename__ = "llm_usage"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id", ondelete="SET NULL"), nullable=True)
+    message_id = Column(UUID(as_uuid=True), ForeignKey("messages.id", ondelete="SET NULL"), nullable=True)
+
+    # Generation
+    model = Column(String(100), nullable=True)  # Model that actually served the turn
+    tier = Column(String(20), nullable=True)  # small / large (model router)
+    cache = Column(String(10), nullable=True)  # hit / miss, NULL when not cacheable
+    prompt_tokens = Column(Integer, nullable=True)
+    completion_tokens = Column(Integer, nullable=True)
+
+    # Latency
+    ttft_ms = Column(Integer, nullable=True)
+    total_ms = Column(Integer, nullable=True)
+
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<LLMUsage {self.model} ({self.prompt_tokens}+{self.completion_tokens} tokens)>"
@@ -4,7 +4,7 @@ Message model for storing chat messages.
 
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Text, Boolean, DateTime, ForeignKey, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -21,6 +21,7 @@ class Message(Base):
         conversation_id: Foreign key to Conversation
         content: The message text content
         is_from_user: True if message is from user, False if from AI
+        token_count: Mistral token count of content (set at insert time)
         created_at: Timestamp of message creation
         
     Relationships:
@@ -29,6 +30,11 @@ class Message(Base):
     """
     
     __tablename__ = "messages"
+    __table_args__ = (
+        # Conversation history in time order; id breaks created_at ties for keyset paging
+        Index("ix_messages_conversation_id_created_at", "conversation_id", "created_at", "id"),
+        Index("ix_messages_user_id_created_at", "user_id", "created_at"),
+    )
     
     id = Column(
         UUID(as_uuid=True),
@@ -40,15 +46,13 @@ class Message(Base):
     user_id = Column(
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
+        nullable=False
     )
     
     conversation_id = Column(
         UUID(as_uuid=True),
         ForeignKey("conversations.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
+        nullable=False
     )
     
     content = Column(
@@ -61,6 +65,11 @@ class Message(Base):
         nullable=False
     )
     
+    token_count = Column(
+        Integer,
+        nullable=True  # NULL for rows created before token counting
+    )
+    
     created_at = Column(
         DateTime,
         default=datetime.utcnow,
@@ -0,0 +1,121 @@
+"""
+Connection Pool Monitor
+
+Makes database pool pressure visible on /metrics:
+
+- checkout wait: time spent waiting for the pool to hand out a connection
+  (grows once every pooled connection is busy)
+- hold time: how long a connection stays checked out before it is returned
+- in use / peak in use, and checkout timeouts
+
+Wait time is measured by a pool subclass (there is no "checkout requested"
+pool event); hold time comes from the checkout/checkin pool events.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Type
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool
+
+_CHECKED_OUT_AT = "checked_out_at"
+
+
+class _Samples:
+    """Rolling window of recent durations (seconds)."""
+
+    def __init__(self, size: int = 500):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def summary_ms(self) -> Dict[str, Optional[float]]:
+        if not self._samples:
+            return {"avg_ms": None, "p95_ms": None, "max_ms": None}
+        ordered = sorted(self._samples)
+        p95 = ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+        return {
+            "avg_ms": round(sum(ordered) / len(ordered) * 1000, 1),
+            "p95_ms": round(p95 * 1000, 1),
+            "max_ms": round(ordered[-1] * 1000, 1),
+        }
+
+
+class PoolMonitor:
+    """
+    Checkout wait and hold-time statistics for one engine's pool.
+    """
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: Pool name shown in metrics
+        """
+        self.name = name
+        self._engine = None
+        self._wait = _Samples()
+        self._hold = _Samples()
+        self._lock = threading.Lock()
+        self._stats = {"checkouts": 0, "timeouts": 0, "in_use": 0, "peak_in_use": 0}
+
+    def pool_class(self, base: Type[Pool]) -> Type[Pool]:
+        """
+        Subclass ``base`` so every checkout records its wait time here.
+
+        Pass the result as ``poolclass`` to create_engine/create_async_engine.
+        """
+        monitor = self
+
+        class MonitoredPool(base):
+            def _do_get(self):
+                started_at = time.perf_counter()
+                try:
+                    connection = super()._do_get()
+                except PoolTimeoutError:
+                    monitor._record_timeout()
+                    raise
+                monitor._wait.record(time.perf_counter() - started_at)
+                return connection
+
+        MonitoredPool.__name__ = f"Monitored{base.__name__}"
+        return MonitoredPool
+
+    def attach(self, engine) -> None:
+        """Listen for checkouts and checkins on ``engine``'s pool (sync Engine)."""
+        self._engine = engine
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    def _record_timeout(self) -> None:
+        with self._lock:
+            self._stats["timeouts"] += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        connection_record.info[_CHECKED_OUT_AT] = time.perf_counter()
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["in_use"] += 1
+            self._stats["peak_in_use"] = max(self._stats["peak_in_use"], self._stats["in_use"])
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        checked_out_at = connection_record.info.pop(_CHECKED_OUT_AT, None)
+        if checked_out_at is None:
+            return
+        self._hold.record(time.perf_counter() - checked_out_at)
+        with self._lock:
+            self._stats["in_use"] -= 1
+
+    def stats(self) -> Dict:
+        """Pool sizing, counters and recent wait/hold times."""
+        pool = self._engine.pool if self._engine is not None else None
+        return {
+            **self._stats,
+            "size": pool.size() if pool is not None and hasattr(pool, "size") else None,
+            "overflow": pool.overflow() if pool is not None and hasattr(pool, "overflow") else None,
+            "wait": self._wait.summary_ms(),
+            "hold": self._hold.summary_ms(),
+        }
@@ -7,29 +7,32 @@ Endpoints:
 - GET /api/chat/conversations/{conversation_id}/messages - Get messages in a conversation
 """
 
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 import json
 import asyncio
+import time
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.models import User, Conversation, Message as DBMessage
-from app.schemas import MessageCreate, MessageResponse, ConversationResponse
+from app.database import AsyncSessionLocal, get_async_db
+from app.models import User
+from app.schemas import MessageCreate, MessageResponse, ConversationListItem
 from app.services.auth_service import get_current_user
 from app.services.chat_service import (
+    begin_chat_turn,
     create_message,
+    finish_chat_turn,
     get_user_conversations,
     get_conversation_messages,
     generate_ai_response_with_context
 )
 from app.services.ai_service import stream_ai_response
-from app.services.chat_service import create_conversation
-from app.services.emotion_service import extract_emotion_from_response
+from app.services.emotion_service import EmotionTagStripper
 from app.services.conversation_naming_service import trigger_conversation_naming
+from app.services.summary_service import trigger_summary_refresh
 
 router = APIRouter(prefix="/api/chat", tags=["Chat"])
 
@@ -44,7 +47,7 @@ router = APIRouter(prefix="/api/chat", tags=["Chat"])
 async def send_message(
     message_data: MessageCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Send a message and receive an AI response.
@@ -59,7 +62,7 @@ async def send_message(
     """
     try:
         # Save user message
-        user_message = create_message(
+        user_message = await create_message(
             db=db,
             user=current_user,
             content=message_data.content,
@@ -75,7 +78,7 @@ async def send_message(
         )
         
         # Save AI response
-        ai_message = create_message(
+        ai_message = await create_message(
             db=db,
             user=current_user,
             content=ai_response_text,
@@ -99,35 +102,46 @@ async def send_message(
 
 @router.get(
     "/conversations",
-    response_model=List[ConversationResponse],
+    response_model=List[ConversationListItem],
     summary="Get all conversations",
-    description="Get all conversations for the current user"
+    description="Get all conversations for the current user, each with its latest message"
 )
-def get_conversations(
+async def get_conversations(
     skip: int = 0,
     limit: int = 50,
+    before: Optional[UUID] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all conversations for the authenticated user.
     
-    - **skip**: Number of records to skip (for pagination)
+    - **skip**: Number of records to skip (for pagination without a cursor)
     - **limit**: Maximum number of records to return (max 100)
+    - **before**: Conversation ID cursor - pass the last conversation's ID of
+      the current page to get the next page
     
-    Returns conversations ordered by most recently updated.
+    Returns conversations ordered by most recently updated, each with a
+    preview of its last message, its message count and last activity time.
     
     Requires authentication.
     """
     if limit > 100:
         limit = 100
     
-    conversations = get_user_conversations(
-        db=db,
-        user=current_user,
-        skip=skip,
-        limit=limit
-    )
+    try:
+        conversations = await get_user_conversations(
+            db=db,
+            user=current_user,
+            skip=skip,
+            limit=limit,
+            before=before
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
     
     return conversations
 
@@ -138,34 +152,47 @@ def get_conversations(
     summary="Get conversation messages",
     description="Get all messages in a specific conversation"
 )
-def get_messages(
+async def get_messages(
     conversation_id: UUID,
     skip: int = 0,
     limit: int = 100,
+    before: Optional[UUID] = None,
+    after: Optional[UUID] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all messages in a conversation.
     
     - **conversation_id**: UUID of the conversation
-    - **skip**: Number of records to skip (for pagination)
+    - **skip**: Number of records to skip (for pagination without a cursor)
     - **limit**: Maximum number of records to return (max 200)
+    - **before**: Message ID cursor - return the page of messages older than it
+    - **after**: Message ID cursor - return the page of messages newer than it
     
-    Returns messages ordered chronologically (oldest first).
+    Returns messages ordered chronologically (oldest first). To scroll back,
+    pass the first message's ID of the current page as `before`.
     
     Requires authentication and conversation ownership.
     """
     if limit > 200:
         limit = 200
     
+    if before is not None and after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either 'before' or 'after', not both"
+        )
+    
     try:
-        messages = get_conversation_messages(
+        messages = await get_conversation_messages(
             db=db,
             conversation_id=conversation_id,
             user=current_user,
             skip=skip,
-            limit=limit
+            limit=limit,
+            before=before,
+            after=after
         )
         
         return messages
@@ -184,13 +211,19 @@ def get_messages(
 )
 async def stream_message(
     message_data: MessageCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Stream AI response in real-time for typewriter effect.
     
-    Returns Server-Sent Events (SSE) stream with response chunks.
+    Returns Server-Sent Events (SSE) stream with response chunks,
+    then an `emotion` event (emotion, confidence, intensity) and `complete`.
+    The EMOTION tag the model appends is never sent as a chunk.
+    
+    No session is held for the whole stream: the save, history-load and
+    final write phases each use a short-lived session, so a pooled
+    connection is only checked out while a query runs, never while waiting
+    on the LLM.
     """
     
     async def generate_stream():
@@ -198,36 +231,22 @@ async def stream_message(
             print(f"🎬 STREAM STARTED for user: {current_user.username}")
             print(f"📝 Message content: {message_data.content}")
             
-            # Create or get conversation
-            conversation_id = message_data.conversation_id
-            
-            if not conversation_id:
-                # Create new conversation
-                print("📁 Creating new conversation...")
-                conversation = create_conversation(
-                    db=db,
-                    user=current_user,
-                    title="New Conversation"
-                )
-                conversation_id = str(conversation.id)
-                print(f"✅ Created conversation: {conversation_id}")
-            else:
-                # Ensure conversation_id is a string
-                conversation_id = str(conversation_id)
-                print(f"📂 Using existing conversation: {conversation_id}")
-            
-            # Save user message
+            # Write 1: conversation (new or ownership-checked) + user message, one commit
             print("💾 Saving user message...")
-            user_msg = DBMessage(
-                content=message_data.content,
-                conversation_id=conversation_id,
-                user_id=current_user.id,
-                is_from_user=True
-            )
-            db.add(user_msg)
-            db.commit()
-            db.refresh(user_msg)
-            print(f"✅ User message saved: {user_msg.id}")
+            try:
+                async with AsyncSessionLocal() as db:
+                    user_msg, needs_title = await begin_chat_turn(
+                        db=db,
+                        user=current_user,
+                        content=message_data.content,
+                        conversation_id=message_data.conversation_id
+                    )
+            except ValueError as e:
+                error_data = json.dumps({'type': 'error', 'message': str(e)})
+                yield f"data: {error_data}\n\n"
+                return
+            conversation_id = str(user_msg.conversation_id)
+            print(f"✅ User message saved: {user_msg.id} (conversation {conversation_id})")
             
             # Send conversation ID first
             conv_data = json.dumps({'type': 'conversation_id', 'conversation_id': conversation_id})
@@ -246,26 +265,46 @@ async def stream_message(
             print("📤 Sent 'Thinking...' indicator")
             
             # Stream response chunks as they arrive
+            llm_metrics = {}
+            emotion_stripper = EmotionTagStripper()
+            stream_started_at = time.perf_counter()
+            first_chunk_at = None
             try:
                 print("🔄 Starting to stream response chunks...")
-                buffer = ""  # Buffer for collecting full response
                 
-                async for chunk in stream_ai_response(
-                    user_message=message_data.content,
-                    user_id=str(current_user.id),
-                    conversation_id=conversation_id,
-                    db=db
-                ):
-                    buffer += chunk
-                    full_response += chunk
-                    
-                    # Send chunks immediately as they arrive (skip "Thinking" from orchestrator)
-                    if chunk.strip() and chunk.strip() != "Thinking":
-                        chunk_data = json.dumps({'type': 'chunk', 'content': chunk})
-                        yield f"data: {chunk_data}\n\n"
-                        chunk_count += 1
-                        if chunk_count <= 5 or chunk_count % 10 == 0:  # Log first 5 and every 10th chunk
-                            print(f"📦 Sent chunk {chunk_count}: '{chunk[:50]}...'")
+                # The orchestrator ends this session's read transaction once
+                # history is loaded, before the LLM call starts
+                async with AsyncSessionLocal() as read_db:
+                    async for chunk in stream_ai_response(
+                        user_message=message_data.content,
+                        user_id=str(current_user.id),
+                        conversation_id=conversation_id,
+                        db=read_db,
+                        metrics=llm_metrics,
+                        use_cache=not message_data.bypass_cache
+                    ):
+                        full_response += chunk
+                        
+                        # Send chunks immediately as they arrive (skip "Thinking" from orchestrator).
+                        # Whitespace-only deltas carry line breaks, so they are forwarded too.
+                        # The stripper holds back only text that may be the start of the EMOTION tag.
+                        if chunk and chunk.strip() != "Thinking":
+                            if first_chunk_at is None:
+                                first_chunk_at = time.perf_counter()
+                            content = emotion_stripper.feed(chunk)
+                            if content:
+                                chunk_data = json.dumps({'type': 'chunk', 'content': content})
+                                yield f"data: {chunk_data}\n\n"
+                                chunk_count += 1
+                                if chunk_count <= 5 or chunk_count % 10 == 0:  # Log first 5 and every 10th chunk
+                                    print(f"📦 Sent chunk {chunk_count}: '{content[:50]}...'")
+                
+                # Release the held-back tail, minus the EMOTION tag
+                content = emotion_stripper.finish()
+                if content:
+                    chunk_data = json.dumps({'type': 'chunk', 'content': content})
+                    yield f"data: {chunk_data}\n\n"
+                    chunk_count += 1
                 
                 print(f"✅ AI response streamed: {len(full_response)} chars, {chunk_count} chunks")
                 
@@ -278,69 +317,65 @@ async def stream_message(
                 yield f"data: {error_data}\n\n"
                 return
             
-            # Extract emotion and get clean response (without EMOTION tag)
-            clean_response, emotion_data = extract_emotion_from_response(
-                user_message=message_data.content,
-                ai_response=full_response
-            )
+            # Emotion arrives as its own event; the clean response never contained the tag
+            clean_response = emotion_stripper.clean_response
+            emotion_data = emotion_stripper.emotion_data(message_data.content)
+            emotion_event = json.dumps({'type': 'emotion', **emotion_data})
+            yield f"data: {emotion_event}\n\n"
             
             print(f"✅ Clean response: {len(clean_response)} chars")
             
-            # Save AI response (clean version without EMOTION tag)
-            print("💾 Saving AI message...")
-            ai_msg = DBMessage(
-                content=clean_response,
-                conversation_id=conversation_id,
-                user_id=current_user.id,
-                is_from_user=False
-            )
-            db.add(ai_msg)
-            db.commit()
-            db.refresh(ai_msg)
-            print(f"✅ AI message saved: {ai_msg.id}")
+            # Streaming performance: time-to-first-token and generation rate
+            stream_finished_at = time.perf_counter()
+            completion_tokens = llm_metrics.get("completion_tokens") or chunk_count
+            generation_seconds = stream_finished_at - (first_chunk_at or stream_started_at)
+            stream_metrics = {
+                "model": llm_metrics.get("model"),
+                "tier": llm_metrics.get("tier"),
+                "cache": llm_metrics.get("cache"),
+                "ttft_ms": round((first_chunk_at - stream_started_at) * 1000) if first_chunk_at else None,
+                "total_ms": round((stream_finished_at - stream_started_at) * 1000),
+                "completion_tokens": completion_tokens,
+                "tokens_per_sec": round(completion_tokens / generation_seconds, 1) if generation_seconds > 0 else None,
+            }
+            print(f"⏱️ Stream metrics: {stream_metrics}")
             
-            # Save emotion to database
-            try:
-                from app.models import EmotionHistory
-                
-                emotion_record = EmotionHistory(
-                    user_id=current_user.id,
-                    conversation_id=conversation_id,
-                    message_id=ai_msg.id,
-                    emotion=emotion_data["emotion"],
-                    confidence=emotion_data["confidence"],
-                    intensity=emotion_data["intensity"],
-                    user_message=message_data.content,
-                    ai_response=clean_response
+            # Write 2: AI message (clean version without EMOTION tag) and the
+            # conversation bump in one transaction; emotion and usage rows are
+            # queued for the write-behind buffer
+            print("💾 Saving AI message...")
+            async with AsyncSessionLocal() as db:
+                ai_msg = await finish_chat_turn(
+                    db=db,
+                    user_message=user_msg,
+                    content=clean_response,
+                    emotion_data=emotion_data,
+                    usage={**llm_metrics, **stream_metrics}
                 )
-                db.add(emotion_record)
-                db.commit()
-                print(f"🧠 Emotion detected: {emotion_data['emotion']} ({emotion_data['confidence']:.0%} confidence)")
-            except Exception as emotion_error:
-                print(f"⚠️ Emotion tracking failed: {emotion_error}")
+            print(f"✅ AI message saved: {ai_msg.id}")
+            print(f"🧠 Emotion detected: {emotion_data['emotion']} ({emotion_data['confidence']:.0%} confidence)")
             
-            # Auto-generate conversation title if this is the first message
-            try:
-                # Count messages in this conversation (excluding current ones)
-                message_count = db.query(DBMessage).filter(
-                    DBMessage.conversation_id == conversation_id,
-                    DBMessage.is_from_user == True
-                ).count()
-                
-                # If this is the first user message, generate title
-                if message_count == 1:
+            # Name the conversation while it still has its placeholder title
+            if needs_title:
+                try:
                     print(f"🏷️ First message detected, triggering conversation naming...")
                     trigger_conversation_naming(
                         conversation_id=conversation_id,
                         user_message=message_data.content,
-                        ai_response=clean_response,
-                        db=db
+                        ai_response=clean_response
                     )
-            except Exception as naming_error:
-                print(f"⚠️ Conversation naming failed: {naming_error}")
+                except Exception as naming_error:
+                    print(f"⚠️ Conversation naming failed: {naming_error}")
+            
+            # Fold older turns into the rolling summary (background, every N turns)
+            trigger_summary_refresh(conversation_id)
             
             # Send completion
-            complete_data = json.dumps({'type': 'complete', 'message_id': str(ai_msg.id)})
+            complete_data = json.dumps({
+                'type': 'complete',
+                'message_id': str(ai_msg.id),
+                'metrics': stream_metrics
+            })
             yield f"data: {complete_data}\n\n"
             print("🎉 Stream complete!")
             
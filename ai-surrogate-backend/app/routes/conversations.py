@@ -8,11 +8,14 @@ Endpoints:
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.config import settings
+from app.database import get_async_db
 from app.models import User, Conversation, Message as DBMessage
 from app.services.auth_service import get_current_user
+from app.services.history_cache import get_history_cache
 
 router = APIRouter(prefix="/api/conversations", tags=["Conversations"])
 
@@ -26,7 +29,7 @@ router = APIRouter(prefix="/api/conversations", tags=["Conversations"])
 async def delete_conversation(
     conversation_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a conversation and all associated messages.
@@ -35,10 +38,10 @@ async def delete_conversation(
     to handle foreign key constraints properly.
     """
     # Verify conversation exists and belongs to user
-    conversation = db.query(Conversation).filter(
+    conversation = await db.scalar(select(Conversation).filter(
         Conversation.id == conversation_id,
         Conversation.user_id == current_user.id
-    ).first()
+    ))
     
     if not conversation:
         raise HTTPException(
@@ -50,27 +53,30 @@ async def delete_conversation(
         # First, delete emotion_history records for this conversation
         try:
             from app.models import EmotionHistory
-            db.query(EmotionHistory).filter(
-                EmotionHistory.conversation_id == str(conversation_id)
-            ).delete()
+            await db.execute(delete(EmotionHistory).filter(
+                EmotionHistory.conversation_id == conversation_id
+            ))
         except Exception:
             pass  # EmotionHistory might not exist
         
         # Then, delete all messages in the conversation
-        db.query(DBMessage).filter(
-            DBMessage.conversation_id == str(conversation_id)
-        ).delete()
+        await db.execute(delete(DBMessage).filter(
+            DBMessage.conversation_id == conversation_id
+        ))
         
         # Finally, delete the conversation itself
-        db.delete(conversation)
-        db.commit()
+        await db.delete(conversation)
+        await db.commit()
+        
+        if settings.HISTORY_CACHE_ENABLED:
+            await get_history_cache().invalidate(conversation_id)
         
         return {
             "message": "Conversation deleted successfully",
             "conversation_id": str(conversation_id)
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete conversation: {str(e)}"
@@ -5,9 +5,9 @@ API endpoints for user insights and analytics.
 """
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import User
 from app.routes.auth import get_current_user
 from app.services.insights_service import InsightsService
@@ -20,7 +20,7 @@ router = APIRouter(prefix="/api/insights", tags=["insights"])
 async def get_insights_summary(
     period: str = Query('week', regex='^(week|month|all)$'),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get comprehensive insights summary.
@@ -35,7 +35,7 @@ async def get_insights_summary(
     - conversation_stats: Message and conversation statistics
     - mood_stats: Mood check-in statistics
     """
-    summary = InsightsService.get_summary(
+    summary = await InsightsService.get_summary(
         db=db,
         user_id=str(current_user.id),
         period=period
@@ -47,7 +47,7 @@ async def get_insights_summary(
 @router.get("/ai-analysis")
 async def get_ai_analysis(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get AI-powered analysis of emotional patterns.
@@ -62,7 +62,7 @@ async def get_ai_analysis(
     # TODO: Implement AI analysis using LLM
     # For now, return placeholder data
     
-    summary = InsightsService.get_summary(
+    summary = await InsightsService.get_summary(
         db=db,
         user_id=str(current_user.id),
         period='week'
@@ -6,10 +6,10 @@ API endpoints for mood tracking and history.
 
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import User
 from app.routes.auth import get_current_user
 from app.services.mood_service import MoodService
@@ -40,7 +40,7 @@ class MoodEntryResponse(BaseModel):
 async def track_mood(
     request: MoodTrackRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Track user's current mood.
@@ -61,7 +61,7 @@ async def track_mood(
         )
     
     # Track mood
-    mood_entry = MoodService.track_mood(
+    mood_entry = await MoodService.track_mood(
         db=db,
         user_id=str(current_user.id),
         mood=request.mood,
@@ -76,7 +76,7 @@ async def track_mood(
 async def get_mood_history(
     days: int = 7,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get user's mood history for the last N days.
@@ -84,7 +84,7 @@ async def get_mood_history(
     **Query Parameters:**
     - days: Number of days to look back (default: 7)
     """
-    mood_entries = MoodService.get_mood_history(
+    mood_entries = await MoodService.get_mood_history(
         db=db,
         user_id=str(current_user.id),
         days=days
@@ -101,7 +101,7 @@ async def get_mood_history(
 async def get_mood_stats(
     days: int = 7,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get mood statistics.
@@ -114,7 +114,7 @@ async def get_mood_stats(
     - average_intensity: Average intensity (1-5)
     - distribution: Mood distribution with percentages
     """
-    stats = MoodService.get_mood_stats(
+    stats = await MoodService.get_mood_stats(
         db=db,
         user_id=str(current_user.id),
         days=days
@@ -127,7 +127,7 @@ async def get_mood_stats(
 async def get_mood_timeline(
     days: int = 7,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get mood timeline data for charts.
@@ -138,7 +138,7 @@ async def get_mood_timeline(
     **Returns:**
     Daily mood averages for chart visualization.
     """
-    timeline = MoodService.get_mood_timeline(
+    timeline = await MoodService.get_mood_timeline(
         db=db,
         user_id=str(current_user.id),
         days=days
@@ -5,11 +5,11 @@ API endpoints for managing user preferences and personalization.
 """
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from pydantic import BaseModel
 
-from app.database import get_db
+from app.database import get_async_db
 from app.services.auth_service import get_current_user
 from app.models.user import User
 from app.services.preferences_service import preferences_service
@@ -37,10 +37,10 @@ class TopicAdd(BaseModel):
 @router.get("/")
 async def get_preferences(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user preferences."""
-    prefs = preferences_service.get_or_create_preferences(
+    prefs = await preferences_service.get_or_create_preferences(
         user_id=str(current_user.id),
         db=db
     )
@@ -51,13 +51,13 @@ async def get_preferences(
 async def update_preferences(
     update: PreferencesUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update user preferences."""
     # Filter out None values
     update_data = {k: v for k, v in update.dict().items() if v is not None}
     
-    prefs = preferences_service.update_preferences(
+    prefs = await preferences_service.update_preferences(
         user_id=str(current_user.id),
         db=db,
         **update_data
@@ -73,10 +73,10 @@ async def update_preferences(
 async def add_topic(
     topic_data: TopicAdd,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add a topic of interest."""
-    prefs = preferences_service.add_topic_of_interest(
+    prefs = await preferences_service.add_topic_of_interest(
         user_id=str(current_user.id),
         topic=topic_data.topic,
         db=db
@@ -91,10 +91,10 @@ async def add_topic(
 @router.get("/context")
 async def get_personalization_context(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get personalization context for AI."""
-    context = preferences_service.get_personalization_context(
+    context = await preferences_service.get_personalization_context(
         user_id=str(current_user.id),
         db=db
     )
@@ -7,6 +7,7 @@ from app.schemas.message_schema import MessageCreate, MessageResponse
 from app.schemas.conversation_schema import (
     ConversationCreate,
     ConversationResponse,
+    ConversationListItem,
     ConversationWithMessages
 )
 
@@ -20,6 +21,7 @@ __all__ = [
     "MessageResponse",
     "ConversationCreate",
     "ConversationResponse",
+    "ConversationListItem",
     "ConversationWithMessages",
 ]
 
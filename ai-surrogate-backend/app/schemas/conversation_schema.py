@@ -33,6 +33,24 @@ class ConversationResponse(BaseModel):
     user_id: UUID = Field(..., description="User who owns this conversation")
 
 
+class ConversationListItem(ConversationResponse):
+    """Schema for a conversation in the list screen, with its latest message."""
+    
+    last_message_preview: Optional[str] = Field(
+        None,
+        description="Start of the most recent message (None if no messages yet)"
+    )
+    last_message_from_user: Optional[bool] = Field(
+        None,
+        description="True if the most recent message was sent by the user"
+    )
+    message_count: int = Field(0, description="Number of messages in the conversation")
+    last_activity_at: datetime = Field(
+        ...,
+        description="Time of the most recent message (updated_at if none)"
+    )
+
+
 class ConversationWithMessages(ConversationResponse):
     """Schema for conversation with its messages."""
     
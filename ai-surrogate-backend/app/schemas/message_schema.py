@@ -23,6 +23,10 @@ class MessageCreate(BaseModel):
         description="Conversation ID (optional, will create new if not provided)",
         examples=["123e4567-e89b-12d3-a456-426614174000"]
     )
+    bypass_cache: bool = Field(
+        default=False,
+        description="Skip the response cache and always generate a fresh answer"
+    )
 
 
 class MessageResponse(BaseModel):
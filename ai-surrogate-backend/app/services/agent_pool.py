@@ -0,0 +1,104 @@
+"""
+Agent Pool - Lazily built, reused Agno agents
+
+Building an Agno agent (model client, instructions, storage) per request is
+wasted work, and building every personality at import time slows startup and
+fails without MISTRAL_API_KEY. AgentPool builds an agent the first time its
+key (personality, language, ...) is requested and hands the same instance
+to every later caller.
+
+Agent storage goes through create_agent_db: each agent gets its own SQLite
+engine in WAL mode with a busy timeout, so concurrent runs read while one
+writes instead of failing with "database is locked".
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from sqlalchemy import create_engine, event
+
+logger = logging.getLogger(__name__)
+
+# Milliseconds a writer waits for the SQLite lock before giving up
+SQLITE_BUSY_TIMEOUT_MS = 5000
+
+
+def create_agent_db(db_file: str = "./agno_memory.db"):
+    """
+    Create Agno SQLite storage on a WAL-mode engine.
+
+    Args:
+        db_file: SQLite file shared by the agents
+
+    Returns:
+        agno SqliteDb bound to a dedicated engine
+    """
+    from agno.db.sqlite import SqliteDb
+
+    engine = create_engine(
+        f"sqlite:///{db_file}",
+        connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+    )
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.close()
+
+    return SqliteDb(db_engine=engine)
+
+
+class AgentPool:
+    """
+    Thread-safe, lazily populated cache of agents by key.
+    """
+
+    def __init__(self, name: str, factory: Callable[..., Any]):
+        """
+        Args:
+            name: Pool name for logs and stats
+            factory: Builds an agent from the key parts
+        """
+        self.name = name
+        self.factory = factory
+        self._agents: Dict[Tuple[Hashable, ...], Any] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "builds": 0}
+
+    def get(self, *key: Hashable) -> Any:
+        """
+        Get the agent for a key, building it on first use.
+
+        Args:
+            *key: Key parts passed to the factory (e.g. personality, language)
+
+        Returns:
+            Shared agent instance
+        """
+        agent = self._agents.get(key)
+        if agent is not None:
+            self._stats["hits"] += 1
+            return agent
+
+        with self._lock:
+            agent = self._agents.get(key)
+            if agent is None:
+                agent = self._agents[key] = self.factory(*key)
+                self._stats["builds"] += 1
+                logger.info(f"🤖 {self.name} agent built for {key}")
+            else:
+                self._stats["hits"] += 1
+        return agent
+
+    def clear(self) -> None:
+        """Drop all pooled agents (e.g. after a config change)."""
+        with self._lock:
+            self._agents.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool size and hit/build counters."""
+        return {**self._stats, "size": len(self._agents)}
@@ -5,11 +5,12 @@ Agno-based chat agent with emotion detection and empathetic responses.
 """
 
 from agno.agent import Agent
-from typing import Dict
+from typing import Dict, Optional
 import logging
 import os
 
 from app.config import settings
+from app.services.agent_pool import AgentPool, create_agent_db
 
 logger = logging.getLogger(__name__)
 
@@ -60,7 +61,8 @@ class ChatAgent:
         self,
         personality: str = "friendly",
         expertise: str = "general assistant",
-        goal: str = "Help users with their questions and tasks"
+        goal: str = "Help users with their questions and tasks",
+        language: Optional[str] = None
     ):
         """
         Initialize emotionally intelligent chat agent.
@@ -69,10 +71,12 @@ class ChatAgent:
             personality: Personality type
             expertise: Area of expertise
             goal: Agent's primary goal
+            language: Language the agent replies in ("English", "Urdu", ...), if fixed
         """
         self.personality = personality
         self.expertise = expertise
         self.goal = goal
+        self.language = language
         self.personality_traits = PERSONALITY_TRAITS
         
         # Create Agno agent
@@ -82,7 +86,6 @@ class ChatAgent:
     def _create_agent(self) -> Agent:
         """Create Agno agent with emotion-aware system prompt."""
         from agno.models.mistral import MistralChat
-        from agno.db.sqlite import SqliteDb
         
         mistral_api_key = os.getenv("MISTRAL_API_KEY")
         if not mistral_api_key:
@@ -187,7 +190,8 @@ Remember: Your goal is to make users feel heard, understood, and supported.
             instructions=system_prompt,
             markdown=True,
             add_history_to_context=True,  # Built-in conversation memory
-            db=SqliteDb(db_file="./agno_memory.db"),  # Persistent storage
+            additional_context=f"Always reply in {self.language}." if self.language else None,
+            db=create_agent_db("./agno_memory.db"),  # Persistent storage (WAL mode)
         )
     
     def run(self, message: str) -> str:
@@ -208,18 +212,26 @@ Remember: Your goal is to make users feel heard, understood, and supported.
             return "I apologize, but I encountered an error. Could you please rephrase your question?"
 
 
-# Predefined agent personalities
+# Predefined agent personalities (built on first use)
 AGENT_PERSONALITIES = {
-    "default": ChatAgent(personality="friendly"),
-    "professional": ChatAgent(personality="professional", expertise="business and productivity"),
-    "casual": ChatAgent(personality="casual", expertise="general chat"),
-    "enthusiastic": ChatAgent(personality="enthusiastic", expertise="motivation and support"),
-    "technical": ChatAgent(personality="professional", expertise="programming and technology"),
-    "empathetic": ChatAgent(personality="empathetic", expertise="emotional support"),
-    "calming": ChatAgent(personality="calming", expertise="stress relief"),
+    "default": {"personality": "friendly"},
+    "professional": {"personality": "professional", "expertise": "business and productivity"},
+    "casual": {"personality": "casual", "expertise": "general chat"},
+    "enthusiastic": {"personality": "enthusiastic", "expertise": "motivation and support"},
+    "technical": {"personality": "professional", "expertise": "programming and technology"},
+    "empathetic": {"personality": "empathetic", "expertise": "emotional support"},
+    "calming": {"personality": "calming", "expertise": "stress relief"},
 }
 
+# One agent per (personality, language): the instructions depend on both
+agent_pool = AgentPool(
+    "chat",
+    lambda name, language: ChatAgent(**AGENT_PERSONALITIES[name], language=language)
+)
 
-def get_agent(personality: str = "default") -> ChatAgent:
-    """Get a chat agent with specified personality."""
-    return AGENT_PERSONALITIES.get(personality, AGENT_PERSONALITIES["default"])
+
+def get_agent(personality: str = "default", language: Optional[str] = None) -> ChatAgent:
+    """Get a chat agent with specified personality (and reply language, if fixed)."""
+    if personality not in AGENT_PERSONALITIES:
+        personality = "default"
+    return agent_pool.get(personality, language)
@@ -11,9 +11,10 @@ from typing import List, Dict, Optional
 from mistralai import Mistral
 
 from app.config import settings
-from app.models import Message
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.agent_service import get_agent
+from app.services.context_builder import load_recent_history
+from app.services.tokenizer import count_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -33,10 +34,10 @@ def initialize_mistral_client():
         raise
 
 
-def build_conversation_context(
+async def build_conversation_context(
     conversation_id: str,
-    db: Session,
-    max_messages: int = 10
+    db: AsyncSession,
+    max_tokens: Optional[int] = None
 ) -> List[Dict]:
     """
     Build conversation context from message history.
@@ -44,31 +45,13 @@ def build_conversation_context(
     Args:
         conversation_id: ID of the conversation
         db: Database session
-        max_messages: Maximum number of messages to include
+        max_tokens: History token budget (default: MAX_CONTEXT_TOKENS)
         
     Returns:
         List of message dicts in Mistral format
     """
     try:
-        # Get recent messages from conversation
-        messages = (
-            db.query(Message)
-            .filter(Message.conversation_id == conversation_id)
-            .order_by(Message.created_at.desc())
-            .limit(max_messages)
-            .all()
-        )
-        
-        # Reverse to get chronological order
-        messages = list(reversed(messages))
-        
-        # Convert to Mistral message format (dicts)
-        context = []
-        for msg in messages:
-            role = "user" if msg.is_from_user else "assistant"
-            context.append({"role": role, "content": msg.content})
-        
-        return context
+        return await load_recent_history(db, conversation_id, max_tokens=max_tokens)
     except Exception as e:
         logger.error(f"Error building context: {e}")
         return []
@@ -78,7 +61,7 @@ async def generate_ai_response(
     user_message: str,
     user_id: str,
     conversation_id: Optional[str] = None,
-    db: Optional[Session] = None,
+    db: Optional[AsyncSession] = None,
     use_memory: bool = True
 ) -> str:
     """
@@ -115,7 +98,7 @@ async def generate_ai_response(
         
         # Add conversation context if available
         if conversation_id and db:
-            context = build_conversation_context(conversation_id, db)
+            context = await build_conversation_context(conversation_id, db)
             messages.extend(context)
         
         # Add current user message
@@ -148,7 +131,9 @@ async def stream_ai_response(
     user_message: str,
     user_id: str,
     conversation_id: Optional[str] = None,
-    db: Optional[Session] = None
+    db: Optional[AsyncSession] = None,
+    metrics: Optional[dict] = None,
+    use_cache: bool = True
 ):
     """
     Stream AI response using hybrid orchestrator.
@@ -157,13 +142,16 @@ async def stream_ai_response(
     
     Args:
         user_message: The user's message
-        user_id: User ID (for future use)
+        user_id: User ID (personalization and cache fingerprint)
         conversation_id: Optional conversation ID for context
         db: Optional database session for context
+        metrics: Optional dict the orchestrator fills with model/token usage
+        use_cache: Set False to bypass the response cache
         
     Yields:
         String chunks of the AI response
     """
+    streamed = False
     try:
         from app.services.orchestrator import get_orchestrator
         
@@ -176,8 +164,12 @@ async def stream_ai_response(
         async for chunk in orchestrator.stream_chat(
             user_message=user_message,
             conversation_id=conversation_id,
-            db=db
+            db=db,
+            metrics=metrics,
+            user_id=user_id,
+            use_cache=use_cache
         ):
+            streamed = True
             yield chunk
         
         logger.info(f"📤 Streaming complete")
@@ -187,6 +179,10 @@ async def stream_ai_response(
         import traceback
         traceback.print_exc()
         
+        # Don't append an echo to a partially streamed answer
+        if streamed:
+            raise
+        
         # Fallback to echo
         echo_message = f"Echo: {user_message}"
         words = echo_message.split()
@@ -261,16 +257,17 @@ Title:"""
 
 def count_tokens_estimate(text: str) -> int:
     """
-    Estimate token count for text.
-    Simple estimation: ~4 characters per token.
+    Count tokens for text with the Mistral tokenizer.
+    
+    Kept for existing callers; see app.services.tokenizer.
     
     Args:
         text: Text to count tokens for
         
     Returns:
-        Estimated token count
+        Token count
     """
-    return len(text) // 4
+    return count_tokens(text)
 
 
 def optimize_context(
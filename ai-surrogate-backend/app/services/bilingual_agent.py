@@ -3,15 +3,23 @@ Bilingual Agent using Agno
 
 Generates responses in English or Urdu based on user's language.
 Politely declines requests for other languages.
+One agent per detected language is built on first use and reused.
 """
 
+from typing import Optional
+
 from agno.agent import Agent
 
+from app.services.agent_pool import AgentPool
+
 
-def create_bilingual_agent() -> Agent:
+def create_bilingual_agent(language: Optional[str] = None) -> Agent:
     """
     Creates an Agno agent that responds in English or Urdu only.
     
+    Args:
+        language: Detected language the agent serves ("English", "Urdu", "Other"), if known
+    
     Returns:
         Agent configured for bilingual responses
     """
@@ -39,10 +47,14 @@ def create_bilingual_agent() -> Agent:
         - Do NOT use Roman Urdu in your responses
         - Do NOT mix English and Urdu in the same response
         - Match the user's language choice
-        """
+        """,
+        additional_context=f"The user writes in: {language}" if language else None,
     )
 
 
+bilingual_pool = AgentPool("bilingual", create_bilingual_agent)
+
+
 def generate_response(user_message: str, detected_language: str, conversation_context: str = "") -> str:
     """
     Generate a bilingual response based on detected language.
@@ -55,7 +67,7 @@ def generate_response(user_message: str, detected_language: str, conversation_co
     Returns:
         AI response in appropriate language
     """
-    agent = create_bilingual_agent()
+    agent = bilingual_pool.get(detected_language)
     
     # Build context for the agent
     context_parts = []
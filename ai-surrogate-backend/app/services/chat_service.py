@@ -2,15 +2,63 @@
 Chat service for handling message and conversation operations.
 """
 
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID, uuid4
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select, true, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import User, Conversation, Message
+from app.config import settings
+from app.models import User, Conversation, Message, EmotionHistory, LLMUsage
+from app.services.history_cache import get_history_cache
+from app.services.tokenizer import count_tokens
+from app.services.write_behind import get_write_behind
 
+# Title of streamed conversations until the naming service replaces it
+PLACEHOLDER_TITLE = "New Conversation"
 
-def create_conversation(
-    db: Session,
+# User turns during which naming is (re)tried; a conversation whose naming
+# keeps failing stays on the placeholder instead of re-running it every turn
+TITLE_ATTEMPT_TURNS = 3
+
+# Characters of the last message shown in the conversation list
+PREVIEW_CHARS = 120
+
+
+def _record_message(conversation_id: UUID, is_from_user: bool, at: datetime):
+    """UPDATE that counts one new message on its conversation (atomic in SQL)."""
+    return (
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(
+            message_count=Conversation.message_count + 1,
+            user_message_count=Conversation.user_message_count + (1 if is_from_user else 0),
+            last_message_at=at,
+            updated_at=at
+        )
+    )
+
+
+async def _cache_message(message: Message, new_conversation: bool = False) -> None:
+    """Add a committed message to its conversation's history cache."""
+    if not settings.HISTORY_CACHE_ENABLED:
+        return
+    cache = get_history_cache()
+    entry = cache.message_entry(
+        "user" if message.is_from_user else "assistant",
+        message.content,
+        message.token_count,
+        message.created_at
+    )
+    if new_conversation:
+        # Nothing else to load: the cache can start with this message
+        await cache.store(message.conversation_id, None, None, [entry])
+    else:
+        await cache.append(message.conversation_id, entry)
+
+
+async def create_conversation(
+    db: AsyncSession,
     user: User,
     title: Optional[str] = None
 ) -> Conversation:
@@ -30,83 +78,177 @@ def create_conversation(
         title=title or f"Conversation {uuid4().hex[:8]}"
     )
     db.add(conversation)
-    db.commit()
-    db.refresh(conversation)
+    await db.commit()
+    await db.refresh(conversation)
     
     return conversation
 
 
-def get_user_conversations(
-    db: Session,
+async def get_user_conversations(
+    db: AsyncSession,
     user: User,
     skip: int = 0,
-    limit: int = 50
-) -> List[Conversation]:
+    limit: int = 50,
+    before: Optional[UUID] = None
+) -> List[Dict]:
     """
-    Get all conversations for a user.
+    Get a page of a user's conversations with their latest message.
+    
+    One query: the conversations page (most recently updated first) with a
+    lateral join for each one's last message, so the list screen doesn't
+    fetch messages per conversation. Counts come from the counter columns.
     
     Args:
         db: Database session
         user: User to get conversations for
-        skip: Number of records to skip (pagination)
+        skip: Number of records to skip (pagination without a cursor)
         limit: Maximum number of records to return
+        before: Optional conversation ID cursor - the page after that
+            conversation in the list (keyset on updated_at, id)
         
     Returns:
-        List of Conversation instances
+        List of dicts matching ConversationListItem
+        
+    Raises:
+        ValueError: If the cursor conversation doesn't belong to user
     """
-    return (
-        db.query(Conversation)
-        .filter(Conversation.user_id == user.id)
-        .order_by(Conversation.updated_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    last_message = (
+        select(
+            func.substr(Message.content, 1, PREVIEW_CHARS).label("preview"),
+            Message.is_from_user,
+            Message.created_at,
+        )
+        .where(Message.conversation_id == Conversation.id)
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(1)
+        .lateral("last_message")
     )
+    query = (
+        select(
+            Conversation.id,
+            Conversation.user_id,
+            Conversation.title,
+            Conversation.created_at,
+            Conversation.updated_at,
+            last_message.c.preview.label("last_message_preview"),
+            last_message.c.is_from_user.label("last_message_from_user"),
+            Conversation.message_count,
+            func.coalesce(Conversation.last_message_at, Conversation.updated_at).label("last_activity_at"),
+        )
+        .select_from(Conversation)
+        .outerjoin(last_message, true())
+        .where(Conversation.user_id == user.id)
+    )
+    
+    if before is not None:
+        cursor = (await db.execute(
+            select(Conversation.updated_at, Conversation.id).filter(
+                Conversation.id == before,
+                Conversation.user_id == user.id
+            )
+        )).first()
+        if cursor is None:
+            raise ValueError("Conversation not found or access denied")
+        query = query.where(
+            tuple_(Conversation.updated_at, Conversation.id) < tuple_(cursor.updated_at, cursor.id)
+        )
+    else:
+        query = query.offset(skip)
+    
+    rows = (await db.execute(
+        query
+        .order_by(Conversation.updated_at.desc(), Conversation.id.desc())
+        .limit(limit)
+    )).mappings().all()
+    return [dict(row) for row in rows]
 
 
-def get_conversation_messages(
-    db: Session,
+async def get_conversation_messages(
+    db: AsyncSession,
     conversation_id: UUID,
     user: User,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    before: Optional[UUID] = None,
+    after: Optional[UUID] = None
 ) -> List[Message]:
     """
-    Get all messages in a conversation.
+    Get messages in a conversation, oldest first.
+    
+    With a cursor the page is found by keyset on (created_at, id) instead
+    of OFFSET, so the cost is one page however far back it is:
+    ``before`` returns the ``limit`` messages just older than that message,
+    ``after`` the ``limit`` messages just newer.
     
     Args:
         db: Database session
         conversation_id: Conversation ID
         user: User requesting the messages (for authorization)
-        skip: Number of records to skip (pagination)
+        skip: Number of records to skip (pagination without a cursor)
         limit: Maximum number of records to return
+        before: Optional message ID cursor - page of older messages
+        after: Optional message ID cursor - page of newer messages
         
     Returns:
         List of Message instances
         
     Raises:
-        ValueError: If conversation doesn't belong to user
+        ValueError: If conversation doesn't belong to user, or the cursor
+            message is not in the conversation
     """
-    conversation = db.query(Conversation).filter(
+    conversation_exists = await db.scalar(select(Conversation.id).filter(
         Conversation.id == conversation_id,
         Conversation.user_id == user.id
-    ).first()
+    ))
     
-    if not conversation:
+    if not conversation_exists:
         raise ValueError("Conversation not found or access denied")
     
-    return (
-        db.query(Message)
-        .filter(Message.conversation_id == conversation_id)
-        .order_by(Message.created_at.asc())
-        .offset(skip)
+    if before is not None and after is not None:
+        raise ValueError("Use either 'before' or 'after', not both")
+    
+    query = select(Message).filter(Message.conversation_id == conversation_id)
+    cursor_id = before or after
+    if cursor_id is None:
+        result = await db.scalars(
+            query
+            .order_by(Message.created_at.asc(), Message.id.asc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return result.all()
+    
+    cursor = (await db.execute(
+        select(Message.created_at, Message.id).filter(
+            Message.id == cursor_id,
+            Message.conversation_id == conversation_id
+        )
+    )).first()
+    if cursor is None:
+        raise ValueError("Cursor message not found in this conversation")
+    
+    position = tuple_(Message.created_at, Message.id)
+    if before is not None:
+        # Newest-first from the cursor, then flipped back to chronological order
+        result = await db.scalars(
+            query
+            .filter(position < tuple_(cursor.created_at, cursor.id))
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(limit)
+        )
+        return list(reversed(result.all()))
+    
+    result = await db.scalars(
+        query
+        .filter(position > tuple_(cursor.created_at, cursor.id))
+        .order_by(Message.created_at.asc(), Message.id.asc())
         .limit(limit)
-        .all()
     )
+    return result.all()
 
 
-def create_message(
-    db: Session,
+async def create_message(
+    db: AsyncSession,
     user: User,
     content: str,
     is_from_user: bool,
@@ -127,37 +269,186 @@ def create_message(
     """
     # Create conversation if not provided
     if conversation_id is None:
-        conversation = create_conversation(db, user)
+        conversation = await create_conversation(db, user)
         conversation_id = conversation.id
-    else:
-        # Verify conversation belongs to user
-        conversation = db.query(Conversation).filter(
-            Conversation.id == conversation_id,
-            Conversation.user_id == user.id
-        ).first()
-        
-        if not conversation:
-            raise ValueError("Conversation not found or access denied")
+    
+    # Count the message on its conversation; matching no row means it
+    # doesn't exist or belongs to someone else
+    now = datetime.utcnow()
+    counted = await db.scalar(
+        _record_message(conversation_id, is_from_user, now)
+        .where(Conversation.user_id == user.id)
+        .returning(Conversation.id)
+    )
+    if counted is None:
+        raise ValueError("Conversation not found or access denied")
     
     # Create message
     message = Message(
         user_id=user.id,
         conversation_id=conversation_id,
         content=content,
-        is_from_user=is_from_user
+        is_from_user=is_from_user,
+        token_count=count_tokens(content),
+        created_at=now
     )
     
     db.add(message)
-    db.commit()
-    db.refresh(message)
+    await db.commit()
+    await db.refresh(message)
+    await _cache_message(message)
     
     return message
 
 
+async def begin_chat_turn(
+    db: AsyncSession,
+    user: User,
+    content: str,
+    conversation_id: Optional[UUID] = None
+) -> Tuple[Message, bool]:
+    """
+    Persist the user's side of a streamed chat turn in one transaction.
+    
+    Creates the conversation if needed (otherwise checks ownership and
+    bumps its counters and updated_at in the same statement), then inserts
+    the user message.
+    IDs and timestamps are set client-side, so nothing is refreshed after
+    the commit.
+    
+    Args:
+        db: Database session
+        user: User sending the message
+        content: Message content
+        conversation_id: Optional conversation ID (creates new if None)
+        
+    Returns:
+        Tuple of (user Message, needs_title) - needs_title is True while the
+        conversation still has its placeholder title, for at most its first
+        TITLE_ATTEMPT_TURNS user messages
+        
+    Raises:
+        ValueError: If conversation doesn't belong to user
+    """
+    now = datetime.utcnow()
+    
+    is_new_conversation = conversation_id is None
+    if is_new_conversation:
+        conversation = Conversation(
+            id=uuid4(),
+            user_id=user.id,
+            title=PLACEHOLDER_TITLE,
+            message_count=1,
+            user_message_count=1,
+            last_message_at=now,
+            created_at=now,
+            updated_at=now
+        )
+        db.add(conversation)
+        conversation_id = conversation.id
+        needs_title = True
+    else:
+        row = (await db.execute(
+            _record_message(conversation_id, True, now)
+            .where(Conversation.user_id == user.id)
+            .returning(Conversation.title, Conversation.user_message_count)
+        )).first()
+        if row is None:
+            raise ValueError("Conversation not found or access denied")
+        needs_title = (
+            row.title == PLACEHOLDER_TITLE
+            and row.user_message_count <= TITLE_ATTEMPT_TURNS
+        )
+    
+    message = Message(
+        id=uuid4(),
+        user_id=user.id,
+        conversation_id=conversation_id,
+        content=content,
+        is_from_user=True,
+        token_count=count_tokens(content),
+        created_at=now
+    )
+    db.add(message)
+    await db.commit()
+    await _cache_message(message, new_conversation=is_new_conversation)
+    
+    return message, needs_title
+
+
+async def finish_chat_turn(
+    db: AsyncSession,
+    user_message: Message,
+    content: str,
+    emotion_data: Dict,
+    usage: Optional[Dict] = None
+) -> Message:
+    """
+    Persist the AI side of a streamed chat turn in one transaction.
+    
+    The AI message and the conversation's counter/updated_at bump share a
+    single commit. The EmotionHistory record (and the LLMUsage record, if given)
+    go to the write-behind buffer and are bulk-inserted shortly after.
+    
+    Args:
+        db: Database session
+        user_message: The user Message saved by begin_chat_turn
+        content: Clean AI response (EMOTION tag removed)
+        emotion_data: dict with emotion, confidence, intensity
+        usage: Optional stream metrics (model, tier, cache, tokens, latency)
+        
+    Returns:
+        Created AI Message
+    """
+    now = datetime.utcnow()
+    
+    ai_message = Message(
+        id=uuid4(),
+        user_id=user_message.user_id,
+        conversation_id=user_message.conversation_id,
+        content=content,
+        is_from_user=False,
+        token_count=count_tokens(content),
+        created_at=now
+    )
+    db.add(ai_message)
+    await db.execute(_record_message(user_message.conversation_id, False, now))
+    await db.commit()
+    await _cache_message(ai_message)
+    
+    # Telemetry rows reference the committed message; the text itself is not copied
+    write_behind = get_write_behind()
+    write_behind.add(EmotionHistory, {
+        "user_id": user_message.user_id,
+        "conversation_id": user_message.conversation_id,
+        "message_id": ai_message.id,
+        "emotion": emotion_data["emotion"],
+        "confidence": emotion_data["confidence"],
+        "intensity": emotion_data["intensity"],
+        "detected_at": now,
+    })
+    if usage is not None:
+        write_behind.add(LLMUsage, {
+            "user_id": user_message.user_id,
+            "conversation_id": user_message.conversation_id,
+            "message_id": ai_message.id,
+            "model": usage.get("served_by") or usage.get("model"),
+            "tier": usage.get("tier"),
+            "cache": usage.get("cache"),
+            "prompt_tokens": usage.get("prompt_tokens"),
+            "completion_tokens": usage.get("completion_tokens"),
+            "ttft_ms": usage.get("ttft_ms"),
+            "total_ms": usage.get("total_ms"),
+            "created_at": now,
+        })
+    
+    return ai_message
+
+
 async def generate_ai_response_with_context(
     user_message: str,
     conversation_id: str,
-    db: Session
+    db: AsyncSession
 ) -> str:
     """
     Generate AI response with conversation context.
@@ -0,0 +1,221 @@
+"""
+Context Builder
+
+Selects conversation history for the prompt by token budget instead of a
+fixed message count. The selection runs in SQL: a cumulative window sum over
+each message's cached ``token_count`` keeps "as many recent turns as fit in
+N tokens", so history is never re-tokenized per turn.
+
+With HISTORY_CACHE_ENABLED the summary and recent messages come from the
+history cache instead (app/services/history_cache.py), and the same budget
+selection runs in Python: an active conversation needs no database reads.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Conversation, Message
+from app.services.history_cache import get_history_cache
+
+logger = logging.getLogger(__name__)
+
+
+def _message_tokens():
+    """Cached token count, estimated from length for rows created before counting."""
+    return func.coalesce(Message.token_count, func.length(Message.content) / 2 + 1)
+
+
+async def load_history_within_budget(
+    db: AsyncSession,
+    conversation_id: str,
+    max_tokens: Optional[int] = None,
+    max_messages: Optional[int] = None,
+    after: Optional[datetime] = None
+) -> List[Dict]:
+    """
+    Load the most recent messages whose combined tokens fit the budget.
+
+    Args:
+        db: Database session
+        conversation_id: Conversation ID
+        max_tokens: History token budget (default: MAX_CONTEXT_TOKENS)
+        max_messages: Upper bound on messages scanned (default: MAX_CONTEXT_SCAN_MESSAGES)
+        after: Only include messages created after this time (already summarized otherwise)
+
+    Returns:
+        List of {"role", "content"} dicts in chronological order
+    """
+    max_tokens = max_tokens or settings.MAX_CONTEXT_TOKENS
+    max_messages = max_messages or settings.MAX_CONTEXT_SCAN_MESSAGES
+
+    # Newest messages first, bounded so the window never scans a whole long chat
+    recent = (
+        select(
+            Message.id,
+            Message.content,
+            Message.is_from_user,
+            Message.created_at,
+            _message_tokens().label("tokens"),
+        )
+        .where(Message.conversation_id == conversation_id)
+    )
+    if after is not None:
+        recent = recent.where(Message.created_at > after)
+    recent = (
+        recent
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(max_messages)
+        .subquery()
+    )
+
+    # Running total from newest to oldest
+    windowed = select(
+        recent,
+        func.sum(recent.c.tokens).over(
+            order_by=(recent.c.created_at.desc(), recent.c.id.desc()),
+            rows=(None, 0),
+        ).label("running_tokens"),
+    ).subquery()
+
+    rows = (await db.execute(
+        select(windowed.c.content, windowed.c.is_from_user, windowed.c.tokens)
+        .where(windowed.c.running_tokens <= max_tokens)
+        .order_by(windowed.c.created_at.asc(), windowed.c.id.asc())
+    )).all()
+
+    context = [
+        {"role": "user" if row.is_from_user else "assistant", "content": row.content}
+        for row in rows
+    ]
+
+    total_tokens = sum(row.tokens for row in rows)
+    logger.info(f"📚 Loaded {len(context)} messages ({total_tokens} tokens) within {max_tokens}-token budget")
+    return context
+
+
+async def _load_cached_conversation(db: AsyncSession, conversation_id: str) -> Dict:
+    """Summary and recent messages from the history cache, loaded from the database on a miss."""
+    cache = get_history_cache()
+    entry = await cache.get(conversation_id)
+    if entry is not None:
+        return entry
+    
+    # Before reading: a message written during the load makes the snapshot stale
+    load_token = await cache.begin_load(conversation_id)
+    summary_row = (await db.execute(
+        select(Conversation.summary, Conversation.summarized_until)
+        .where(Conversation.id == conversation_id)
+    )).first()
+    rows = (await db.execute(
+        select(Message.content, Message.is_from_user, Message.token_count, Message.created_at)
+        .where(Message.conversation_id == conversation_id)
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(cache.max_messages)
+    )).all()
+    
+    summary = summary_row.summary if summary_row else None
+    summarized_until = summary_row.summarized_until if summary_row else None
+    messages = [
+        cache.message_entry(
+            "user" if row.is_from_user else "assistant",
+            row.content,
+            row.token_count,
+            row.created_at
+        )
+        for row in reversed(rows)
+    ]
+    await cache.store(conversation_id, summary, summarized_until, messages, load_token)
+    return {"summary": summary, "summarized_until": summarized_until, "messages": messages}
+
+
+def _select_within_budget(
+    messages,
+    max_tokens: int,
+    after: Optional[datetime] = None
+) -> List[Dict]:
+    """Newest messages (after ``after``) whose combined tokens fit the budget, oldest first."""
+    selected = []
+    total_tokens = 0
+    for message in reversed(messages):
+        if after is not None and message["created_at"] <= after:
+            break
+        if total_tokens + message["tokens"] > max_tokens:
+            break
+        total_tokens += message["tokens"]
+        selected.append({"role": message["role"], "content": message["content"]})
+    selected.reverse()
+    
+    logger.info(f"📚 Loaded {len(selected)} cached messages ({total_tokens} tokens) within {max_tokens}-token budget")
+    return selected
+
+
+async def load_recent_history(
+    db: AsyncSession,
+    conversation_id: str,
+    max_tokens: Optional[int] = None
+) -> List[Dict]:
+    """
+    Most recent messages within the token budget, ignoring the summary.
+    
+    Args:
+        db: Database session (used only on a history cache miss)
+        conversation_id: Conversation ID
+        max_tokens: History token budget (default: MAX_CONTEXT_TOKENS)
+    
+    Returns:
+        List of {"role", "content"} dicts in chronological order
+    """
+    if not settings.HISTORY_CACHE_ENABLED:
+        return await load_history_within_budget(db, conversation_id, max_tokens=max_tokens)
+    
+    cached = await _load_cached_conversation(db, conversation_id)
+    return _select_within_budget(cached["messages"], max_tokens or settings.MAX_CONTEXT_TOKENS)
+
+
+async def load_conversation_context(
+    db: AsyncSession,
+    conversation_id: str,
+    max_tokens: Optional[int] = None
+) -> Tuple[Optional[str], List[Dict]]:
+    """
+    Load the rolling summary plus the recent turns not yet covered by it.
+
+    Args:
+        db: Database session
+        conversation_id: Conversation ID
+        max_tokens: History token budget for the recent turns
+
+    Returns:
+        Tuple of (summary or None, recent message dicts in chronological order)
+    """
+    if settings.HISTORY_CACHE_ENABLED:
+        cached = await _load_cached_conversation(db, conversation_id)
+        summary = cached["summary"]
+        summarized_until = cached["summarized_until"] if summary else None
+        history = _select_within_budget(
+            cached["messages"],
+            max_tokens or settings.MAX_CONTEXT_TOKENS,
+            after=summarized_until
+        )
+        return summary, history
+    
+    summary_row = (await db.execute(
+        select(Conversation.summary, Conversation.summarized_until)
+        .where(Conversation.id == conversation_id)
+    )).first()
+
+    summary = summary_row.summary if summary_row else None
+    summarized_until = summary_row.summarized_until if summary and summary_row else None
+
+    history = await load_history_within_budget(
+        db,
+        conversation_id,
+        max_tokens=max_tokens,
+        after=summarized_until
+    )
+    return summary, history
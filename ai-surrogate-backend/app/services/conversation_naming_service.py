@@ -6,11 +6,14 @@ Automatically generates meaningful conversation titles using Mistral AI.
 
 import asyncio
 from typing import Optional
-from sqlalchemy.orm import Session
-from mistralai import Mistral
+from sqlalchemy import update
 
 from app.config import settings
+from app.database import AsyncSessionLocal
 from app.models import Conversation
+from app.services.chat_service import PLACEHOLDER_TITLE
+from app.services.llm_client import get_llm_client
+from app.services.llm_scheduler import BACKGROUND
 
 
 async def generate_conversation_title(
@@ -28,8 +31,6 @@ async def generate_conversation_title(
         Generated title (max 50 characters)
     """
     try:
-        client = Mistral(api_key=settings.MISTRAL_API_KEY)
-        
         # Create prompt for title generation
         context = f"User: {user_message}"
         if ai_response:
@@ -43,24 +44,28 @@ Conversation:
 
 Generate ONLY the title, nothing else. Be concise and specific."""
 
-        # Use Mistral small model for efficiency
-        response = client.chat.complete(
-            model="mistral-small-latest",
+        # Use Mistral small model for efficiency (shared pooled client)
+        response = await get_llm_client().complete(
             messages=[
                 {
                     "role": "user",
                     "content": prompt
                 }
             ],
+            model="mistral-small-latest",
             temperature=0.3,  # Lower temperature for more focused titles
-            max_tokens=20
+            max_tokens=20,
+            timeout=settings.LLM_TITLE_TIMEOUT_SECONDS,
+            priority=BACKGROUND
         )
         
         # Extract title
-        title = response.choices[0].message.content.strip()
+        title = response.strip()
         
         # Remove quotes if present
         title = title.strip('"\'')
+        if not title:
+            raise ValueError("Empty title returned by model")
         
         # Truncate if too long
         if len(title) > 50:
@@ -81,17 +86,18 @@ Generate ONLY the title, nothing else. Be concise and specific."""
 async def update_conversation_title_async(
     conversation_id: str,
     user_message: str,
-    ai_response: Optional[str],
-    db: Session
+    ai_response: Optional[str]
 ):
     """
     Update conversation title asynchronously (runs in background).
     
+    Uses its own session: the request's session is closed by the time
+    the title is ready.
+    
     Args:
         conversation_id: Conversation ID to update
         user_message: First user message
         ai_response: Optional AI response
-        db: Database session
     """
     try:
         print(f"🏷️ Generating title for conversation {conversation_id}...")
@@ -99,17 +105,24 @@ async def update_conversation_title_async(
         # Generate title
         title = await generate_conversation_title(user_message, ai_response)
         
-        # Update conversation in database
-        conversation = db.query(Conversation).filter(
-            Conversation.id == conversation_id
-        ).first()
+        # Update conversation in database. Naming may run on several early
+        # turns; only the first title to land replaces the placeholder, so a
+        # late fallback title never overwrites a generated one.
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(Conversation)
+                .where(
+                    Conversation.id == conversation_id,
+                    Conversation.title == PLACEHOLDER_TITLE
+                )
+                .values(title=title)
+            )
+            await db.commit()
         
-        if conversation:
-            conversation.title = title
-            db.commit()
+        if result.rowcount:
             print(f"✅ Conversation titled: '{title}'")
         else:
-            print(f"⚠️ Conversation {conversation_id} not found")
+            print(f"⚠️ Conversation {conversation_id} not found or already titled")
             
     except Exception as e:
         print(f"❌ Failed to update conversation title: {e}")
@@ -119,8 +132,7 @@ async def update_conversation_title_async(
 def trigger_conversation_naming(
     conversation_id: str,
     user_message: str,
-    ai_response: Optional[str],
-    db: Session
+    ai_response: Optional[str]
 ):
     """
     Trigger conversation naming in the background (non-blocking).
@@ -131,15 +143,13 @@ def trigger_conversation_naming(
         conversation_id: Conversation ID to update
         user_message: First user message
         ai_response: Optional AI response
-        db: Database session
     """
     # Create background task
     asyncio.create_task(
         update_conversation_title_async(
             conversation_id=conversation_id,
             user_message=user_message,
-            ai_response=ai_response,
-            db=db
+            ai_response=ai_response
         )
     )
     print(f"🚀 Background task started for conversation naming: {conversation_id}")
@@ -0,0 +1,60 @@
+"""
+Embedding Service
+
+Shared, lazily loaded MiniLM sentence-embedding model. One copy of the model
+serves the memory store, the response cache and the local classifiers.
+"""
+
+import logging
+import threading
+from typing import List, Optional
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    embeddings_available = True
+except ImportError:
+    np = None
+    SentenceTransformer = None
+    embeddings_available = False
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_embedding_model() -> Optional["SentenceTransformer"]:
+    """Load the MiniLM model once (None if sentence-transformers is not installed)."""
+    global _model
+    if _model is None and embeddings_available:
+        with _model_lock:
+            if _model is None:
+                _model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+                logger.info(f"✅ Embedding model loaded: {EMBEDDING_MODEL_NAME}")
+    return _model
+
+
+def embed_texts(texts: List[str]) -> Optional["np.ndarray"]:
+    """
+    Embed a batch of texts.
+
+    Args:
+        texts: Texts to embed
+
+    Returns:
+        Array of shape (len(texts), dim) with L2-normalized rows, so a dot
+        product is cosine similarity. None if embeddings are unavailable.
+    """
+    model = get_embedding_model()
+    if model is None:
+        return None
+    return model.encode(
+        texts,
+        batch_size=64,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    )
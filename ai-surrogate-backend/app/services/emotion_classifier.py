@@ -0,0 +1,281 @@
+"""
+Emotion Classifier - Local batch emotion scoring without LLM calls
+
+Live chat turns get their emotion from the model's own EMOTION tag. For
+re-analysing history (backfills, or after improving this model) that would
+mean one LLM call per message, so this classifier scores whole batches
+locally:
+
+- Emotion: nearest-centroid over MiniLM embeddings of labeled seed examples
+  (English, Roman Urdu, Urdu), nudged by a small keyword lexicon
+- Intensity: the estimate_intensity heuristic, computed for the whole batch
+  with NumPy
+
+Without sentence-transformers only the lexicon is used.
+"""
+
+import logging
+import re
+import threading
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from app.services.embeddings import embed_texts, embeddings_available
+
+logger = logging.getLogger(__name__)
+
+EMOTIONS = [
+    "happy", "excited", "sad", "angry", "frustrated",
+    "anxious", "confused", "grateful", "neutral",
+]
+
+# Labeled seed examples per emotion
+SEED_EXAMPLES: Dict[str, List[str]] = {
+    "happy": [
+        "I had such a great day today",
+        "I'm really happy with how things turned out",
+        "my exam went well and I feel good",
+        "aaj mera din bohat acha guzra",
+        "main bohat khush hoon",
+        "آج میں بہت خوش ہوں",
+    ],
+    "excited": [
+        "I got the job, I can't believe it!",
+        "we're going on a trip next week, so excited!!",
+        "I can't wait for the concert tomorrow",
+        "yaar kal ka plan zabardast hai!",
+        "mujhe bohat excitement ho rahi hai",
+        "میں بہت پرجوش ہوں",
+    ],
+    "sad": [
+        "I feel so lonely lately",
+        "I miss my grandmother so much",
+        "nothing is going right and I feel down",
+        "mera dil bohat udaas hai",
+        "mujhe rona aa raha hai",
+        "میں بہت اداس ہوں",
+    ],
+    "angry": [
+        "I'm so angry at my brother right now",
+        "this is outrageous, they lied to me",
+        "I hate how they treated me",
+        "mujhe bohat ghussa aa raha hai",
+        "usne mere saath bura kiya",
+        "مجھے بہت غصہ آ رہا ہے",
+    ],
+    "frustrated": [
+        "this code still doesn't work after hours",
+        "I keep trying and nothing changes",
+        "ugh, the internet is down again",
+        "kuch bhi theek nahi ho raha",
+        "main tang aa gaya hoon",
+        "میں تنگ آ گیا ہوں",
+    ],
+    "anxious": [
+        "I'm worried about my exams next week",
+        "I can't sleep, I keep overthinking",
+        "what if I fail the interview",
+        "mujhe bohat tension ho rahi hai",
+        "mujhe darr lag raha hai",
+        "مجھے بہت فکر ہو رہی ہے",
+    ],
+    "confused": [
+        "I don't understand how this works",
+        "can you explain that again, I'm lost",
+        "what does this error even mean",
+        "mujhe samajh nahi aa raha",
+        "yeh kaise karte hain",
+        "مجھے سمجھ نہیں آ رہا",
+    ],
+    "grateful": [
+        "thank you so much for your help",
+        "I really appreciate you listening",
+        "thanks, that helped a lot",
+        "bohat shukriya aapka",
+        "aap ka bohat meherbani",
+        "آپ کا بہت شکریہ",
+    ],
+    "neutral": [
+        "what's the weather like today",
+        "tell me about the history of Lahore",
+        "how do I make chai",
+        "ok",
+        "kal kya plan hai",
+        "لاہور کا موسم کیسا ہے",
+    ],
+}
+
+# Keywords that strongly signal an emotion
+EMOTION_LEXICON: Dict[str, List[str]] = {
+    "happy": ["happy", "glad", "great", "good day", "khush", "خوش"],
+    "excited": ["excited", "can't wait", "yay", "zabardast", "پرجوش"],
+    "sad": ["sad", "lonely", "depressed", "miss", "cry", "udaas", "rona", "اداس"],
+    "angry": ["angry", "furious", "hate", "ghussa", "غصہ"],
+    "frustrated": ["frustrated", "annoyed", "ugh", "fed up", "tang", "تنگ"],
+    "anxious": ["anxious", "worried", "nervous", "scared", "stress", "tension", "darr", "فکر"],
+    "confused": ["confused", "don't understand", "lost", "samajh nahi", "سمجھ نہیں"],
+    "grateful": ["thank", "thanks", "appreciate", "shukriya", "meherbani", "شکریہ"],
+    "neutral": [],
+}
+
+# Softmax temperature over cosine similarities: lower = sharper confidences
+_TEMPERATURE = 0.05
+# Logit boost per lexicon hit
+_LEXICON_WEIGHT = 0.05
+
+_REPEATED_CHAR_RE = re.compile(r"(.)\1{2,}")
+
+
+def _lexicon_pattern(words: List[str]) -> Optional["re.Pattern"]:
+    if not words:
+        return None
+    alternatives = "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+    return re.compile(rf"(?<!\w)(?:{alternatives})", re.IGNORECASE)
+
+
+_LEXICON_PATTERNS = [_lexicon_pattern(EMOTION_LEXICON.get(emotion, [])) for emotion in EMOTIONS]
+
+
+def estimate_intensity_batch(messages: List[str]) -> "np.ndarray":
+    """
+    Vectorized estimate_intensity for a batch of messages.
+
+    Args:
+        messages: User messages
+
+    Returns:
+        Array of intensity scores (0.0 to 1.0)
+    """
+    texts = np.array(messages, dtype=str)
+    exclamations = np.char.count(texts, "!")
+    questions = np.char.count(texts, "?")
+    shouting = np.char.isupper(texts) & (np.char.str_len(texts) > 5)
+    repeated = np.fromiter(
+        (_REPEATED_CHAR_RE.search(message) is not None for message in messages),
+        dtype=bool, count=len(messages)
+    )
+
+    intensity = (
+        0.3
+        + np.minimum(exclamations * 0.15, 0.4)
+        + 0.2 * shouting
+        + 0.1 * (questions > 1)
+        + 0.15 * repeated
+    )
+    return np.minimum(intensity, 1.0)
+
+
+class EmotionClassifier:
+    """
+    Batch emotion classifier: embedding centroids plus a keyword lexicon.
+    """
+
+    def __init__(self, examples: Optional[Dict[str, List[str]]] = None):
+        """
+        Args:
+            examples: Labeled examples per emotion (default: SEED_EXAMPLES)
+        """
+        self.examples = examples or SEED_EXAMPLES
+        self.labels = EMOTIONS
+        self._centroids = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return np is not None
+
+    def fit(self) -> bool:
+        """
+        Embed the seed examples and compute one centroid per emotion.
+
+        Returns:
+            True if embedding centroids are ready (lexicon-only otherwise)
+        """
+        if self._centroids is not None:
+            return True
+        if not embeddings_available:
+            return False
+        with self._lock:
+            if self._centroids is not None:
+                return True
+            texts = [text for label in self.labels for text in self.examples[label]]
+            embeddings = embed_texts(texts)
+            if embeddings is None:
+                return False
+
+            centroids = []
+            offset = 0
+            for label in self.labels:
+                count = len(self.examples[label])
+                centroid = embeddings[offset:offset + count].mean(axis=0)
+                centroids.append(centroid / np.linalg.norm(centroid))
+                offset += count
+            self._centroids = np.stack(centroids)
+            logger.info(f"✅ Emotion classifier ready ({len(texts)} seed examples, {len(self.labels)} emotions)")
+            return True
+
+    def _lexicon_counts(self, messages: List[str]) -> "np.ndarray":
+        """(messages x emotions) matrix of lexicon hits."""
+        counts = np.zeros((len(messages), len(self.labels)))
+        for column, pattern in enumerate(_LEXICON_PATTERNS):
+            if pattern is None:
+                continue
+            counts[:, column] = [len(pattern.findall(message)) for message in messages]
+        return counts
+
+    def classify_batch(self, messages: List[str]) -> List[Dict[str, float]]:
+        """
+        Score emotion, confidence and intensity for a batch of messages.
+
+        Args:
+            messages: User messages
+
+        Returns:
+            One dict per message with emotion, confidence, intensity
+        """
+        if not messages:
+            return []
+        if not self.available:
+            raise RuntimeError("numpy is required for batch emotion classification")
+
+        lexicon = self._lexicon_counts(messages)
+        if self.fit():
+            embeddings = embed_texts(messages)
+            logits = (embeddings @ self._centroids.T) / _TEMPERATURE
+            logits += lexicon * (_LEXICON_WEIGHT / _TEMPERATURE)
+        else:
+            # Lexicon only: neutral unless a keyword hits
+            logits = lexicon * 2.0
+            logits[:, self.labels.index("neutral")] += 0.5
+
+        logits -= logits.max(axis=1, keepdims=True)
+        scores = np.exp(logits)
+        probabilities = scores / scores.sum(axis=1, keepdims=True)
+        best = probabilities.argmax(axis=1)
+        confidence = probabilities[np.arange(len(messages)), best]
+        intensity = estimate_intensity_batch(messages)
+
+        return [
+            {
+                "emotion": self.labels[label],
+                "confidence": round(float(score), 3),
+                "intensity": round(float(level), 3),
+            }
+            for label, score, level in zip(best, confidence, intensity)
+        ]
+
+
+# Global emotion classifier instance
+_emotion_classifier = None
+
+
+def get_emotion_classifier() -> EmotionClassifier:
+    """Get or create global emotion classifier instance."""
+    global _emotion_classifier
+    if _emotion_classifier is None:
+        _emotion_classifier = EmotionClassifier()
+    return _emotion_classifier
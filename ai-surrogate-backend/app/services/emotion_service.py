@@ -2,14 +2,108 @@
 Emotion Detection Service
 
 Extracts emotion tags from AI responses.
+
+For streamed responses, EmotionTagStripper removes the trailing
+"EMOTION: x" line incrementally: it holds back only text that could still
+be the start of the tag, so everything else reaches the client at once.
 """
 
 import logging
 import re
-from typing import Optional, Dict, Tuple
+from typing import Optional, Dict, List, Tuple
 
 logger = logging.getLogger(__name__)
 
+_EMOTION_TAG_RE = re.compile(r'\s*EMOTION:\s*(\w+)\s*$', re.IGNORECASE)
+
+# Matches a suffix that could still grow into "EMOTION: <word>" at the end
+_TAG_PREFIX_RE = re.compile(
+    r'\s*(?:E(?:M(?:O(?:T(?:I(?:O(?:N(?::\s*(?:\w+\s*)?)?)?)?)?)?)?)?)?\Z',
+    re.IGNORECASE
+)
+
+
+def _build_emotion_data(user_message: str, emotion: Optional[str]) -> Dict[str, any]:
+    """Emotion dict for a tagged emotion, or the neutral fallback."""
+    intensity = estimate_intensity(user_message)
+    if emotion:
+        # High confidence since AI explicitly tagged it
+        return {"emotion": emotion.lower(), "confidence": 0.9, "intensity": intensity}
+    return {"emotion": "neutral", "confidence": 0.5, "intensity": intensity}
+
+
+class EmotionTagStripper:
+    """
+    Streaming parser that strips the trailing EMOTION tag chunk by chunk.
+    
+    Usage:
+        stripper = EmotionTagStripper()
+        for chunk in stream:
+            text = stripper.feed(chunk)   # safe to send ("" while held back)
+        text = stripper.finish()          # remaining text, tag removed
+        stripper.emotion                  # "sad", or None if untagged
+    """
+    
+    def __init__(self):
+        self._pending = ""
+        self._emitted: List[str] = []
+        self.emotion: Optional[str] = None
+    
+    def _emit(self, text: str) -> str:
+        if text:
+            self._emitted.append(text)
+        return text
+    
+    def feed(self, chunk: str) -> str:
+        """
+        Add a streamed chunk.
+        
+        Args:
+            chunk: Next piece of the AI response
+            
+        Returns:
+            Text that can no longer be part of the tag (may be empty)
+        """
+        text = self._pending + chunk
+        held_from = _TAG_PREFIX_RE.search(text).start()
+        self._pending = text[held_from:]
+        return self._emit(text[:held_from])
+    
+    def finish(self) -> str:
+        """
+        End of stream: strip the tag if present and release the rest.
+        
+        Returns:
+            Remaining text without the EMOTION tag
+        """
+        text, self._pending = self._pending, ""
+        match = _EMOTION_TAG_RE.search(text)
+        if match:
+            self.emotion = match.group(1).lower()
+            text = text[:match.start()]
+        return self._emit(text)
+    
+    @property
+    def clean_response(self) -> str:
+        """Everything emitted so far, stripped like extract_emotion_from_response."""
+        return "".join(self._emitted).strip()
+    
+    def emotion_data(self, user_message: str) -> Dict[str, any]:
+        """
+        Emotion dict for the finished stream.
+        
+        Args:
+            user_message: Original user message (for intensity)
+            
+        Returns:
+            dict with emotion, confidence, intensity
+        """
+        if self.emotion:
+            logger.info(f"✅ Emotion extracted: {self.emotion} (confidence: 90%)")
+        else:
+            logger.warning("⚠️ No EMOTION tag found in AI response")
+        return _build_emotion_data(user_message, self.emotion)
+
 
 def extract_emotion_from_response(
     user_message: str,
@@ -32,44 +126,20 @@ def extract_emotion_from_response(
     """
     
     # Look for EMOTION tag (can be on same line or new line)
-    emotion_pattern = r'\s*EMOTION:\s*(\w+)\s*$'
-    match = re.search(emotion_pattern, ai_response, re.IGNORECASE)
+    match = _EMOTION_TAG_RE.search(ai_response)
     
     if match:
-        # Extract emotion
-        detected_emotion = match.group(1).lower()
-        
         # Remove EMOTION tag from response
-        clean_response = re.sub(emotion_pattern, '', ai_response, flags=re.IGNORECASE).strip()
+        clean_response = ai_response[:match.start()].strip()
+        emotion_data = _build_emotion_data(user_message, match.group(1))
         
-        # Estimate intensity from user message
-        intensity = estimate_intensity(user_message)
-        
-        # High confidence since AI explicitly tagged it
-        confidence = 0.9
-        
-        emotion_data = {
-            "emotion": detected_emotion,
-            "confidence": confidence,
-            "intensity": intensity
-        }
-        
-        logger.info(f"✅ Emotion extracted: {detected_emotion} (confidence: {confidence:.0%})")
+        logger.info(f"✅ Emotion extracted: {emotion_data['emotion']} (confidence: {emotion_data['confidence']:.0%})")
         return clean_response, emotion_data
     
     else:
         # Fallback: No emotion tag found
         logger.warning("⚠️ No EMOTION tag found in AI response")
-        
-        intensity = estimate_intensity(user_message)
-        
-        emotion_data = {
-            "emotion": "neutral",
-            "confidence": 0.5,
-            "intensity": intensity
-        }
-        
-        return ai_response, emotion_data
+        return ai_response, _build_emotion_data(user_message, None)
 
 
 def estimate_intensity(message: str) -> float:
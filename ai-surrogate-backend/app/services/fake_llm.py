@@ -0,0 +1,370 @@
+"""
+Fake LLM - Offline stand-in for the Mistral API
+
+Lets the chat path be load-tested and benchmarked without network access or
+Mistral quota. Two ways to use it:
+
+- In-process: set LLM_PROVIDER=fake. The shared LLM client then uses
+  FakeMistral, which exposes the same ``chat.complete_async`` /
+  ``chat.stream_async`` surface as ``mistralai.Mistral``.
+- HTTP server: run ``python -m app.services.fake_llm --port 8765`` and set
+  MISTRAL_SERVER_URL=http://localhost:8765. It serves a Mistral-compatible
+  ``POST /v1/chat/completions`` (JSON or SSE streaming), so the real
+  ``mistralai`` client is exercised end to end.
+
+Behaviour is configured with FAKE_LLM_* settings: time to first token,
+tokens per second, error rate, and a JSON script of
+``{"match": regex, "response": text}`` rules matched against the last user
+message. Chat replies end with an ``EMOTION:`` tag like the real prompt asks
+for. Models whose name contains "small" answer twice as fast.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import re
+import time
+import uuid
+from types import SimpleNamespace
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\S+\s*|\s+")
+_URDU_RE = re.compile("[\u0600-\u06FF]")
+_GURMUKHI_RE = re.compile("[\u0A00-\u0A7F]")
+
+# Built-in rules for the app's own utility prompts (intent, titles, summaries)
+_DEFAULT_SCRIPT = [
+    {"match": r"Respond with ONLY one word", "response": "chat"},
+    {"match": r"generate a short, descriptive title", "response": "Friendly Chat"},
+    {"match": r"running summary of a conversation", "response": "The user is having a friendly chat with the assistant."},
+]
+
+_EMOTION_KEYWORDS = [
+    ("grateful", ("thank", "shukriya")),
+    ("sad", ("sad", "lonely", "udaas")),
+    ("anxious", ("worried", "anxious", "nervous")),
+    ("angry", ("angry", "hate")),
+    ("happy", ("happy", "great", "awesome", "khush")),
+]
+
+_FILLER = (
+    "Thanks for sharing that with me. Here is a thoughtful reply from the local "
+    "test model, long enough to exercise streaming, token pacing and formatting "
+    "on the client. Let me know what else you would like to talk about today."
+)
+
+
+class FakeLLMError(RuntimeError):
+    """Simulated upstream failure (like an HTTP 503 from Mistral)."""
+
+
+class FakeMistral:
+    """
+    Drop-in replacement for ``mistralai.Mistral`` chat calls.
+    """
+
+    def __init__(
+        self,
+        ttft_ms: Optional[float] = None,
+        tokens_per_sec: Optional[float] = None,
+        error_rate: Optional[float] = None,
+        script: Optional[List[Dict]] = None,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            ttft_ms: Delay before the first token (default: FAKE_LLM_TTFT_MS)
+            tokens_per_sec: Streaming rate (default: FAKE_LLM_TOKENS_PER_SEC)
+            error_rate: Fraction of calls that fail (default: FAKE_LLM_ERROR_RATE)
+            script: Response rules (default: loaded from FAKE_LLM_SCRIPT_PATH)
+            seed: Random seed for reproducible error injection
+        """
+        self.ttft_ms = settings.FAKE_LLM_TTFT_MS if ttft_ms is None else ttft_ms
+        self.tokens_per_sec = settings.FAKE_LLM_TOKENS_PER_SEC if tokens_per_sec is None else tokens_per_sec
+        self.error_rate = settings.FAKE_LLM_ERROR_RATE if error_rate is None else error_rate
+        if script is None:
+            script = self._load_script(settings.FAKE_LLM_SCRIPT_PATH)
+        self._rules = [
+            (re.compile(rule["match"], re.IGNORECASE | re.DOTALL), rule["response"])
+            for rule in script + _DEFAULT_SCRIPT
+        ]
+        self._random = random.Random(seed)
+        self.chat = SimpleNamespace(
+            complete_async=self.complete_async,
+            stream_async=self.stream_async,
+        )
+        logger.info(
+            f"🧪 Fake LLM active (ttft {self.ttft_ms:.0f}ms, {self.tokens_per_sec:.0f} tok/s, "
+            f"error rate {self.error_rate:.0%}, {len(script)} scripted rules)"
+        )
+
+    @staticmethod
+    def _load_script(path: str) -> List[Dict]:
+        if not path:
+            return []
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    # ------------------------------------------------------------------
+    # Response generation
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _last_user_message(messages: List[Dict]) -> str:
+        for message in reversed(messages):
+            role = message.get("role") if isinstance(message, dict) else getattr(message, "role", None)
+            if role == "user":
+                content = message.get("content") if isinstance(message, dict) else message.content
+                return content if isinstance(content, str) else str(content)
+        return ""
+
+    @staticmethod
+    def _emotion_for(text: str) -> str:
+        lowered = text.lower()
+        for emotion, keywords in _EMOTION_KEYWORDS:
+            if any(keyword in lowered for keyword in keywords):
+                return emotion
+        return "neutral"
+
+    def respond(self, messages: List[Dict]) -> str:
+        """Full response text for a request (scripted, or a canned chat reply)."""
+        prompt = self._last_user_message(messages)
+        for pattern, response in self._rules:
+            if pattern.search(prompt):
+                return response
+
+        if _URDU_RE.search(prompt):
+            body = "آپ کا پیغام ملا، شکریہ! میں مقامی ٹیسٹ ماڈل ہوں اور آپ کی بات سن رہا ہوں۔ آج آپ کس بارے میں بات کرنا چاہیں گے؟"
+        elif _GURMUKHI_RE.search(prompt):
+            body = "ਤੁਹਾਡਾ ਸੁਨੇਹਾ ਮਿਲ ਗਿਆ, ਧੰਨਵਾਦ! ਮੈਂ ਲੋਕਲ ਟੈਸਟ ਮਾਡਲ ਹਾਂ। ਅੱਜ ਤੁਸੀਂ ਕਿਸ ਬਾਰੇ ਗੱਲ ਕਰਨਾ ਚਾਹੋਗੇ?"
+        else:
+            body = _FILLER
+        return f"{body}\n\nEMOTION: {self._emotion_for(prompt)}"
+
+    def _check_error(self) -> None:
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise FakeLLMError("Simulated upstream error (503 Service Unavailable)")
+
+    def _ttft_seconds(self, model: str) -> float:
+        speedup = 2 if "small" in model else 1
+        return self.ttft_ms / 1000 / speedup
+
+    def _token_interval(self, model: str) -> float:
+        if not self.tokens_per_sec:
+            return 0.0
+        speedup = 2 if "small" in model else 1
+        return 1 / (self.tokens_per_sec * speedup)
+
+    @staticmethod
+    def _usage(messages: List[Dict], completion_tokens: int) -> SimpleNamespace:
+        prompt_tokens = sum(
+            len(m.get("content") or "") // 4 + 1 for m in messages if isinstance(m, dict)
+        )
+        return SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+        )
+
+    async def generate(
+        self,
+        model: str,
+        messages: List[Dict],
+        max_tokens: Optional[int] = None,
+        inject_errors: bool = True
+    ) -> AsyncIterator[str]:
+        """
+        Yield response tokens with the configured pacing.
+
+        Raises:
+            FakeLLMError: For the configured share of calls, before any token
+        """
+        if inject_errors:
+            self._check_error()
+        tokens = _TOKEN_RE.findall(self.respond(messages))
+        if max_tokens:
+            tokens = tokens[:max_tokens]
+
+        await asyncio.sleep(self._ttft_seconds(model))
+        interval = self._token_interval(model)
+        for index, token in enumerate(tokens):
+            if index and interval:
+                await asyncio.sleep(interval)
+            yield token
+
+    # ------------------------------------------------------------------
+    # mistralai-compatible surface
+    # ------------------------------------------------------------------
+
+    async def complete_async(
+        self,
+        model: str,
+        messages: List[Dict],
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> SimpleNamespace:
+        """Same shape as ``Mistral.chat.complete_async`` responses."""
+        tokens = [token async for token in self.generate(model, messages, max_tokens)]
+        return SimpleNamespace(
+            id=f"fake-{uuid.uuid4().hex[:12]}",
+            model=model,
+            usage=self._usage(messages, len(tokens)),
+            choices=[SimpleNamespace(
+                index=0,
+                message=SimpleNamespace(role="assistant", content="".join(tokens)),
+                finish_reason="stop",
+            )],
+        )
+
+    async def stream_async(
+        self,
+        model: str,
+        messages: List[Dict],
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[SimpleNamespace]:
+        """Same shape as ``Mistral.chat.stream_async`` events (``event.data``)."""
+        # Like the SDK, errors surface when the stream is opened
+        self._check_error()
+        return self._events(model, messages, max_tokens)
+
+    async def _events(
+        self,
+        model: str,
+        messages: List[Dict],
+        max_tokens: Optional[int]
+    ) -> AsyncIterator[SimpleNamespace]:
+        completion_id = f"fake-{uuid.uuid4().hex[:12]}"
+        count = 0
+        async for token in self.generate(model, messages, max_tokens, inject_errors=False):
+            count += 1
+            yield SimpleNamespace(data=SimpleNamespace(
+                id=completion_id,
+                model=model,
+                usage=None,
+                choices=[SimpleNamespace(
+                    index=0,
+                    delta=SimpleNamespace(content=token),
+                    finish_reason=None,
+                )],
+            ))
+
+        yield SimpleNamespace(data=SimpleNamespace(
+            id=completion_id,
+            model=model,
+            usage=self._usage(messages, count),
+            choices=[SimpleNamespace(
+                index=0,
+                delta=SimpleNamespace(content=""),
+                finish_reason="stop",
+            )],
+        ))
+
+
+# ----------------------------------------------------------------------
+# HTTP server mode
+# ----------------------------------------------------------------------
+
+def create_app(fake: Optional[FakeMistral] = None):
+    """FastAPI app serving a Mistral-compatible chat completions endpoint."""
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse, StreamingResponse
+
+    fake = fake or FakeMistral()
+    app = FastAPI(title="Fake Mistral API")
+
+    def _usage_dict(usage: SimpleNamespace) -> Dict:
+        return {
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "total_tokens": usage.total_tokens,
+        }
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "mistral-large-latest")
+        messages = body.get("messages", [])
+        max_tokens = body.get("max_tokens")
+
+        try:
+            fake._check_error()
+        except FakeLLMError as e:
+            return JSONResponse(status_code=503, content={"object": "error", "message": str(e)})
+
+        completion_id = f"fake-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            tokens = [
+                token async for token in fake.generate(model, messages, max_tokens, inject_errors=False)
+            ]
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "model": model,
+                "created": created,
+                "usage": _usage_dict(fake._usage(messages, len(tokens))),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": "stop",
+                }],
+            }
+
+        async def sse() -> AsyncIterator[str]:
+            async for event in fake._events(model, messages, max_tokens):
+                chunk = event.data
+                choice = chunk.choices[0]
+                payload = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "model": model,
+                    "created": created,
+                    "choices": [{
+                        "index": 0,
+                        "delta": {"role": "assistant", "content": choice.delta.content},
+                        "finish_reason": choice.finish_reason,
+                    }],
+                }
+                if chunk.usage is not None:
+                    payload["usage"] = _usage_dict(chunk.usage)
+                yield f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(sse(), media_type="text/event-stream")
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a local Mistral-compatible fake LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ttft-ms", type=float, default=None, help="Time to first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=None, help="Streaming rate")
+    parser.add_argument("--error-rate", type=float, default=None, help="Fraction of failing calls (0-1)")
+    parser.add_argument("--script", default=None, help="JSON file of {match, response} rules")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for error injection")
+    args = parser.parse_args()
+
+    fake = FakeMistral(
+        ttft_ms=args.ttft_ms,
+        tokens_per_sec=args.tokens_per_sec,
+        error_rate=args.error_rate,
+        script=FakeMistral._load_script(args.script) if args.script else None,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(fake), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,451 @@
+"""
+History Cache - Per-conversation ring buffer of recent messages
+
+Context assembly needs the rolling summary plus the most recent messages of
+a conversation on every turn. This cache keeps exactly that per active
+conversation, so building the prompt needs no database reads:
+
+- L1: in-process LRU of conversations, each holding its summary and a ring
+  buffer of the last MAX_CONTEXT_SCAN_MESSAGES messages
+- L2 (optional, REDIS_URL): the same data in Redis, shared by all workers
+
+Every message write appends to the buffer; summary refreshes update it;
+deleting a conversation invalidates it. A conversation that is not cached
+is loaded from the database once and then kept up to date.
+
+Every change also bumps the conversation's generation. A database load
+notes the generation first (begin_load) and its snapshot is stored only if
+nothing changed meanwhile, so a message written during the load is never
+lost behind a stale snapshot.
+
+With Redis, each change stamps the conversation with a new version token.
+A read compares the local copy's token with Redis (one HGET) and reloads
+from Redis when another worker changed it. Without Redis the cache is only
+correct within one process, so multi-worker deployments should set
+REDIS_URL or disable the cache.
+"""
+
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# KEYS: meta hash, messages list, generation. ARGV: generation seen before the
+# load ('*': unconditional), ttl, summary, summarized_until, version, messages...
+# Returns 0 without storing if the conversation changed since the load began.
+_STORE_SCRIPT = """
+local generation = redis.call('GET', KEYS[3]) or ''
+if ARGV[1] ~= '*' and generation ~= ARGV[1] then return 0 end
+redis.call('DEL', KEYS[2])
+if #ARGV > 5 then
+    redis.call('RPUSH', KEYS[2], unpack(ARGV, 6))
+    redis.call('EXPIRE', KEYS[2], ARGV[2])
+end
+redis.call('HSET', KEYS[1], 'summary', ARGV[3], 'summarized_until', ARGV[4], 'version', ARGV[5])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('INCR', KEYS[3])
+redis.call('EXPIRE', KEYS[3], ARGV[2])
+return 1
+"""
+
+# KEYS: meta hash, messages list, generation. ARGV: message json, max length, new version, ttl.
+# Appends only to conversations already cached; returns the previous version.
+_APPEND_SCRIPT = """
+redis.call('INCR', KEYS[3])
+redis.call('EXPIRE', KEYS[3], ARGV[4])
+local previous = redis.call('HGET', KEYS[1], 'version')
+if not previous then return false end
+redis.call('RPUSH', KEYS[2], ARGV[1])
+redis.call('LTRIM', KEYS[2], -tonumber(ARGV[2]), -1)
+redis.call('HSET', KEYS[1], 'version', ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+return previous
+"""
+
+# KEYS: meta hash, generation. ARGV: summary, summarized_until, new version, ttl.
+_SUMMARY_SCRIPT = """
+redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+local previous = redis.call('HGET', KEYS[1], 'version')
+if not previous then return false end
+redis.call('HSET', KEYS[1], 'summary', ARGV[1], 'summarized_until', ARGV[2], 'version', ARGV[3])
+return previous
+"""
+
+
+def estimate_tokens(content: str) -> int:
+    """Length-based estimate for rows created before token counting."""
+    return len(content) // 2 + 1
+
+
+def _encode_time(value: Optional[datetime]) -> str:
+    return value.isoformat() if value else ""
+
+
+def _decode_time(value) -> Optional[datetime]:
+    if isinstance(value, bytes):
+        value = value.decode()
+    return datetime.fromisoformat(value) if value else None
+
+
+class HistoryCache:
+    """
+    Two-level cache of conversation summaries and recent messages.
+    """
+
+    def __init__(
+        self,
+        max_messages: int = 50,
+        max_conversations: int = 1000,
+        ttl_seconds: float = 3600,
+        redis_url: str = ""
+    ):
+        """
+        Args:
+            max_messages: Ring buffer size per conversation
+            max_conversations: Conversations kept in process (least recently used evicted)
+            ttl_seconds: Seconds an idle conversation stays cached
+            redis_url: Optional Redis URL for the shared L2
+        """
+        self.max_messages = max_messages
+        self.max_conversations = max_conversations
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        # Database loads in flight per conversation; any change clears them
+        self._loading: Dict[str, set] = {}
+        self._stats = {
+            "l1_hits": 0, "l2_hits": 0, "misses": 0, "appends": 0, "invalidations": 0,
+            "stale_stores": 0, "redis_errors": 0,
+        }
+
+        self._redis = None
+        if redis_url:
+            if aioredis is None:
+                logger.warning("⚠️ REDIS_URL is set but redis is not installed, history cache is in-process only")
+            else:
+                self._redis = aioredis.from_url(redis_url)
+                self._store_script = self._redis.register_script(_STORE_SCRIPT)
+                self._append_script = self._redis.register_script(_APPEND_SCRIPT)
+                self._summary_script = self._redis.register_script(_SUMMARY_SCRIPT)
+
+    @staticmethod
+    def _keys(conversation_id: str):
+        return f"history:{conversation_id}:meta", f"history:{conversation_id}:messages"
+
+    @staticmethod
+    def _generation_key(conversation_id: str) -> str:
+        return f"history:{conversation_id}:generation"
+
+    @staticmethod
+    def message_entry(role: str, content: str, tokens: Optional[int], created_at: datetime) -> Dict:
+        """Cached form of one message."""
+        return {
+            "role": role,
+            "content": content,
+            "tokens": tokens if tokens is not None else estimate_tokens(content),
+            "created_at": created_at,
+        }
+
+    def _remember(self, conversation_id: str, entry: Dict) -> Dict:
+        entry["expires_at"] = time.monotonic() + self.ttl_seconds
+        self._entries[conversation_id] = entry
+        self._entries.move_to_end(conversation_id)
+        while len(self._entries) > self.max_conversations:
+            self._entries.popitem(last=False)
+        return entry
+
+    def _local(self, conversation_id: str) -> Optional[Dict]:
+        entry = self._entries.get(conversation_id)
+        if entry is None:
+            return None
+        if entry["expires_at"] < time.monotonic():
+            del self._entries[conversation_id]
+            return None
+        self._entries.move_to_end(conversation_id)
+        return entry
+
+    async def get(self, conversation_id: str) -> Optional[Dict]:
+        """
+        Cached state of a conversation.
+
+        Returns:
+            Dict with summary, summarized_until and messages (oldest first,
+            each with role, content, tokens, created_at), or None on a miss
+        """
+        conversation_id = str(conversation_id)
+        entry = self._local(conversation_id)
+
+        if self._redis is not None:
+            try:
+                meta_key, messages_key = self._keys(conversation_id)
+                version = await self._redis.hget(meta_key, "version")
+                if version is None:
+                    self._entries.pop(conversation_id, None)
+                    self._stats["misses"] += 1
+                    return None
+                version = version.decode()
+                if entry is None or entry["version"] != version:
+                    async with self._redis.pipeline(transaction=True) as pipe:
+                        meta, raw_messages = await pipe.hgetall(meta_key).lrange(messages_key, 0, -1).execute()
+                    if not meta:
+                        self._stats["misses"] += 1
+                        return None
+                    messages = [json.loads(raw) for raw in raw_messages]
+                    for message in messages:
+                        message["created_at"] = _decode_time(message["created_at"])
+                    entry = self._remember(conversation_id, {
+                        "version": meta[b"version"].decode(),
+                        "summary": meta[b"summary"].decode() or None,
+                        "summarized_until": _decode_time(meta[b"summarized_until"]),
+                        "messages": deque(messages, maxlen=self.max_messages),
+                    })
+                    self._stats["l2_hits"] += 1
+                    return entry
+            except Exception as e:
+                self._stats["redis_errors"] += 1
+                logger.warning(f"⚠️ History cache Redis read failed: {e}")
+                self._stats["misses"] += 1
+                return None
+
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+        self._stats["l1_hits"] += 1
+        return entry
+
+    async def begin_load(self, conversation_id: str) -> Dict:
+        """
+        Note the conversation's generation before loading it from the database.
+
+        Call this before reading the database and pass the result to store(),
+        which then stores nothing if the conversation changed in between.
+
+        Returns:
+            Load token for store()
+        """
+        conversation_id = str(conversation_id)
+        if len(self._loading) >= self.max_conversations:
+            # Loads that never stored (e.g. failed) are dropped wholesale;
+            # their stores, if any still come, are simply skipped
+            self._loading.clear()
+        token = {"load": uuid.uuid4().hex, "generation": ""}
+        self._loading.setdefault(conversation_id, set()).add(token["load"])
+
+        if self._redis is not None:
+            try:
+                generation = await self._redis.get(self._generation_key(conversation_id))
+                token["generation"] = generation.decode() if generation else ""
+            except Exception as e:
+                self._stats["redis_errors"] += 1
+                logger.warning(f"⚠️ History cache Redis read failed: {e}")
+        return token
+
+    def _changed(self, conversation_id: str) -> None:
+        """Invalidate this process's loads of a conversation in flight."""
+        self._loading.pop(conversation_id, None)
+
+    async def store(
+        self,
+        conversation_id: str,
+        summary: Optional[str],
+        summarized_until: Optional[datetime],
+        messages: List[Dict],
+        load_token: Optional[Dict] = None
+    ) -> bool:
+        """
+        Cache a conversation loaded from the database.
+
+        Args:
+            conversation_id: Conversation ID
+            summary: Rolling summary (None if none yet)
+            summarized_until: created_at of the last summarized message
+            messages: The conversation's most recent messages, oldest first
+            load_token: Result of begin_load() before the database read; None
+                stores unconditionally (e.g. a conversation just created)
+
+        Returns:
+            False if the snapshot was discarded as stale
+        """
+        conversation_id = str(conversation_id)
+        if load_token is not None and load_token["load"] not in self._loading.get(conversation_id, ()):
+            self._stats["stale_stores"] += 1
+            return False
+        self._changed(conversation_id)
+        version = uuid.uuid4().hex
+
+        if self._redis is not None:
+            try:
+                meta_key, messages_key = self._keys(conversation_id)
+                stored = await self._store_script(
+                    keys=[meta_key, messages_key, self._generation_key(conversation_id)],
+                    args=[
+                        load_token["generation"] if load_token is not None else "*",
+                        int(self.ttl_seconds),
+                        summary or "",
+                        _encode_time(summarized_until),
+                        version,
+                        *[
+                            json.dumps({**message, "created_at": _encode_time(message["created_at"])})
+                            for message in messages[-self.max_messages:]
+                        ],
+                    ],
+                )
+            except Exception as e:
+                self._stats["redis_errors"] += 1
+                logger.warning(f"⚠️ History cache Redis store failed: {e}")
+                return False
+            if not stored:
+                # Another worker changed the conversation during our load
+                self._stats["stale_stores"] += 1
+                return False
+
+        self._remember(conversation_id, {
+            "version": version,
+            "summary": summary,
+            "summarized_until": summarized_until,
+            "messages": deque(messages, maxlen=self.max_messages),
+        })
+        return True
+
+    async def append(self, conversation_id: str, message: Dict) -> None:
+        """
+        Add a newly written message to a cached conversation (no-op if not cached).
+
+        Args:
+            conversation_id: Conversation ID
+            message: Entry from message_entry()
+        """
+        conversation_id = str(conversation_id)
+        self._changed(conversation_id)
+        entry = self._local(conversation_id)
+        version = uuid.uuid4().hex
+
+        if self._redis is not None:
+            try:
+                meta_key, messages_key = self._keys(conversation_id)
+                previous = await self._append_script(
+                    keys=[meta_key, messages_key, self._generation_key(conversation_id)],
+                    args=[
+                        json.dumps({**message, "created_at": _encode_time(message["created_at"])}),
+                        self.max_messages,
+                        version,
+                        int(self.ttl_seconds),
+                    ],
+                )
+            except Exception as e:
+                # Redis may now lack this message; drop it there so no worker reads a gap
+                self._stats["redis_errors"] += 1
+                logger.warning(f"⚠️ History cache Redis append failed: {e}")
+                await self.invalidate(conversation_id)
+                return
+            if entry is not None and (previous is None or previous.decode() != entry["version"]):
+                # Another worker changed it since we cached it; reload on next read
+                self._entries.pop(conversation_id, None)
+                return
+
+        if entry is not None:
+            entry["messages"].append(message)
+            entry["version"] = version
+            self._stats["appends"] += 1
+
+    async def update_summary(
+        self,
+        conversation_id: str,
+        summary: str,
+        summarized_until: Optional[datetime]
+    ) -> None:
+        """Record a refreshed rolling summary (no-op if not cached)."""
+        conversation_id = str(conversation_id)
+        self._changed(conversation_id)
+        entry = self._local(conversation_id)
+        version = uuid.uuid4().hex
+
+        if self._redis is not None:
+            try:
+                meta_key, _ = self._keys(conversation_id)
+                previous = await self._summary_script(
+                    keys=[meta_key, self._generation_key(conversation_id)],
+                    args=[summary, _encode_time(summarized_until), version, int(self.ttl_seconds)],
+                )
+            except Exception as e:
+                self._stats["redis_errors"] += 1
+                logger.warning(f"⚠️ History cache Redis summary update failed: {e}")
+                await self.invalidate(conversation_id)
+                return
+            if entry is not None and (previous is None or previous.decode() != entry["version"]):
+                self._entries.pop(conversation_id, None)
+                return
+
+        if entry is not None:
+            entry["summary"] = summary
+            entry["summarized_until"] = summarized_until
+            entry["version"] = version
+
+    async def invalidate(self, conversation_id: str) -> None:
+        """Forget a conversation in both levels (e.g. after it was deleted)."""
+        conversation_id = str(conversation_id)
+        self._changed(conversation_id)
+        self._entries.pop(conversation_id, None)
+        self._stats["invalidations"] += 1
+        if self._redis is not None:
+            try:
+                generation_key = self._generation_key(conversation_id)
+                async with self._redis.pipeline(transaction=True) as pipe:
+                    pipe.delete(*self._keys(conversation_id))
+                    pipe.incr(generation_key)
+                    pipe.expire(generation_key, int(self.ttl_seconds))
+                    await pipe.execute()
+            except Exception as e:
+                self._stats["redis_errors"] += 1
+                logger.warning(f"⚠️ History cache Redis invalidate failed: {e}")
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and cache size."""
+        return {
+            **self._stats,
+            "conversations": len(self._entries),
+            "redis": self._redis is not None,
+        }
+
+    async def aclose(self) -> None:
+        """Close the Redis connection pool."""
+        if self._redis is not None:
+            await self._redis.aclose()
+
+
+# Global history cache instance
+_history_cache = None
+
+
+def get_history_cache() -> HistoryCache:
+    """Get or create global history cache instance."""
+    global _history_cache
+    if _history_cache is None:
+        _history_cache = HistoryCache(
+            max_messages=settings.MAX_CONTEXT_SCAN_MESSAGES,
+            max_conversations=settings.HISTORY_CACHE_MAX_CONVERSATIONS,
+            ttl_seconds=settings.HISTORY_CACHE_TTL_SECONDS,
+            redis_url=settings.REDIS_URL
+        )
+    return _history_cache
+
+
+async def close_history_cache() -> None:
+    """Close the global history cache (called on application shutdown)."""
+    global _history_cache
+    if _history_cache is not None:
+        await _history_cache.aclose()
+        _history_cache = None
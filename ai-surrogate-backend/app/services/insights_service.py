@@ -6,10 +6,10 @@ Provides analytics and insights from mood and emotion data.
 
 from typing import Dict, List
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, desc, select
 
-from app.models import MoodEntry, EmotionHistory, Message, User
+from app.models import Conversation, MoodEntry, EmotionHistory, Message, User
 from app.services.mood_service import MoodService
 
 
@@ -17,8 +17,8 @@ class InsightsService:
     """Service for generating user insights and analytics."""
     
     @staticmethod
-    def get_summary(
-        db: Session,
+    async def get_summary(
+        db: AsyncSession,
         user_id: str,
         period: str = 'week'
     ) -> Dict:
@@ -35,19 +35,20 @@ class InsightsService:
         """
         days = InsightsService._get_days_from_period(period)
         
+        # Awaited one after another: an AsyncSession runs one query at a time
         return {
-            'wellness_score': InsightsService.calculate_wellness_score(db, user_id, days),
-            'emotion_timeline': InsightsService.get_emotion_timeline(db, user_id, days),
-            'emotion_distribution': InsightsService.get_emotion_distribution(db, user_id, days),
-            'conversation_stats': InsightsService.get_conversation_stats(db, user_id, days),
-            'mood_stats': MoodService.get_mood_stats(db, user_id, days),
+            'wellness_score': await InsightsService.calculate_wellness_score(db, user_id, days),
+            'emotion_timeline': await InsightsService.get_emotion_timeline(db, user_id, days),
+            'emotion_distribution': await InsightsService.get_emotion_distribution(db, user_id, days),
+            'conversation_stats': await InsightsService.get_conversation_stats(db, user_id, days),
+            'mood_stats': await MoodService.get_mood_stats(db, user_id, days),
             'period': period,
             'period_days': days
         }
     
     @staticmethod
-    def calculate_wellness_score(
-        db: Session,
+    async def calculate_wellness_score(
+        db: AsyncSession,
         user_id: str,
         days: int = 7
     ) -> int:
@@ -63,16 +64,16 @@ class InsightsService:
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         
         # Get mood data
-        mood_entries = db.query(MoodEntry).filter(
+        mood_entries = (await db.scalars(select(MoodEntry).filter(
             MoodEntry.user_id == user_id,
             MoodEntry.created_at >= cutoff_date
-        ).all()
+        ))).all()
         
         # Get emotion data
-        emotions = db.query(EmotionHistory).filter(
+        emotions = (await db.scalars(select(EmotionHistory).filter(
             EmotionHistory.user_id == user_id,
             EmotionHistory.detected_at >= cutoff_date
-        ).all()
+        ))).all()
         
         score = 50.0  # Base score (use float)
         
@@ -95,10 +96,10 @@ class InsightsService:
             score += float(positive_ratio * 20)
         
         # Factor 4: Engagement (0-10 points)
-        message_count = db.query(func.count(Message.id)).filter(
+        message_count = (await db.scalar(select(func.count(Message.id)).filter(
             Message.user_id == user_id,
             Message.created_at >= cutoff_date
-        ).scalar() or 0
+        ))) or 0
         
         if message_count > 0:
             score += float(min(message_count / 10, 10))
@@ -106,8 +107,8 @@ class InsightsService:
         return min(int(score), 100)
     
     @staticmethod
-    def get_emotion_timeline(
-        db: Session,
+    async def get_emotion_timeline(
+        db: AsyncSession,
         user_id: str,
         days: int = 7
     ) -> List[Dict]:
@@ -125,10 +126,10 @@ class InsightsService:
         }
         
         # Get daily averages from mood entries
-        mood_timeline = MoodService.get_mood_timeline(db, user_id, days)
+        mood_timeline = await MoodService.get_mood_timeline(db, user_id, days)
         
         # Get daily averages from detected emotions
-        emotion_daily = db.query(
+        emotion_daily = (await db.execute(select(
             func.date(EmotionHistory.detected_at).label('date'),
             func.avg(EmotionHistory.intensity).label('avg_intensity'),
             func.count(EmotionHistory.id).label('count')
@@ -137,7 +138,7 @@ class InsightsService:
             EmotionHistory.detected_at >= cutoff_date
         ).group_by(
             func.date(EmotionHistory.detected_at)
-        ).all()
+        ))).all()
         
         # Combine both sources
         timeline_dict = {}
@@ -170,8 +171,8 @@ class InsightsService:
         return sorted(timeline_dict.values(), key=lambda x: x['date'])
     
     @staticmethod
-    def get_emotion_distribution(
-        db: Session,
+    async def get_emotion_distribution(
+        db: AsyncSession,
         user_id: str,
         days: int = 7
     ) -> List[Dict]:
@@ -182,22 +183,22 @@ class InsightsService:
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         
         # Get mood distribution
-        mood_dist = db.query(
+        mood_dist = (await db.execute(select(
             MoodEntry.mood,
             func.count(MoodEntry.id).label('count')
         ).filter(
             MoodEntry.user_id == user_id,
             MoodEntry.created_at >= cutoff_date
-        ).group_by(MoodEntry.mood).all()
+        ).group_by(MoodEntry.mood))).all()
         
         # Get emotion distribution
-        emotion_dist = db.query(
+        emotion_dist = (await db.execute(select(
             EmotionHistory.emotion,
             func.count(EmotionHistory.id).label('count')
         ).filter(
             EmotionHistory.user_id == user_id,
             EmotionHistory.detected_at >= cutoff_date
-        ).group_by(EmotionHistory.emotion).all()
+        ).group_by(EmotionHistory.emotion))).all()
         
         # Combine and calculate percentages
         combined = {}
@@ -224,8 +225,8 @@ class InsightsService:
         return sorted(distribution, key=lambda x: x['count'], reverse=True)
     
     @staticmethod
-    def get_conversation_stats(
-        db: Session,
+    async def get_conversation_stats(
+        db: AsyncSession,
         user_id: str,
         days: int = 7
     ) -> Dict:
@@ -234,32 +235,30 @@ class InsightsService:
         """
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         
-        # Total messages
-        total_messages = db.query(func.count(Message.id)).filter(
-            Message.user_id == user_id,
-            Message.created_at >= cutoff_date
-        ).scalar() or 0
-        
-        # User messages only
-        user_messages = db.query(func.count(Message.id)).filter(
-            Message.user_id == user_id,
-            Message.is_from_user == True,
-            Message.created_at >= cutoff_date
-        ).scalar() or 0
+        # Total and user messages in one pass over the (user_id, created_at) index
+        total_messages, user_messages = (await db.execute(
+            select(
+                func.count(Message.id),
+                func.count(Message.id).filter(Message.is_from_user == True)
+            ).filter(
+                Message.user_id == user_id,
+                Message.created_at >= cutoff_date
+            )
+        )).one()
+        total_messages = total_messages or 0
+        user_messages = user_messages or 0
         
-        # Total conversations (unique conversation IDs)
-        total_conversations = db.query(
-            func.count(func.distinct(Message.conversation_id))
-        ).filter(
-            Message.user_id == user_id,
-            Message.created_at >= cutoff_date
-        ).scalar() or 0
+        # Conversations active in the period, from the last_message_at counter column
+        total_conversations = (await db.scalar(select(func.count(Conversation.id)).filter(
+            Conversation.user_id == user_id,
+            Conversation.last_message_at >= cutoff_date
+        ))) or 0
         
         # Mood check-ins
-        mood_checkins = db.query(func.count(MoodEntry.id)).filter(
+        mood_checkins = (await db.scalar(select(func.count(MoodEntry.id)).filter(
             MoodEntry.user_id == user_id,
             MoodEntry.created_at >= cutoff_date
-        ).scalar() or 0
+        ))) or 0
         
         return {
             'total_messages': total_messages,
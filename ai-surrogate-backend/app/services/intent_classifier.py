@@ -0,0 +1,188 @@
+"""
+Intent Classifier - Local nearest-centroid classifier over MiniLM embeddings
+
+Sits between the keyword matcher and the LLM in intent detection. Seed
+examples for each intent (English, Urdu and Roman Urdu) are embedded once
+with the shared MiniLM model; a message is assigned to the intent whose
+centroid is most similar. One CPU embedding is a few ms, versus a round
+trip to mistral-small.
+
+If sentence-transformers is not installed the classifier reports itself
+unavailable and intent detection falls back to the LLM as before.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from app.services.embeddings import embed_texts, embeddings_available, np
+
+logger = logging.getLogger(__name__)
+
+# Labeled seed examples per intent
+SEED_EXAMPLES: Dict[str, List[str]] = {
+    "search": [
+        "what's the weather in Lahore today",
+        "who won the cricket match yesterday",
+        "current price of gold in Pakistan",
+        "latest news on the budget",
+        "what is the population of Karachi",
+        "when is the next PSL match",
+        "how much does an iPhone 15 cost",
+        "who is the prime minister of Pakistan",
+        "aaj Lahore ka mausam kaisa hai",
+        "dollar ka rate kya hai aaj",
+        "kal ka match kis ne jeeta",
+        "آج لاہور کا موسم کیسا ہے",
+        "سونے کی قیمت کیا ہے",
+        "تازہ خبریں بتائیں",
+    ],
+    "calendar": [
+        "set up a meeting with my manager on Monday",
+        "remind me to take my medicine at 9 pm",
+        "add my dentist appointment to my calendar",
+        "what do I have planned for tomorrow",
+        "schedule a call with Sara at 3",
+        "cancel my meeting on Friday",
+        "mujhe kal subah 7 baje yaad dilana",
+        "meri Monday ko meeting rakh do",
+        "doctor ka appointment calendar mein daal do",
+        "مجھے کل صبح یاد دلانا",
+        "پیر کو میٹنگ رکھ دیں",
+    ],
+    "document": [
+        "write a cover letter for a software job",
+        "create a document with my meeting notes",
+        "draft an email to my landlord",
+        "make a shopping list document",
+        "prepare a report on my monthly expenses",
+        "mere liye ek application likh do",
+        "ek document bana do notes ke saath",
+        "میرے لیے درخواست لکھ دیں",
+        "ایک دستاویز بنا دیں",
+    ],
+    "chat": [
+        "I feel really lonely today",
+        "what's your name",
+        "tell me a joke",
+        "I'm so stressed about my exams",
+        "how was your day",
+        "I had a fight with my best friend",
+        "can you cheer me up",
+        "what do you think about love",
+        "mera dil bohat udaas hai",
+        "mujhe neend nahi aa rahi",
+        "tum kaun ho",
+        "aaj mera din acha guzra",
+        "میں بہت اداس ہوں",
+        "آپ کا نام کیا ہے",
+        "مجھے ایک لطیفہ سنائیں",
+    ],
+}
+
+_TOOLS = {"search": "search", "calendar": "calendar", "document": "docs", "chat": None}
+
+# Softmax temperature over cosine similarities: lower = sharper confidences
+_TEMPERATURE = 0.05
+
+
+class IntentClassifier:
+    """
+    Nearest-centroid intent classifier on sentence embeddings.
+    """
+
+    def __init__(self, examples: Optional[Dict[str, List[str]]] = None):
+        """
+        Args:
+            examples: Labeled examples per intent (default: SEED_EXAMPLES)
+        """
+        self.examples = examples or SEED_EXAMPLES
+        self.labels = list(self.examples)
+        self._centroids = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return embeddings_available
+
+    def fit(self) -> bool:
+        """
+        Embed the seed examples and compute one centroid per intent.
+
+        Returns:
+            True if the classifier is ready
+        """
+        if self._centroids is not None:
+            return True
+        with self._lock:
+            if self._centroids is not None:
+                return True
+            texts = [text for label in self.labels for text in self.examples[label]]
+            embeddings = embed_texts(texts)
+            if embeddings is None:
+                return False
+
+            centroids = []
+            offset = 0
+            for label in self.labels:
+                count = len(self.examples[label])
+                centroid = embeddings[offset:offset + count].mean(axis=0)
+                centroids.append(centroid / np.linalg.norm(centroid))
+                offset += count
+            self._centroids = np.stack(centroids)
+            logger.info(f"✅ Intent classifier ready ({len(texts)} seed examples, {len(self.labels)} intents)")
+            return True
+
+    def classify_batch(self, messages: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Classify several messages with one embedding call.
+
+        Args:
+            messages: User messages
+
+        Returns:
+            One dict per message with intent, confidence, tool (None if unavailable)
+        """
+        if not messages or not self.fit():
+            return None
+
+        embeddings = embed_texts(messages)
+        if embeddings is None:
+            return None
+
+        similarities = embeddings @ self._centroids.T
+        scores = np.exp((similarities - similarities.max(axis=1, keepdims=True)) / _TEMPERATURE)
+        probabilities = scores / scores.sum(axis=1, keepdims=True)
+
+        results = []
+        for row in probabilities:
+            best = int(row.argmax())
+            label = self.labels[best]
+            results.append({
+                "intent": label,
+                "confidence": round(float(row[best]), 3),
+                "tool": _TOOLS.get(label),
+            })
+        return results
+
+    def classify(self, message: str) -> Optional[Dict[str, Any]]:
+        """
+        Classify one message.
+
+        Returns:
+            Dict with intent, confidence and tool (None if unavailable)
+        """
+        results = self.classify_batch([message])
+        return results[0] if results else None
+
+
+# Global intent classifier instance
+_intent_classifier = None
+
+
+def get_intent_classifier() -> IntentClassifier:
+    """Get or create global intent classifier instance."""
+    global _intent_classifier
+    if _intent_classifier is None:
+        _intent_classifier = IntentClassifier()
+    return _intent_classifier
@@ -6,16 +6,123 @@ Determines if user wants to:
 - Create calendar events
 - Create documents
 - General chat
+
+Detection runs cheapest first: compiled keywords, then the local embedding
+classifier, and the LLM only when both are unsure.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional
-from mistralai import Mistral
+import re
+from functools import lru_cache
+from typing import Dict, Any, FrozenSet, Optional
 
 from app.config import settings
+from app.services.intent_classifier import get_intent_classifier
+from app.services.llm_client import get_llm_client
 
 logger = logging.getLogger(__name__)
 
+# Keyword results above this confidence skip the LLM fallback
+KEYWORD_CONFIDENCE_THRESHOLD = 0.7
+
+# Keyword groups, checked in priority order: (group, keywords, result)
+KEYWORD_GROUPS = [
+    # Search intent - explicit requests
+    ("search", [
+        "search", "find", "look up", "google", "latest", "news about",
+        "information about", "dhoondo", "talash karo", "taza khabar", "تلاش", "خبریں"
+    ], {"intent": "search", "confidence": 0.8, "tool": "search"}),
+    # Search intent - question phrasings that are often plain chat
+    # ("what is your name"); medium confidence so the LLM confirms
+    # while the orchestrator searches speculatively
+    ("question", [
+        "what is", "who is", "when did", "where is", "how to",
+        "tell me about"
+    ], {"intent": "search", "confidence": 0.65, "tool": "search"}),
+    # Calendar intent
+    ("calendar", [
+        "schedule", "meeting", "appointment", "event", "calendar",
+        "remind me", "set a reminder", "reminder", "book", "reserve", "yaad dilana", "yaad dilao"
+    ], {"intent": "calendar", "confidence": 0.75, "tool": "calendar"}),
+    # Document intent
+    ("document", [
+        "create document", "write document", "draft", "generate document",
+        "make a document", "create a file"
+    ], {"intent": "document", "confidence": 0.75, "tool": "docs"}),
+    # Small talk - plain chat, conclusive so it never waits on the LLM
+    ("smalltalk", [
+        "hi", "hello", "hey", "thanks", "thank you", "ok", "okay", "bye",
+        "good morning", "good night", "how are you", "salam", "assalam o alaikum",
+        "kaise ho", "kya haal hai", "shukriya", "شکریہ", "السلام علیکم", "کیسے ہو"
+    ], {"intent": "chat", "confidence": 0.8, "tool": None}),
+]
+
+_DEFAULT_INTENT = {"intent": "chat", "confidence": 0.6, "tool": None}
+_RESULTS = {group: result for group, _, result in KEYWORD_GROUPS}
+_PRIORITY = [group for group, _, _ in KEYWORD_GROUPS]
+
+
+def _inflected(word: str) -> str:
+    """Pattern for a word plus its common inflections."""
+    if word.endswith("e"):
+        # schedule -> schedules, scheduled, scheduling
+        return re.escape(word[:-1]) + r"(?:e|es|ed|ing)"
+    return re.escape(word) + r"(?:s|es|ed|ing)?"
+
+
+def _alternation(keywords, inflect: bool) -> str:
+    # Longest first so a phrase wins over a shorter keyword it starts with
+    phrases = sorted(keywords, key=len, reverse=True)
+    patterns = []
+    for phrase in phrases:
+        words = phrase.split()
+        last = _inflected(words[-1]) if inflect else re.escape(words[-1])
+        patterns.append(r"\s+".join([*map(re.escape, words[:-1]), last]))
+    return "|".join(patterns)
+
+
+# One compiled pattern for every group. Keywords match whole words only
+# ("book" no longer fires on "facebook", "event" on "prevent"). Tool keywords
+# also match common inflections ("meetings", "searching", "booked",
+# "scheduled"); small talk matches exactly so "hi" does not fire on "his".
+_KEYWORD_RE = re.compile(
+    r"(?<!\w)(?:"
+    + "|".join(
+        f"(?P<{group}>{_alternation(keywords, inflect=group != 'smalltalk')})"
+        for group, keywords, _ in KEYWORD_GROUPS
+    )
+    + r")(?!\w)"
+)
+
+def _normalize(message: str) -> str:
+    return " ".join(message.lower().split())
+
+
+def match_keyword_groups(message: str) -> FrozenSet[str]:
+    """All keyword groups found in a message, in one regex pass."""
+    return frozenset(match.lastgroup for match in _KEYWORD_RE.finditer(_normalize(message)))
+
+
+def detect_keyword_intent(message: str) -> Dict[str, Any]:
+    """
+    Keyword intent for a message (no network, cached for repeated messages).
+    
+    Returns:
+        Dict with intent, confidence, and tool
+    """
+    return dict(_keyword_intent(_normalize(message)))
+
+
+@lru_cache(maxsize=4096)
+def _keyword_intent(normalized: str) -> Dict[str, Any]:
+    """Highest-priority intent for a normalized message (cached; do not mutate)."""
+    hits = {match.lastgroup for match in _KEYWORD_RE.finditer(normalized)}
+    for group in _PRIORITY:
+        if group in hits:
+            return _RESULTS[group]
+    return _DEFAULT_INTENT
+
 
 class IntentDetector:
     """
@@ -24,26 +131,39 @@ class IntentDetector:
     
     def __init__(self):
         """Initialize intent detector."""
-        self.mistral = Mistral(api_key=settings.MISTRAL_API_KEY)
+        self.llm = get_llm_client()
+        self.classifier = get_intent_classifier()
     
-    async def detect_intent(self, user_message: str) -> Dict[str, Any]:
+    async def detect_intent(
+        self,
+        user_message: str,
+        keyword_intent: Optional[Dict[str, Any]] = None,
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Detect user intent from message.
         
         Args:
             user_message: User's message
+            keyword_intent: Result of detect_keywords() if already computed
+            user_id: User the LLM fallback is made for (rate limiting)
             
         Returns:
             Dict with intent type and confidence
         """
         try:
             # Simple keyword-based detection first (fast)
-            intent = self._detect_keywords(user_message)
-            if intent["confidence"] > 0.7:
+            intent = keyword_intent or self._detect_keywords(user_message)
+            if self.is_conclusive(intent):
                 return intent
             
-            # Use LLM for more complex detection
-            return await self._detect_with_llm(user_message)
+            # Local embedding classifier (a few ms on CPU)
+            classified = await self._classify(user_message, intent)
+            if classified is not None:
+                return classified
+            
+            # Use LLM only as a last resort
+            return await self._detect_with_llm(user_message, user_id)
             
         except Exception as e:
             logger.error(f"Intent detection error: {e}")
@@ -53,6 +173,23 @@ class IntentDetector:
                 "tool": None
             }
     
+    def detect_keywords(self, message: str) -> Dict[str, Any]:
+        """
+        Keyword-only intent detection (no network, safe to call inline).
+        
+        Args:
+            message: User's message
+            
+        Returns:
+            Dict with intent, confidence, and tool
+        """
+        return self._detect_keywords(message)
+    
+    @staticmethod
+    def is_conclusive(intent: Dict[str, Any]) -> bool:
+        """Whether an intent result is confident enough to skip the LLM."""
+        return intent["confidence"] > KEYWORD_CONFIDENCE_THRESHOLD
+    
     def _detect_keywords(self, message: str) -> Dict[str, Any]:
         """
         Fast keyword-based intent detection.
@@ -60,56 +197,42 @@ class IntentDetector:
         Returns:
             Dict with intent, confidence, and tool
         """
-        message_lower = message.lower()
-        
-        # Search intent
-        search_keywords = [
-            "search", "find", "look up", "google", "what is", "who is",
-            "when did", "where is", "how to", "latest", "news about",
-            "information about", "tell me about"
-        ]
-        
-        if any(keyword in message_lower for keyword in search_keywords):
-            return {
-                "intent": "search",
-                "confidence": 0.8,
-                "tool": "search"
-            }
+        return detect_keyword_intent(message)
+    
+    async def _classify(
+        self,
+        message: str,
+        keyword_intent: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Classify with the local embedding model.
         
-        # Calendar intent
-        calendar_keywords = [
-            "schedule", "meeting", "appointment", "event", "calendar",
-            "remind me", "set a reminder", "book", "reserve"
-        ]
+        Returns:
+            Intent dict, or None if the classifier is unavailable or unsure
+        """
+        if not settings.INTENT_CLASSIFIER_ENABLED or not self.classifier.available:
+            return None
         
-        if any(keyword in message_lower for keyword in calendar_keywords):
-            return {
-                "intent": "calendar",
-                "confidence": 0.75,
-                "tool": "calendar"
-            }
+        try:
+            result = await asyncio.to_thread(self.classifier.classify, message)
+        except Exception as e:
+            logger.error(f"Intent classifier error: {e}")
+            return None
+        if result is None:
+            return None
         
-        # Document intent
-        doc_keywords = [
-            "create document", "write document", "draft", "generate document",
-            "make a document", "create a file"
-        ]
+        # Keywords and classifier agreeing is stronger than either alone
+        if result["intent"] == keyword_intent["intent"] and keyword_intent["tool"]:
+            result["confidence"] = min(0.95, max(result["confidence"], keyword_intent["confidence"]) + 0.1)
         
-        if any(keyword in message_lower for keyword in doc_keywords):
-            return {
-                "intent": "document",
-                "confidence": 0.75,
-                "tool": "docs"
-            }
+        if result["confidence"] < settings.INTENT_CLASSIFIER_MIN_CONFIDENCE:
+            logger.info(f"🎯 Classifier unsure ({result['intent']} {result['confidence']}), asking LLM")
+            return None
         
-        # Default to chat
-        return {
-            "intent": "chat",
-            "confidence": 0.6,
-            "tool": None
-        }
+        logger.info(f"🎯 Classified intent: {result['intent']} (confidence: {result['confidence']})")
+        return result
     
-    async def _detect_with_llm(self, message: str) -> Dict[str, Any]:
+    async def _detect_with_llm(self, message: str, user_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Use LLM for more sophisticated intent detection.
         
@@ -123,14 +246,16 @@ User message: "{message}"
 
 Intent:"""
             
-            response = self.mistral.chat.complete(
-                model="mistral-small-latest",
+            response = await self.llm.complete(
                 messages=[{"role": "user", "content": prompt}],
+                model="mistral-small-latest",
                 temperature=0.3,
-                max_tokens=10
+                max_tokens=10,
+                timeout=settings.LLM_INTENT_TIMEOUT_SECONDS,
+                user_id=user_id
             )
             
-            intent_text = response.choices[0].message.content.strip().lower()
+            intent_text = response.strip().lower()
             
             # Map to intent
             intent_map = {
@@ -1,63 +1,236 @@
 """
-Language Detection Agent using Agno
+Language Detection
 
-Detects user's language: English, Urdu (includes Roman Urdu and Hindi), or Other
+Detects user's language: English, Urdu (includes Roman Urdu and Hindi),
+Punjabi, or Other.
+
+Detection is local first: Unicode script ranges identify Urdu (Arabic
+script), Punjabi (Gurmukhi) and Hindi (Devanagari); Latin-script text is
+scored against compact Roman-Urdu and English word lists. The Agno language
+agent (mistral-small) is only asked when Latin text is ambiguous, and it is
+built once and reused.
 """
 
-from agno.agent import Agent
+import logging
+import re
+import threading
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Language codes returned by the local detector
+ENGLISH = "en"
+URDU = "ur"
+PUNJABI = "pa"
+HINDI = "hi"
+OTHER = "other"
+
+_LABELS = {ENGLISH: "English", URDU: "Urdu", HINDI: "Urdu", PUNJABI: "Punjabi", OTHER: "Other"}
+
+# Below this confidence the local result is treated as ambiguous
+AMBIGUITY_THRESHOLD = 0.6
+
+# Share of Latin-script words found in the word lists: below the minimum the
+# text is another language (French, Spanish, ...) that merely shares a word or
+# two; full confidence needs the share typical of English/Roman Urdu chat
+MIN_KNOWN_WORD_SHARE = 0.3
+CONFIDENT_KNOWN_WORD_SHARE = 0.5
+
+# Common Roman Urdu words (function words and frequent chat vocabulary)
+ROMAN_URDU_WORDS = frozenset("""
+    hai hain ho hoon hun tha thi thay the kya kia kyun kyon kaise kaisay kaisi kese
+    kab kahan kidhar kon kaun mein mai mujhe mujh mera meri mere tum tumhara tumhari
+    aap ap apka apki apna apni hum hamara humara wo woh yeh ye ko ka ki ke se sy bhi
+    aur lekin magar par nahi nahin na haan han ji jee acha accha achha theek thik
+    bohat bohot bahut zyada thora thoda abhi kal aaj parson raat subah shaam din
+    shukriya meherbani yaar dost dil pyar mohabbat khush udaas pareshan dukh
+    baat batao bataen karo karna kar raha rahi rahe gaya gayi hua hui hoga hogi
+    chahiye chahta chahti sakta sakti samajh pata kuch sab koi kuchh wala wali
+    salam assalam alaikum khuda allah inshallah mashallah ghar kaam khana pani
+""".split())
+
+# Common English function words
+ENGLISH_WORDS = frozenset("""
+    the a an is are was were be been being am i you he she it we they me my your
+    our their his her its this that these those what which who whom whose when
+    where why how and or but if then so because of to in on at by for with about
+    from into over after before not no yes do does did have has had can could will
+    would should shall may might must just very really too also please thanks
+    thank hello hi hey ok okay good great feel feeling today tomorrow yesterday
+    want need know think like love help tell me there here some any all more most
+""".split())
+
+_WORD_RE = re.compile(r"[a-z]+")
+# Letter patterns typical of Roman Urdu spelling
+_ROMAN_URDU_PATTERN = re.compile(r"(aa|ee|oo|kh|gh|dh|bh|ch)[a-z]*$|(ain|ein|iye|aiye|oon|ega|egi)$")
+
+_agent = None
+_agent_lock = threading.Lock()
+
+
+def _script_counts(text: str) -> Tuple[int, int, int, int, int]:
+    """Count letters per script: (arabic, gurmukhi, devanagari, latin, other)."""
+    arabic = gurmukhi = devanagari = latin = other = 0
+    for char in text:
+        if not char.isalpha():
+            continue
+        code = ord(char)
+        if code < 0x250:
+            latin += 1
+        elif 0x600 <= code <= 0x6FF or 0x750 <= code <= 0x77F or 0xFB50 <= code <= 0xFEFF:
+            arabic += 1
+        elif 0xA00 <= code <= 0xA7F:
+            gurmukhi += 1
+        elif 0x900 <= code <= 0x97F:
+            devanagari += 1
+        else:
+            other += 1
+    return arabic, gurmukhi, devanagari, latin, other
 
 
-def create_language_detector() -> Agent:
+def _score_latin(text: str) -> Tuple[str, float]:
+    """Roman Urdu vs English for Latin-script text."""
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return ENGLISH, 0.5
+
+    urdu = english = 0.0
+    known = 0
+    for word in words:
+        in_urdu = word in ROMAN_URDU_WORDS
+        in_english = word in ENGLISH_WORDS
+        if in_urdu or in_english:
+            known += 1
+        if in_urdu and not in_english:
+            urdu += 1
+        elif in_english and not in_urdu:
+            english += 1
+        elif not in_urdu and not in_english and len(word) > 3 and _ROMAN_URDU_PATTERN.search(word):
+            urdu += 0.5
+
+    total = urdu + english
+    share = known / len(words)
+    if total == 0 or share < MIN_KNOWN_WORD_SHARE:
+        # Few known words: another language, or names/jargon
+        return OTHER, 0.4
+    coverage = min(1.0, share / CONFIDENT_KNOWN_WORD_SHARE)
+    if urdu > english:
+        return URDU, round((0.5 + 0.5 * (urdu - english) / total) * coverage, 3)
+    return ENGLISH, round((0.5 + 0.5 * (english - urdu) / total) * coverage, 3)
+
+
+def detect_language_local(message: str) -> Tuple[str, float]:
+    """
+    Detect language without any network call (microseconds).
+
+    Args:
+        message: User's message
+
+    Returns:
+        Tuple of (language code, confidence 0-1). Codes: "en", "ur", "pa", "hi", "other"
+    """
+    arabic, gurmukhi, devanagari, latin, other = _script_counts(message)
+    total = arabic + gurmukhi + devanagari + latin + other
+    if total == 0:
+        # Emoji, numbers or punctuation only
+        return ENGLISH, 0.5
+
+    script, count = max(
+        ((URDU, arabic), (PUNJABI, gurmukhi), (HINDI, devanagari), (OTHER, other), (ENGLISH, latin)),
+        key=lambda item: item[1]
+    )
+    if script == ENGLISH:
+        language, confidence = _score_latin(message)
+        return language, round(confidence * count / total, 3) if count < total else confidence
+    return script, round(count / total, 3)
+
+
+def detect_languages_batch(messages: List[str]) -> List[str]:
+    """
+    Detect languages for many messages locally (for backfills).
+
+    Args:
+        messages: Messages to classify
+
+    Returns:
+        Language code per message
+    """
+    return [detect_language_local(message)[0] for message in messages]
+
+
+def create_language_detector():
     """
     Creates an Agno agent for language detection.
-    
+
     Returns:
         Agent configured to detect language from user message
     """
+    from agno.agent import Agent
+
     return Agent(
         name="Language Detector",
         model="mistral:mistral-small-latest",  # Agno format: provider:model_id
         instructions="""
         You are a language detection expert.
-        
+
         Detect the language of the user's message and return ONLY one of these:
         - English
         - Urdu (this includes proper Urdu script, Roman Urdu, and Hindi)
+        - Punjabi
         - Other
-        
+
         Rules:
         - If user writes in Urdu script (اردو), return "Urdu"
         - If user writes in Roman Urdu (e.g., "Kaise ho", "Shukriya"), return "Urdu"
         - If user writes in Hindi (Devanagari or Roman), return "Urdu"
+        - If user writes in Punjabi (Gurmukhi or Roman), return "Punjabi"
         - If user writes in English, return "English"
         - For any other language, return "Other"
         - If user mixes languages, return the primary/dominant language
-        
+
         Return ONLY the language name, nothing else. No explanation.
         """
     )
 
 
-def detect_language(message: str) -> str:
+def _get_language_agent():
+    """Build the language agent once and reuse it."""
+    global _agent
+    if _agent is None:
+        with _agent_lock:
+            if _agent is None:
+                _agent = create_language_detector()
+    return _agent
+
+
+def detect_language(message: str, use_llm: bool = True) -> str:
     """
     Detect the language of a user message.
-    
+
     Args:
         message: User's input message
-        
+        use_llm: Ask the LLM when the local result is ambiguous
+
     Returns:
-        One of: "English", "Urdu", "Other"
+        One of: "English", "Urdu", "Punjabi", "Other"
     """
-    agent = create_language_detector()
-    result = agent.run(message)
-    
+    language, confidence = detect_language_local(message)
+    if confidence >= AMBIGUITY_THRESHOLD or not use_llm:
+        return _LABELS[language]
+
+    try:
+        result = _get_language_agent().run(message)
+    except Exception as e:
+        logger.error(f"Language agent failed, using local guess: {e}")
+        return _LABELS[language]
+
     # Extract content from RunOutput object
     detected = result.content if hasattr(result, 'content') else str(result)
     detected = detected.strip()
-    
+
     # Ensure valid response
-    if detected not in ["English", "Urdu", "Other"]:
+    if detected not in ["English", "Urdu", "Punjabi", "Other"]:
         # Default to English if detection fails
         return "English"
-    
+
     return detected
@@ -0,0 +1,538 @@
+"""
+LLM Client - Shared async Mistral client
+
+One process-wide Mistral client backed by a pooled, keep-alive httpx
+connection. The orchestrator, intent detector and title generation all go
+through here, so every LLM call is natively async (no thread pool) and
+bounded by a single per-call deadline.
+
+Resilience:
+- Per-model circuit breaker: a failing model is skipped for a while
+- Fallback chain (LLM_FALLBACK_MODELS): tried in order when a model fails,
+  times out or has an open circuit. "groq:<model>" entries go to Groq.
+- Hedging: if the requested model is slower than its recent latency
+  percentile, a second request goes to the small model and the first to
+  answer wins (for streams, the first to produce a token)
+
+Every call is admitted by the LLM scheduler first (per-user rate limit,
+global concurrency cap, interactive before background).
+"""
+
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+from mistralai import Mistral
+
+from app.config import settings
+from app.services.llm_resilience import CLOSED, CircuitBreaker, CircuitOpenError, LatencyWindow
+from app.services.llm_scheduler import INTERACTIVE, get_llm_scheduler
+
+try:
+    from groq import AsyncGroq
+    groq_available = True
+except ImportError:
+    AsyncGroq = None
+    groq_available = False
+
+logger = logging.getLogger(__name__)
+
+GROQ_PREFIX = "groq:"
+
+
+class LLMClient:
+    """
+    Async wrapper around a single shared Mistral client.
+
+    - Pooled keep-alive HTTP connections (no TLS handshake per call)
+    - Native async calls (no run_in_executor)
+    - One deadline per call, shared by fallbacks and hedges
+    - Circuit breakers, fallback chain and hedged requests
+    """
+
+    def __init__(self):
+        """Create the pooled HTTP client and the Mistral client on top of it."""
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(settings.LLM_TIMEOUT_SECONDS, connect=5.0),
+        )
+        if settings.LLM_PROVIDER == "fake":
+            # Offline stand-in with configurable latency (load tests, benchmarks)
+            from app.services.fake_llm import FakeMistral
+            self.mistral = FakeMistral()
+        else:
+            self.mistral = Mistral(
+                api_key=settings.MISTRAL_API_KEY,
+                server_url=settings.MISTRAL_SERVER_URL or None,
+                async_client=self._http,
+            )
+        self.groq = None
+        if groq_available and settings.GROQ_API_KEY and settings.LLM_PROVIDER != "fake":
+            self.groq = AsyncGroq(api_key=settings.GROQ_API_KEY, max_retries=0)
+
+        self.fallback_models = [
+            m.strip() for m in settings.LLM_FALLBACK_MODELS.split(",") if m.strip()
+        ]
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latency: Dict[Tuple[str, str], LatencyWindow] = {}
+        self._stats = {"fallbacks": 0, "hedges": 0, "hedge_wins": 0, "circuit_skips": 0}
+
+        logger.info(
+            f"✅ LLM client initialized (max connections: {settings.LLM_MAX_CONNECTIONS}, "
+            f"fallbacks: {self.fallback_models or 'none'}, groq: {self.groq is not None})"
+        )
+
+    # ------------------------------------------------------------------
+    # Breakers, latency and model chain
+    # ------------------------------------------------------------------
+
+    def _breaker(self, model: str) -> CircuitBreaker:
+        breaker = self._breakers.get(model)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+                reset_seconds=settings.LLM_BREAKER_RESET_SECONDS,
+            )
+            self._breakers[model] = breaker
+        return breaker
+
+    def _window(self, model: str, kind: str) -> LatencyWindow:
+        window = self._latency.get((model, kind))
+        if window is None:
+            window = self._latency[(model, kind)] = LatencyWindow()
+        return window
+
+    def _chain(self, model: str) -> List[str]:
+        """Requested model followed by the configured fallbacks (deduplicated)."""
+        chain = [model]
+        for fallback in self.fallback_models:
+            if fallback in chain:
+                continue
+            if fallback.startswith(GROQ_PREFIX) and self.groq is None:
+                continue
+            chain.append(fallback)
+        return chain
+
+    def _hedge_delay(self, model: str, kind: str) -> Optional[float]:
+        """Seconds to wait before hedging a call to ``model`` (None: don't hedge)."""
+        hedge_model = settings.MISTRAL_SMALL_MODEL
+        if not settings.LLM_HEDGE_ENABLED or model == hedge_model:
+            return None
+        if self._breaker(hedge_model).state != CLOSED:
+            return None
+        return self._window(model, kind).percentile(
+            settings.LLM_HEDGE_PERCENTILE,
+            min_samples=settings.LLM_HEDGE_MIN_SAMPLES
+        )
+
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        remaining = deadline - asyncio.get_running_loop().time()
+        if remaining <= 0:
+            raise asyncio.TimeoutError()
+        return remaining
+
+    def _attempt_timeout(self, deadline: float) -> float:
+        """Each attempt gets a slice of the deadline, leaving room for fallbacks."""
+        return min(self._remaining(deadline), settings.LLM_ATTEMPT_TIMEOUT_SECONDS)
+
+    def _start_attempt(self, breaker: CircuitBreaker, deadline: float) -> float:
+        """
+        Timeout for an attempt about to be sent.
+
+        If the shared deadline is already spent the model is never called,
+        so nothing is recorded against its breaker (a slow primary must not
+        open the circuits of healthy fallbacks).
+        """
+        try:
+            return self._attempt_timeout(deadline)
+        except asyncio.TimeoutError:
+            breaker.release_trial()
+            raise
+
+    async def _race(self, primary: asyncio.Task, hedge: asyncio.Task, discard=None):
+        """Return the first successful result of two tasks; cancel the other."""
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    winner = task
+                    break
+                if task is primary or error is None:
+                    error = task.exception()
+            else:
+                continue
+
+            loser = hedge if winner is primary else primary
+            loser.cancel()
+            loser.add_done_callback(lambda t: self._discard(t, discard))
+            if winner is hedge:
+                self._stats["hedge_wins"] += 1
+            return winner.result()
+        raise error
+
+    @staticmethod
+    def _discard(task: asyncio.Task, discard) -> None:
+        """Release a losing attempt that finished before its cancellation landed."""
+        if task.cancelled() or task.exception() is not None:
+            return
+        if discard is not None:
+            discard(task.result())
+
+    async def _hedged(self, model: str, kind: str, attempt, discard=None):
+        """
+        Run ``attempt(model)``, hedging to the small model if it is slow.
+        """
+        delay = self._hedge_delay(model, kind)
+        primary = asyncio.create_task(attempt(model))
+        if delay is None:
+            return await primary
+
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done:
+            return primary.result()
+
+        hedge_model = settings.MISTRAL_SMALL_MODEL
+        self._stats["hedges"] += 1
+        logger.warning(f"🪁 {model} slower than p{settings.LLM_HEDGE_PERCENTILE * 100:.0f} ({delay:.1f}s), hedging to {hedge_model}")
+        hedge = asyncio.create_task(attempt(hedge_model))
+        try:
+            return await self._race(primary, hedge, discard)
+        except asyncio.CancelledError:
+            primary.cancel()
+            hedge.cancel()
+            raise
+
+    async def _with_fallbacks(self, model: str, kind: str, attempt, discard=None):
+        """Try the model chain in order, skipping open circuits."""
+        last_error: Optional[BaseException] = None
+        for index, candidate in enumerate(self._chain(model)):
+            if not self._breaker(candidate).allow():
+                self._stats["circuit_skips"] += 1
+                logger.warning(f"⚡ Circuit open for {candidate}, skipping")
+                continue
+            if index > 0:
+                self._stats["fallbacks"] += 1
+                logger.warning(f"↪️ Falling back to {candidate}")
+            try:
+                return await self._hedged(candidate, kind, attempt, discard)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                last_error = e
+                logger.error(f"❌ LLM call to {candidate} failed: {type(e).__name__}: {e}")
+
+        if last_error is not None:
+            raise last_error
+        raise CircuitOpenError(f"No available model for {model} (all circuits open)")
+
+    # ------------------------------------------------------------------
+    # Provider calls
+    # ------------------------------------------------------------------
+
+    async def _complete_once(
+        self,
+        model: str,
+        messages: List[Dict],
+        temperature: float,
+        max_tokens: int,
+        usage: dict
+    ) -> str:
+        if model.startswith(GROQ_PREFIX):
+            response = await self.groq.chat.completions.create(
+                model=model[len(GROQ_PREFIX):],
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+        else:
+            response = await self.mistral.chat.complete_async(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+
+        if response and response.usage:
+            usage["prompt_tokens"] = response.usage.prompt_tokens
+            usage["completion_tokens"] = response.usage.completion_tokens
+
+        if not response or not response.choices:
+            return ""
+        return response.choices[0].message.content or ""
+
+    async def _stream_once(
+        self,
+        model: str,
+        messages: List[Dict],
+        temperature: float,
+        max_tokens: int,
+        usage: dict
+    ) -> AsyncIterator[str]:
+        if model.startswith(GROQ_PREFIX):
+            response = await self.groq.chat.completions.create(
+                model=model[len(GROQ_PREFIX):],
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+            )
+            async for chunk in response:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if isinstance(delta, str) and delta:
+                    yield delta
+            return
+
+        response = await self.mistral.chat.stream_async(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        async for event in response:
+            chunk = event.data
+
+            if chunk.usage:
+                usage["prompt_tokens"] = chunk.usage.prompt_tokens
+                usage["completion_tokens"] = chunk.usage.completion_tokens
+
+            if not chunk.choices:
+                continue
+
+            delta = chunk.choices[0].delta.content
+            if isinstance(delta, str) and delta:
+                yield delta
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def complete(
+        self,
+        messages: List[Dict],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        timeout: Optional[float] = None,
+        usage: Optional[dict] = None,
+        user_id: Optional[str] = None,
+        priority: int = INTERACTIVE
+    ) -> str:
+        """
+        Run a chat completion and return the response text.
+
+        Args:
+            messages: Chat messages
+            model: Model name
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            timeout: Deadline in seconds for the whole call, fallbacks included
+                (default: LLM_TIMEOUT_SECONDS)
+            usage: Optional dict filled with token counts and the serving model
+            user_id: User the call is made for (scheduler rate limit)
+            priority: Scheduler priority (INTERACTIVE or BACKGROUND)
+
+        Returns:
+            Response text ("" if the model returned no choices)
+
+        Raises:
+            asyncio.TimeoutError: If no model answers before the deadline
+            CircuitOpenError: If every model in the chain has an open circuit
+            LLMRateLimitError: If the scheduler does not admit the call in time
+        """
+        async with get_llm_scheduler().slot(user_id, priority):
+            return await self._complete(messages, model, temperature, max_tokens, timeout, usage)
+
+    async def _complete(
+        self,
+        messages: List[Dict],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        timeout: Optional[float],
+        usage: Optional[dict]
+    ) -> str:
+        deadline = asyncio.get_running_loop().time() + (timeout or settings.LLM_TIMEOUT_SECONDS)
+
+        async def attempt(candidate: str) -> Tuple[str, str, dict]:
+            breaker = self._breaker(candidate)
+            attempt_timeout = self._start_attempt(breaker, deadline)
+            attempt_usage: dict = {}
+            started_at = time.perf_counter()
+            try:
+                text = await asyncio.wait_for(
+                    self._complete_once(candidate, messages, temperature, max_tokens, attempt_usage),
+                    timeout=attempt_timeout
+                )
+            except asyncio.CancelledError:
+                # Lost a hedge race or the caller left: no verdict on the model
+                breaker.release_trial()
+                raise
+            except Exception:
+                breaker.record_failure()
+                raise
+            breaker.record_success()
+            self._window(candidate, "total").record(time.perf_counter() - started_at)
+            return candidate, text, attempt_usage
+
+        served_by, text, attempt_usage = await self._with_fallbacks(model, "total", attempt)
+        if usage is not None:
+            usage.update(attempt_usage)
+            usage["served_by"] = served_by
+        return text
+
+    async def stream(
+        self,
+        messages: List[Dict],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        timeout: Optional[float] = None,
+        usage: Optional[dict] = None,
+        user_id: Optional[str] = None,
+        priority: int = INTERACTIVE
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding text deltas as they arrive.
+
+        Fallbacks and hedging apply until the first token; after that the
+        stream is committed to one model and errors propagate.
+
+        Args:
+            messages: Chat messages
+            model: Model name
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            timeout: Deadline in seconds for the first token, fallbacks included
+                (default: LLM_TIMEOUT_SECONDS)
+            usage: Optional dict filled with token counts and the serving model
+            user_id: User the call is made for (scheduler rate limit)
+            priority: Scheduler priority (INTERACTIVE or BACKGROUND)
+
+        Yields:
+            Text deltas
+
+        Raises:
+            asyncio.TimeoutError: If no model produces a token before the deadline
+            CircuitOpenError: If every model in the chain has an open circuit
+            LLMRateLimitError: If the scheduler does not admit the call in time
+        """
+        # The slot is held until the stream ends
+        async with get_llm_scheduler().slot(user_id, priority):
+            async for delta in self._stream(messages, model, temperature, max_tokens, timeout, usage):
+                yield delta
+
+    async def _stream(
+        self,
+        messages: List[Dict],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        timeout: Optional[float],
+        usage: Optional[dict]
+    ) -> AsyncIterator[str]:
+        deadline = asyncio.get_running_loop().time() + (timeout or settings.LLM_TIMEOUT_SECONDS)
+
+        async def attempt(candidate: str):
+            breaker = self._breaker(candidate)
+            attempt_timeout = self._start_attempt(breaker, deadline)
+            attempt_usage: dict = {}
+            deltas = self._stream_once(candidate, messages, temperature, max_tokens, attempt_usage)
+            started_at = time.perf_counter()
+            try:
+                first = await asyncio.wait_for(
+                    deltas.__anext__(), timeout=attempt_timeout
+                )
+            except StopAsyncIteration:
+                first = None
+            except asyncio.CancelledError:
+                breaker.release_trial()
+                await deltas.aclose()
+                raise
+            except Exception:
+                await deltas.aclose()
+                breaker.record_failure()
+                raise
+            self._window(candidate, "ttft").record(time.perf_counter() - started_at)
+            return candidate, first, deltas, attempt_usage
+
+        def discard(result) -> None:
+            # A hedge loser that already streamed: close it, reporting nothing
+            self._breaker(result[0]).release_trial()
+            asyncio.ensure_future(result[2].aclose())
+
+        served_by, first, deltas, attempt_usage = await self._with_fallbacks(
+            model, "ttft", attempt, discard=discard
+        )
+        breaker = self._breaker(served_by)
+        try:
+            if first is not None:
+                yield first
+                async for delta in deltas:
+                    yield delta
+        except (asyncio.CancelledError, GeneratorExit):
+            breaker.release_trial()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        finally:
+            await deltas.aclose()
+
+        breaker.record_success()
+        if usage is not None:
+            usage.update(attempt_usage)
+            usage["served_by"] = served_by
+
+    def stats(self) -> Dict:
+        """Circuit states, fallback and hedge counters, recent latency per model."""
+        p95_seconds = {}
+        for (model, kind), window in self._latency.items():
+            p95 = window.percentile(0.95)
+            p95_seconds[f"{model}:{kind}"] = round(p95, 3) if p95 is not None else None
+
+        return {
+            **self._stats,
+            "circuits": {model: breaker.stats() for model, breaker in self._breakers.items()},
+            "p95_seconds": p95_seconds,
+        }
+
+    async def aclose(self) -> None:
+        """Close pooled HTTP connections."""
+        await self._http.aclose()
+        if self.groq is not None:
+            await self.groq.close()
+
+
+# Global LLM client instance
+_llm_client = None
+
+
+def get_llm_client() -> LLMClient:
+    """Get or create global LLM client instance."""
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = LLMClient()
+    return _llm_client
+
+
+async def close_llm_client() -> None:
+    """Close the global LLM client (called on application shutdown)."""
+    global _llm_client
+    if _llm_client is not None:
+        await _llm_client.aclose()
+        _llm_client = None
@@ -0,0 +1,108 @@
+"""
+LLM Resilience - Circuit breakers and latency windows
+
+Building blocks used by the LLM client to degrade gracefully when a model
+is slow or failing: a per-model circuit breaker that stops sending traffic
+to a model after repeated failures, and a rolling latency window whose
+percentile decides when a hedged request is worth starting.
+"""
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when every model in the chain has an open circuit."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one model.
+
+    After ``failure_threshold`` failures in a row the circuit opens and calls
+    are skipped for ``reset_seconds``. Then one trial call is let through
+    (half-open); its outcome closes or re-opens the circuit. A trial that
+    reports nothing within ``trial_timeout`` is presumed lost and another
+    trial is let through.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30,
+        trial_timeout: Optional[float] = None
+    ):
+        """
+        Args:
+            failure_threshold: Consecutive failures before opening
+            reset_seconds: Seconds to stay open before a trial call
+            trial_timeout: Seconds before an unfinished trial is presumed lost
+                (default: reset_seconds)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.trial_timeout = trial_timeout if trial_timeout is not None else reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_started_at = 0.0
+
+    def allow(self) -> bool:
+        """Whether a call may be sent to this model now."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == HALF_OPEN and (
+            not self._trial_in_flight
+            or time.monotonic() - self._trial_started_at >= self.trial_timeout
+        ):
+            self._trial_in_flight = True
+            self._trial_started_at = time.monotonic()
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Give back a half-open trial slot whose call was not sent or was cancelled."""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self.failures}
+
+
+class LatencyWindow:
+    """Rolling window of recent latencies (seconds) for one model."""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, p: float, min_samples: int = 1) -> Optional[float]:
+        """
+        Latency at percentile ``p`` (0-1), or None with too few samples.
+        """
+        if len(self._samples) < max(min_samples, 1):
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(len(ordered) * p), len(ordered) - 1)]
@@ -0,0 +1,246 @@
+"""
+LLM Scheduler - Fair admission in front of upstream LLM calls
+
+Every LLM call passes through here before it reaches Mistral:
+
+- Per-user token bucket: each user may start LLM_USER_RATE_PER_MINUTE calls
+  a minute (with a small burst); extra calls wait for a token, up to
+  LLM_SCHEDULER_MAX_WAIT_SECONDS, then fail fast
+- Global concurrency cap (LLM_MAX_CONCURRENCY): calls beyond it queue
+- Priority queue: interactive chat is admitted before background work
+  (titles, summaries); within a priority, users with fewer calls in
+  flight go first, so one client opening many streams cannot starve others
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+_PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+_WAIT_SAMPLES = 500
+_MAX_BUCKETS = 10000
+
+
+class LLMRateLimitError(RuntimeError):
+    """Raised when a call could not be admitted within the maximum wait."""
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously."""
+
+    def __init__(self, rate_per_second: float, burst: int):
+        self.rate = rate_per_second
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def take(self) -> float:
+        """
+        Take a token.
+
+        Returns:
+            0 if a token was taken, otherwise seconds until one is available
+        """
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class LLMScheduler:
+    """
+    Per-user rate limiting plus a prioritized global concurrency cap.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 32,
+        user_rate_per_minute: float = 20,
+        user_burst: int = 5,
+        max_wait_seconds: float = 10
+    ):
+        """
+        Args:
+            max_concurrency: Upstream LLM calls allowed in flight at once
+            user_rate_per_minute: Sustained calls per user per minute
+            user_burst: Calls a user may start back to back
+            max_wait_seconds: Longest a call may wait for admission
+        """
+        self.max_concurrency = max_concurrency
+        self.user_rate = user_rate_per_minute / 60.0
+        self.user_burst = user_burst
+        self.max_wait_seconds = max_wait_seconds
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._in_flight = 0
+        self._user_in_flight: Dict[str, int] = {}
+        self._queue: List[Tuple[int, int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._waits: Dict[int, Deque[float]] = {
+            priority: deque(maxlen=_WAIT_SAMPLES) for priority in _PRIORITY_NAMES
+        }
+        self._stats = {"admitted": 0, "throttled": 0, "rejected": 0}
+
+    def _bucket(self, user_key: str) -> TokenBucket:
+        bucket = self._buckets.get(user_key)
+        if bucket is None:
+            if len(self._buckets) >= _MAX_BUCKETS:
+                self._prune_buckets()
+            bucket = self._buckets[user_key] = TokenBucket(self.user_rate, self.user_burst)
+        return bucket
+
+    def _prune_buckets(self) -> None:
+        """Forget users whose bucket has refilled completely."""
+        for user_key, bucket in list(self._buckets.items()):
+            bucket._refill()
+            if bucket.tokens >= bucket.capacity:
+                del self._buckets[user_key]
+
+    async def _take_user_token(self, user_key: str, deadline: float) -> None:
+        """Wait for the user's token bucket, or fail once the wait would pass the deadline."""
+        bucket = self._bucket(user_key)
+        throttled = False
+        while True:
+            wait = bucket.take()
+            if wait == 0:
+                return
+            if time.monotonic() + wait > deadline:
+                self._stats["rejected"] += 1
+                raise LLMRateLimitError(f"Too many LLM requests for user {user_key}")
+            if not throttled:
+                throttled = True
+                self._stats["throttled"] += 1
+            await asyncio.sleep(wait)
+
+    async def _acquire_slot(self, user_key: str, priority: int, deadline: float) -> None:
+        """Take a global concurrency slot, queueing by priority and user load."""
+        # Drop waiters that already gave up
+        while self._queue and self._queue[0][3].done():
+            heapq.heappop(self._queue)
+        if self._in_flight < self.max_concurrency and not self._queue:
+            self._in_flight += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, self._user_in_flight.get(user_key, 0), next(self._sequence), future)
+        heapq.heappush(self._queue, entry)
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(future), timeout=max(deadline - time.monotonic(), 0)
+            )
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # Slot was handed over just as we gave up: pass it on
+                self._release_slot()
+            else:
+                future.cancel()
+            if isinstance(e, asyncio.TimeoutError):
+                self._stats["rejected"] += 1
+                raise LLMRateLimitError("LLM capacity exhausted, request timed out in queue") from e
+            raise
+
+    def _release_slot(self) -> None:
+        """Hand the slot to the next live waiter, or free it."""
+        while self._queue:
+            future = heapq.heappop(self._queue)[3]
+            if not future.done():
+                future.set_result(None)
+                return
+        self._in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        user_id: Optional[str] = None,
+        priority: int = INTERACTIVE
+    ) -> AsyncIterator[None]:
+        """
+        Hold an admission slot for one LLM call.
+
+        Args:
+            user_id: User the call is made for (None: system work, not rate limited)
+            priority: INTERACTIVE or BACKGROUND
+
+        Raises:
+            LLMRateLimitError: If the call is not admitted within the max wait
+        """
+        user_key = str(user_id) if user_id else "system"
+        started_at = time.monotonic()
+        deadline = started_at + self.max_wait_seconds
+
+        if user_id:
+            await self._take_user_token(user_key, deadline)
+        await self._acquire_slot(user_key, priority, deadline)
+
+        self._waits[priority].append((time.monotonic() - started_at) * 1000)
+        self._stats["admitted"] += 1
+        self._user_in_flight[user_key] = self._user_in_flight.get(user_key, 0) + 1
+        try:
+            yield
+        finally:
+            remaining = self._user_in_flight[user_key] - 1
+            if remaining:
+                self._user_in_flight[user_key] = remaining
+            else:
+                del self._user_in_flight[user_key]
+            self._release_slot()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, in-flight calls and admission wait percentiles."""
+        depth = {name: 0 for name in _PRIORITY_NAMES.values()}
+        for priority, _, _, future in self._queue:
+            if not future.done():
+                depth[_PRIORITY_NAMES[priority]] += 1
+
+        waits = {}
+        for priority, samples in self._waits.items():
+            ordered = sorted(samples)
+            waits[_PRIORITY_NAMES[priority]] = {
+                "p50": round(ordered[len(ordered) // 2], 1) if ordered else None,
+                "p95": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 1) if ordered else None,
+            }
+
+        return {
+            **self._stats,
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": depth,
+            "wait_ms": waits,
+            "active_users": len(self._user_in_flight),
+        }
+
+
+# Global scheduler instance
+_llm_scheduler = None
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Get or create global LLM scheduler instance."""
+    global _llm_scheduler
+    if _llm_scheduler is None:
+        _llm_scheduler = LLMScheduler(
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            user_rate_per_minute=settings.LLM_USER_RATE_PER_MINUTE,
+            user_burst=settings.LLM_USER_BURST,
+            max_wait_seconds=settings.LLM_SCHEDULER_MAX_WAIT_SECONDS
+        )
+    return _llm_scheduler
@@ -8,10 +8,11 @@ Uses ChromaDB for vector storage and sentence-transformers for embeddings.
 import os
 from typing import List, Dict, Optional
 import chromadb
-from sentence_transformers import SentenceTransformer
 from datetime import datetime
 import json
 
+from app.services.embeddings import get_embedding_model
+
 class MemoryService:
     def __init__(self):
         """Initialize the memory service with ChromaDB and embedding model."""
@@ -24,8 +25,8 @@ class MemoryService:
             metadata={"description": "User conversation history"}
         )
         
-        # Initialize embedding model (lightweight, fast)
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Shared embedding model (lightweight, fast)
+        self.embedding_model = get_embedding_model()
         
     def embed_text(self, text: str) -> List[float]:
         """Generate embedding for text."""
@@ -0,0 +1,177 @@
+"""
+Model Router - Complexity-based model selection
+
+Picks mistral-small or mistral-large and the max_tokens budget for each chat
+turn from cheap local signals: message length, intent, language, search
+context and the user's response_length preference. Small talk ("thanks",
+"ok", "kaise ho") goes to the faster model; searches, tools, long or
+multi-part questions and "detailed" users go to the large one.
+"""
+
+import logging
+import re
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from app.config import settings
+from app.services.language_agent import ENGLISH, OTHER, detect_language_local
+
+logger = logging.getLogger(__name__)
+
+SMALL = "small"
+LARGE = "large"
+
+# Intents that need tool output reasoning or careful instructions
+_LARGE_INTENTS = {"search", "calendar", "document"}
+
+# Response budget per response_length preference
+_LENGTH_BUDGETS = {"short": 300, "medium": 600, "long": 1000}
+
+# Signals of a request for structured or reasoning-heavy output
+_COMPLEX_RE = re.compile(
+    r"\b(explain|compare|analy[sz]e|step[- ]by[- ]step|plan|write|code|why|difference|pros and cons)\b",
+    re.IGNORECASE
+)
+
+_LATENCY_SAMPLES = 200
+
+
+class ModelRouter:
+    """
+    Routes chat turns between the small and large Mistral models.
+    """
+
+    def __init__(self):
+        """Initialize router with per-tier counters and latency samples."""
+        self.models = {
+            SMALL: settings.MISTRAL_SMALL_MODEL,
+            LARGE: settings.MISTRAL_LARGE_MODEL,
+        }
+        self._routed = {SMALL: 0, LARGE: 0}
+        self._latency: Dict[str, Dict[str, Deque[float]]] = {
+            tier: {"ttft_ms": deque(maxlen=_LATENCY_SAMPLES), "total_ms": deque(maxlen=_LATENCY_SAMPLES)}
+            for tier in (SMALL, LARGE)
+        }
+
+    def route(
+        self,
+        user_message: str,
+        intent: Optional[Dict] = None,
+        has_search_context: bool = False,
+        preferences: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """
+        Choose model and max_tokens for a turn.
+
+        Args:
+            user_message: User's message
+            intent: Intent result from the intent detector
+            has_search_context: Whether web search results are in the prompt
+            preferences: User preferences dict (or None)
+
+        Returns:
+            Dict with tier, model, max_tokens and reason
+        """
+        preferences = preferences or {}
+        intent_name = (intent or {}).get("intent", "chat")
+        language, _ = detect_language_local(user_message)
+        response_length = preferences.get("response_length") or "medium"
+        detailed = (
+            response_length == "long"
+            or preferences.get("conversation_style") == "detailed"
+        )
+
+        if not settings.MODEL_ROUTING_ENABLED:
+            tier, reason = LARGE, "routing disabled"
+        elif has_search_context:
+            tier, reason = LARGE, "search context"
+        elif intent_name in _LARGE_INTENTS:
+            tier, reason = LARGE, f"intent {intent_name}"
+        elif len(user_message) > settings.ROUTER_SMALL_MAX_CHARS:
+            tier, reason = LARGE, "long message"
+        elif user_message.count("?") > 1 or "\n" in user_message.strip():
+            tier, reason = LARGE, "multi-part message"
+        elif _COMPLEX_RE.search(user_message):
+            tier, reason = LARGE, "complex request"
+        elif detailed:
+            tier, reason = LARGE, "detailed preference"
+        else:
+            tier, reason = SMALL, "simple turn"
+
+        max_tokens = _LENGTH_BUDGETS.get(response_length, _LENGTH_BUDGETS["medium"])
+        if tier == SMALL and len(user_message) <= 20 and not detailed:
+            # "thanks", "ok", "hi" - a couple of sentences is plenty
+            max_tokens = min(max_tokens, 200)
+        if language not in (ENGLISH, OTHER):
+            # Urdu/Punjabi/Hindi (and Roman Urdu replies) take more tokens per word
+            max_tokens = int(max_tokens * 1.5)
+        max_tokens = min(max_tokens, settings.MAX_RESPONSE_TOKENS)
+
+        self._routed[tier] += 1
+        decision = {
+            "tier": tier,
+            "model": self.models[tier],
+            "max_tokens": max_tokens,
+            "reason": reason,
+        }
+        logger.info(f"🧭 Routed to {decision['model']} ({reason}, {language}, max_tokens={max_tokens})")
+        return decision
+
+    def record_latency(
+        self,
+        tier: str,
+        total_ms: float,
+        ttft_ms: Optional[float] = None
+    ) -> None:
+        """
+        Record generation latency for a tier.
+
+        Args:
+            tier: "small" or "large"
+            total_ms: Time from request to last token
+            ttft_ms: Time to first token (streaming only)
+        """
+        samples = self._latency.get(tier)
+        if samples is None:
+            return
+        samples["total_ms"].append(total_ms)
+        if ttft_ms is not None:
+            samples["ttft_ms"].append(ttft_ms)
+
+    @staticmethod
+    def _percentiles(values: Deque[float]) -> Dict[str, Optional[float]]:
+        if not values:
+            return {"p50": None, "p95": None}
+        ordered = sorted(values)
+        return {
+            "p50": round(ordered[len(ordered) // 2], 1),
+            "p95": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 1),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Routing counts and recent latency percentiles per tier."""
+        total = sum(self._routed.values())
+        return {
+            "routed": dict(self._routed),
+            "small_share": round(self._routed[SMALL] / total, 3) if total else 0.0,
+            "latency_ms": {
+                tier: {
+                    "model": self.models[tier],
+                    "ttft": self._percentiles(samples["ttft_ms"]),
+                    "total": self._percentiles(samples["total_ms"]),
+                }
+                for tier, samples in self._latency.items()
+            },
+        }
+
+
+# Global model router instance
+_model_router = None
+
+
+def get_model_router() -> ModelRouter:
+    """Get or create global model router instance."""
+    global _model_router
+    if _model_router is None:
+        _model_router = ModelRouter()
+    return _model_router
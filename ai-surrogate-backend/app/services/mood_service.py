@@ -6,8 +6,8 @@ Handles mood tracking business logic.
 
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, desc, select
 
 from app.models import MoodEntry, User
 
@@ -16,8 +16,8 @@ class MoodService:
     """Service for mood tracking operations."""
     
     @staticmethod
-    def track_mood(
-        db: Session,
+    async def track_mood(
+        db: AsyncSession,
         user_id: str,
         mood: str,
         intensity: int = 3,
@@ -45,14 +45,14 @@ class MoodService:
         )
         
         db.add(mood_entry)
-        db.commit()
-        db.refresh(mood_entry)
+        await db.commit()
+        await db.refresh(mood_entry)
         
         return mood_entry
     
     @staticmethod
-    def get_mood_history(
-        db: Session,
+    async def get_mood_history(
+        db: AsyncSession,
         user_id: str,
         days: int = 7
     ) -> List[MoodEntry]:
@@ -69,14 +69,17 @@ class MoodService:
         """
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         
-        return db.query(MoodEntry).filter(
-            MoodEntry.user_id == user_id,
-            MoodEntry.created_at >= cutoff_date
-        ).order_by(desc(MoodEntry.created_at)).all()
+        result = await db.scalars(
+            select(MoodEntry).filter(
+                MoodEntry.user_id == user_id,
+                MoodEntry.created_at >= cutoff_date
+            ).order_by(desc(MoodEntry.created_at))
+        )
+        return result.all()
     
     @staticmethod
-    def get_mood_stats(
-        db: Session,
+    async def get_mood_stats(
+        db: AsyncSession,
         user_id: str,
         days: int = 7
     ) -> Dict:
@@ -94,27 +97,28 @@ class MoodService:
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         
         # Get mood distribution
-        mood_distribution = db.query(
-            MoodEntry.mood,
-            func.count(MoodEntry.id).label('count')
-        ).filter(
-            MoodEntry.user_id == user_id,
-            MoodEntry.created_at >= cutoff_date
-        ).group_by(MoodEntry.mood).all()
-        
-        # Get average intensity
-        avg_intensity = db.query(
-            func.avg(MoodEntry.intensity)
-        ).filter(
-            MoodEntry.user_id == user_id,
-            MoodEntry.created_at >= cutoff_date
-        ).scalar() or 0
+        mood_distribution = (await db.execute(
+            select(
+                MoodEntry.mood,
+                func.count(MoodEntry.id).label('count')
+            ).filter(
+                MoodEntry.user_id == user_id,
+                MoodEntry.created_at >= cutoff_date
+            ).group_by(MoodEntry.mood)
+        )).all()
         
-        # Get total check-ins
-        total_checkins = db.query(func.count(MoodEntry.id)).filter(
-            MoodEntry.user_id == user_id,
-            MoodEntry.created_at >= cutoff_date
-        ).scalar() or 0
+        # Get average intensity and total check-ins in one round trip
+        avg_intensity, total_checkins = (await db.execute(
+            select(
+                func.avg(MoodEntry.intensity),
+                func.count(MoodEntry.id)
+            ).filter(
+                MoodEntry.user_id == user_id,
+                MoodEntry.created_at >= cutoff_date
+            )
+        )).one()
+        avg_intensity = avg_intensity or 0
+        total_checkins = total_checkins or 0
         
         # Calculate distribution percentages
         distribution = {}
@@ -133,8 +137,8 @@ class MoodService:
         }
     
     @staticmethod
-    def get_mood_timeline(
-        db: Session,
+    async def get_mood_timeline(
+        db: AsyncSession,
         user_id: str,
         days: int = 7
     ) -> List[Dict]:
@@ -152,16 +156,18 @@ class MoodService:
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         
         # Get daily averages
-        daily_moods = db.query(
-            func.date(MoodEntry.created_at).label('date'),
-            func.avg(MoodEntry.intensity).label('avg_intensity'),
-            func.count(MoodEntry.id).label('count')
-        ).filter(
-            MoodEntry.user_id == user_id,
-            MoodEntry.created_at >= cutoff_date
-        ).group_by(
-            func.date(MoodEntry.created_at)
-        ).order_by('date').all()
+        daily_moods = (await db.execute(
+            select(
+                func.date(MoodEntry.created_at).label('date'),
+                func.avg(MoodEntry.intensity).label('avg_intensity'),
+                func.count(MoodEntry.id).label('count')
+            ).filter(
+                MoodEntry.user_id == user_id,
+                MoodEntry.created_at >= cutoff_date
+            ).group_by(
+                func.date(MoodEntry.created_at)
+            ).order_by('date')
+        )).all()
         
         timeline = []
         for date, avg_intensity, count in daily_moods:
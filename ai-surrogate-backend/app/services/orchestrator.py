@@ -5,159 +5,28 @@ Manual orchestration with PostgreSQL context + Agno agents for specialized tasks
 This gives us full control and debuggability while keeping agent capabilities.
 """
 
+import asyncio
 import logging
+import time
 from typing import Optional
-from sqlalchemy.orm import Session
-from mistralai import Mistral
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.models import Message
+from app.services.context_builder import load_conversation_context
 from app.services.intent_detector import get_intent_detector
+from app.services.language_agent import detect_language_local
+from app.services.llm_client import get_llm_client
+from app.services.llm_scheduler import LLMRateLimitError
+from app.services.model_router import get_model_router
+from app.services.preferences_service import preferences_service
+from app.services.response_cache import get_response_cache
 from app.services.search_service import get_search_service
+from app.services.single_flight import fingerprint, llm_flights
 
 logger = logging.getLogger(__name__)
 
-
-class ChatOrchestrator:
-    """
-    Hybrid AI orchestrator.
-    
-    - Manual control with direct Mistral API for simple chats
-    - Agno agents on-demand for specialized tasks
-    - Full PostgreSQL context integration
-    """
-    
-    def __init__(self):
-        """Initialize orchestrator with Mistral client."""
-        self.mistral = Mistral(api_key=settings.MISTRAL_API_KEY)
-        self._finance_agent = None
-        self.intent_detector = get_intent_detector()
-        self.search_service = get_search_service()
-        logger.info("✅ Chat Orchestrator initialized")
-    
-    def get_conversation_history(
-        self,
-        conversation_id: str,
-        db: Session,
-        max_messages: int = 10
-    ) -> list[dict]:
-        """
-        Get conversation history from PostgreSQL.
-        
-        Args:
-            conversation_id: Conversation ID
-            db: Database session
-            max_messages: Maximum messages to retrieve
-            
-        Returns:
-            List of message dicts in chronological order
-        """
-        try:
-            # Get recent messages from PostgreSQL
-            messages = (
-                db.query(Message)
-                .filter(Message.conversation_id == conversation_id)
-                .order_by(Message.created_at.desc())
-                .limit(max_messages)
-                .all()
-            )
-            
-            # Reverse for chronological order
-            messages = list(reversed(messages))
-            
-            # Convert to dict format (Mistral 1.0+)
-            context = []
-            for msg in messages:
-                role = "user" if msg.is_from_user else "assistant"
-                context.append({"role": role, "content": msg.content})
-            
-            logger.info(f"📚 Loaded {len(context)} messages from PostgreSQL")
-            return context
-            
-        except Exception as e:
-            logger.error(f"Error loading history: {e}")
-            return []
-    
-    async def chat(
-        self,
-        user_message: str,
-        conversation_id: Optional[str] = None,
-        db: Optional[Session] = None
-    ) -> str:
-        """
-        Main chat method with full context and tool routing.
-        
-        Args:
-            user_message: User's message
-            conversation_id: Optional conversation ID for context
-            db: Database session
-            
-        Returns:
-            AI response string
-        """
-        try:
-            # Detect intent
-            intent = await self.intent_detector.detect_intent(user_message)
-            
-            # Route to appropriate tool if needed
-            if intent["tool"] == "search" and intent["confidence"] > 0.7:
-                return await self._handle_search_intent(user_message, conversation_id, db)
-            
-            # Continue with normal chat
-            return await self._handle_chat(user_message, conversation_id, db)
-            
-        except Exception as e:
-            logger.error(f"Chat error: {e}")
-            return f"I apologize, but I encountered an error. Please try again."
-    
-    async def _handle_search_intent(
-        self,
-        user_message: str,
-        conversation_id: Optional[str] = None,
-        db: Optional[Session] = None
-    ) -> str:
-        """Handle search intent by performing search and generating response."""
-        try:
-            # Perform search
-            search_result = await self.search_service.search(user_message, num_results=5)
-            
-            if not search_result.get("success"):
-                # Fallback to chat if search fails
-                return await self._handle_chat(user_message, conversation_id, db)
-            
-            # Build context with search results
-            search_summary = search_result.get("summary", "")
-            search_results = search_result.get("results", [])
-            
-            # Create enhanced prompt with search results
-            enhanced_message = f"""User asked: {user_message}
-
-I found the following information:
-
-{search_summary}
-
-Please provide a helpful response based on this information. If the information is relevant, use it. If not, provide a general helpful response."""
-            
-            # Get AI response with search context
-            return await self._handle_chat(enhanced_message, conversation_id, db)
-            
-        except Exception as e:
-            logger.error(f"Search intent handling error: {e}")
-            return await self._handle_chat(user_message, conversation_id, db)
-    
-    async def _handle_chat(
-        self,
-        user_message: str,
-        conversation_id: Optional[str] = None,
-        db: Optional[Session] = None
-    ) -> str:
-        """Handle normal chat without tools."""
-        try:
-            # Build messages array
-            messages = []
-            
-            # System prompt with strict bilingual + emotion detection + formatting
-            system_prompt = """You are a helpful, empathetic AI assistant with bilingual capabilities.
+# System prompt with strict bilingual + emotion detection + formatting
+SYSTEM_PROMPT = """You are a helpful, empathetic AI assistant with bilingual capabilities.
 
 CRITICAL LANGUAGE DETECTION RULES:
 Read the user's CURRENT message ONLY to determine language. Do NOT switch languages based on conversation history.
@@ -232,114 +101,486 @@ Example (Urdu):
 
 EMOTION: neutral"
 """
+
+RATE_LIMITED_MESSAGE = "You're sending messages faster than I can answer. Please wait a moment and try again."
+
+
+class ChatOrchestrator:
+    """
+    Hybrid AI orchestrator.
+    
+    - Manual control with direct Mistral API for simple chats
+    - Agno agents on-demand for specialized tasks
+    - Full PostgreSQL context integration
+    """
+    
+    def __init__(self):
+        """Initialize orchestrator with the shared async LLM client."""
+        self.llm = get_llm_client()
+        self._finance_agent = None
+        self.intent_detector = get_intent_detector()
+        self.search_service = get_search_service()
+        self.response_cache = get_response_cache()
+        self.model_router = get_model_router()
+        logger.info("✅ Chat Orchestrator initialized")
+    
+    async def get_conversation_history(
+        self,
+        conversation_id: str,
+        db: AsyncSession,
+        max_tokens: Optional[int] = None
+    ) -> list[dict]:
+        """
+        Get conversation history (history cache, PostgreSQL on a miss).
+        
+        Keeps as many recent turns as fit in the token budget, using the
+        per-message token counts stored at insert time.
+        
+        Args:
+            conversation_id: Conversation ID
+            db: Database session
+            max_tokens: History token budget (default: MAX_CONTEXT_TOKENS)
+            
+        Returns:
+            List of message dicts in chronological order
+        """
+        return (await self.get_conversation_context(conversation_id, db, max_tokens=max_tokens))[1]
+    
+    async def get_conversation_context(
+        self,
+        conversation_id: str,
+        db: AsyncSession,
+        max_tokens: Optional[int] = None
+    ) -> tuple[Optional[str], list[dict]]:
+        """
+        Get the rolling conversation summary plus the recent turns after it.
+        
+        Args:
+            conversation_id: Conversation ID
+            db: Database session
+            max_tokens: History token budget (default: MAX_CONTEXT_TOKENS)
+            
+        Returns:
+            Tuple of (summary or None, message dicts in chronological order)
+        """
+        try:
+            return await load_conversation_context(db, conversation_id, max_tokens=max_tokens)
+        except Exception as e:
+            logger.error(f"Error loading history: {e}")
+            return None, []
+    
+    def _build_messages(
+        self,
+        user_message: str,
+        history: list[dict],
+        summary: Optional[str] = None
+    ) -> list[dict]:
+        """
+        Build the Mistral messages array: system prompt, history, current message.
+        
+        Args:
+            user_message: Message to send as the current user turn
+            history: Prior conversation turns in chronological order
+            summary: Rolling summary of turns older than ``history``
             
-            messages.append({"role": "system", "content": system_prompt})
+        Returns:
+            List of message dicts ready for the chat API
+        """
+        system_prompt = SYSTEM_PROMPT
+        if summary:
+            system_prompt += f"\nCONVERSATION SO FAR (summary of earlier messages):\n{summary}\n"
+        
+        messages = [{"role": "system", "content": system_prompt}]
+        messages.extend(history)
+        messages.append({"role": "user", "content": user_message})
+        
+        logger.info(f"🤖 Calling Mistral with {len(messages)} messages (system + {len(messages)-2} history + current)")
+        return messages
+    
+    async def _await_stage(self, task: asyncio.Task, deadline: float, default, stage: str):
+        """
+        Await an optional pipeline stage until the shared deadline.
+        
+        A stage that misses the deadline (or fails) is cancelled and
+        ``default`` is returned, so generation is never held up by it.
+        """
+        remaining = max(deadline - asyncio.get_running_loop().time(), 0)
+        try:
+            return await asyncio.wait_for(task, timeout=remaining)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ Pipeline stage '{stage}' missed the deadline, continuing without it")
+        except Exception as e:
+            logger.error(f"Pipeline stage '{stage}' failed: {e}")
+        return default
+    
+    async def _load_turn_state(
+        self,
+        user_message: str,
+        conversation_id: Optional[str],
+        user_id: Optional[str],
+        db: AsyncSession
+    ) -> dict:
+        """Load summary, recent history and user preferences."""
+        summary, history = (
+            await self.get_conversation_context(conversation_id, db)
+            if conversation_id else (None, [])
+        )
+        
+        # Routes save the user's message before generating; it is sent as the
+        # current turn, so drop it from history instead of sending it twice
+        if history and history[-1]["role"] == "user" and history[-1]["content"] == user_message:
+            history = history[:-1]
+        
+        preferences = None
+        if user_id:
+            try:
+                preferences = await preferences_service.get_preferences(user_id, db)
+            except Exception as e:
+                logger.error(f"Error loading preferences: {e}")
+        
+        # End the read transaction so the pooled connection goes back before
+        # generation instead of being held for the whole LLM call. Commit, not
+        # rollback: sessions don't expire on commit, so the caller's loaded
+        # objects stay usable.
+        if db.in_transaction():
+            await db.commit()
+        
+        return {"summary": summary, "history": history, "preferences": preferences}
+    
+    async def _prepare_turn(
+        self,
+        user_message: str,
+        conversation_id: Optional[str] = None,
+        db: Optional[AsyncSession] = None,
+        user_id: Optional[str] = None
+    ) -> dict:
+        """
+        Run the pre-generation pipeline concurrently.
+        
+        History loading, keyword intent and (for search intents, even
+        medium-confidence ones) the web search all start at once. The LLM
+        intent fallback and the search are bounded by one shared deadline;
+        a speculative search whose intent is not confirmed is discarded.
+        
+        Args:
+            user_message: User's message
+            conversation_id: Optional conversation ID for context
+            db: Database session
+            user_id: Optional user ID for personalization
             
-            # Add conversation history from PostgreSQL
-            if conversation_id and db:
-                history = self.get_conversation_history(conversation_id, db)
-                messages.extend(history)
+        Returns:
+            Dict with prompt, intent, summary, history and preferences
+        """
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        deadline = started_at + settings.PIPELINE_DEADLINE_SECONDS
+        
+        # History is always needed. It runs to completion (no deadline) because
+        # the session must not be touched again while a query is in flight.
+        state_task = None
+        if db and (conversation_id or user_id):
+            state_task = asyncio.create_task(
+                self._load_turn_state(user_message, conversation_id, user_id, db)
+            )
+        
+        search_task = None
+        try:
+            # Keyword intent is local and instant
+            intent = self.intent_detector.detect_keywords(user_message)
             
-            # Add current user message
-            messages.append({"role": "user", "content": user_message})
+            # Start the search now, speculatively if the intent is not yet confirmed
+            if intent["tool"] == "search" and intent["confidence"] >= settings.SPECULATIVE_SEARCH_MIN_CONFIDENCE:
+                search_task = asyncio.create_task(
+                    self.search_service.search(user_message, num_results=5)
+                )
             
-            logger.info(f"🤖 Calling Mistral with {len(messages)} messages (system + {len(messages)-2} history + current)")
+            # Refine with the LLM only when keywords are inconclusive
+            if not self.intent_detector.is_conclusive(intent):
+                intent = await self._await_stage(
+                    asyncio.create_task(
+                        self.intent_detector.detect_intent(
+                            user_message, keyword_intent=intent, user_id=user_id
+                        )
+                    ),
+                    deadline,
+                    default=intent,
+                    stage="intent"
+                )
             
-            # Direct Mistral API call (version 1.0+)
-            # Note: Mistral API calls are synchronous, so we run in thread pool
-            import asyncio
-            try:
-                # Run blocking API call in thread pool with timeout
-                loop = asyncio.get_event_loop()
-                
-                # Create the API call function
-                def call_mistral():
-                    return self.mistral.chat.complete(
-                        model="mistral-large-latest",
-                        messages=messages,
-                        temperature=0.7,
-                        max_tokens=1000
+            prompt = user_message
+            if intent["tool"] == "search" and intent["confidence"] > 0.7:
+                if search_task is None:
+                    search_task = asyncio.create_task(
+                        self.search_service.search(user_message, num_results=5)
                     )
-                
-                # Execute with timeout
-                response = await asyncio.wait_for(
-                    loop.run_in_executor(None, call_mistral),
-                    timeout=25.0  # 25 seconds max
-                )
-                
-                if not response or not response.choices:
-                    logger.error("❌ Empty response from Mistral")
-                    return "I apologize, but I couldn't generate a response. Please try again."
-                
-                ai_response = response.choices[0].message.content
-                logger.info(f"✅ Response generated: {len(ai_response)} chars")
-                
-                return ai_response
-            except asyncio.TimeoutError:
-                logger.error("❌ Mistral API timeout (25s) - Render free tier may be slow")
-                return "I apologize, but the response is taking longer than expected. This might be due to server cold start. Please try again in a moment."
-            except Exception as api_error:
-                logger.error(f"❌ Mistral API error: {api_error}")
-                import traceback
-                traceback.print_exc()
-                return "I encountered an error processing your request. Please try again."
+                search_result = await self._await_stage(search_task, deadline, default=None, stage="search")
+                prompt = self._build_search_prompt(user_message, search_result)
+            elif search_task is not None:
+                # Speculative search not needed; cancelling reaches the provider
+                # request unless an identical search is shared with another turn
+                search_task.cancel()
+        except Exception as e:
+            logger.error(f"Intent routing error: {e}")
+            if search_task is not None:
+                search_task.cancel()
+            prompt = user_message
+            intent = {"intent": "chat", "confidence": 0.5, "tool": None}
+        
+        if state_task:
+            state = await state_task
+        else:
+            state = {"summary": None, "history": [], "preferences": None}
+        
+        elapsed_ms = (loop.time() - started_at) * 1000
+        logger.info(f"⏱️ Pre-LLM pipeline: {elapsed_ms:.0f}ms (intent: {intent['intent']}, history: {len(state['history'])}, summary: {bool(state['summary'])})")
+        return {"prompt": prompt, "intent": intent, **state}
+    
+    def _build_search_prompt(self, user_message: str, search_result: Optional[dict]) -> str:
+        """Build a prompt that includes web search results (or the plain message)."""
+        if not search_result or not search_result.get("success"):
+            # Fallback to plain chat if search fails
+            return user_message
+        
+        # Build context with search results
+        search_summary = search_result.get("summary", "")
+        
+        # Create enhanced prompt with search results
+        return f"""User asked: {user_message}
+
+I found the following information:
+
+{search_summary}
+
+Please provide a helpful response based on this information. If the information is relevant, use it. If not, provide a general helpful response."""
+    
+    async def _lookup_cached_response(
+        self,
+        user_message: str,
+        turn: dict,
+        use_cache: bool
+    ) -> tuple[Optional[str], Optional[dict]]:
+        """
+        Check the response cache for context-free small talk.
+        
+        Only turns with no history, no summary and no search context are
+        eligible, since their answer depends on the message alone; and only
+        short, impersonal small talk, since cached replies are shared across
+        users (a personal first message must never be stored or served).
+        
+        Returns:
+            Tuple of (cached response or None, cache context for storing, or None if not cacheable)
+        """
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return None, None
+        if not use_cache:
+            self.response_cache.record_bypass()
+            return None, None
+        if turn["history"] or turn["summary"] or turn["prompt"] != user_message:
+            return None, None
+        if not self.response_cache.cacheable(user_message):
+            return None, None
+        
+        try:
+            return await self.response_cache.lookup(
+                user_message,
+                language=detect_language_local(user_message)[0],
+                fingerprint=preferences_service.fingerprint(turn["preferences"])
+            )
+        except Exception as e:
+            logger.error(f"Response cache lookup failed: {e}")
+            return None, None
+    
+    async def chat(
+        self,
+        user_message: str,
+        conversation_id: Optional[str] = None,
+        db: Optional[AsyncSession] = None,
+        user_id: Optional[str] = None,
+        use_cache: bool = True
+    ) -> str:
+        """
+        Main chat method with full context and tool routing.
+        
+        Args:
+            user_message: User's message
+            conversation_id: Optional conversation ID for context
+            db: Database session
+            user_id: Optional user ID for personalization
+            use_cache: Set False to bypass the response cache
             
+        Returns:
+            AI response string
+        """
+        try:
+            turn = await self._prepare_turn(user_message, conversation_id, db, user_id)
+            
+            cached, cache_context = await self._lookup_cached_response(user_message, turn, use_cache)
+            if cached:
+                return cached
+            
+            route = self._route_turn(user_message, turn)
+            
+            # Duplicate sends (retries, double taps) share one generation
+            ai_response = await llm_flights.do(
+                fingerprint(user_id, conversation_id, user_message, route["model"]),
+                lambda: self._handle_chat(turn, route, user_id)
+            )
+            
+            if not ai_response:
+                logger.error("❌ Empty response from Mistral")
+                return "I apologize, but I couldn't generate a response. Please try again."
+            
+            logger.info(f"✅ Response generated: {len(ai_response)} chars")
+            if cache_context:
+                self.response_cache.store(cache_context, ai_response)
+            return ai_response
+            
+        except LLMRateLimitError:
+            logger.warning(f"🚦 LLM call not admitted for user {user_id}")
+            return RATE_LIMITED_MESSAGE
+        except asyncio.TimeoutError:
+            logger.error(f"❌ Mistral API timeout ({settings.LLM_TIMEOUT_SECONDS:.0f}s) - Render free tier may be slow")
+            return "I apologize, but the response is taking longer than expected. This might be due to server cold start. Please try again in a moment."
         except Exception as e:
             logger.error(f"Chat error: {e}")
+            import traceback
+            traceback.print_exc()
             return f"I apologize, but I encountered an error. Please try again."
     
+    def _route_turn(self, user_message: str, turn: dict) -> dict:
+        """Pick model and max_tokens for a prepared turn."""
+        return self.model_router.route(
+            user_message,
+            intent=turn["intent"],
+            has_search_context=turn["prompt"] != user_message,
+            preferences=turn["preferences"]
+        )
+    
+    async def _handle_chat(self, turn: dict, route: dict, user_id: Optional[str] = None) -> str:
+        """
+        Generate a complete response for a prepared turn.
+        
+        Raises:
+            asyncio.TimeoutError: If Mistral does not answer in time
+        """
+        messages = self._build_messages(turn["prompt"], turn["history"], turn["summary"])
+        
+        # Native async Mistral call on the shared pooled client
+        started_at = time.perf_counter()
+        response = await self.llm.complete(
+            messages=messages,
+            model=route["model"],
+            temperature=0.7,
+            max_tokens=route["max_tokens"],
+            timeout=settings.LLM_TIMEOUT_SECONDS,
+            user_id=user_id
+        )
+        self.model_router.record_latency(route["tier"], (time.perf_counter() - started_at) * 1000)
+        return response
+    
     async def stream_chat(
         self,
         user_message: str,
         conversation_id: Optional[str] = None,
-        db: Optional[Session] = None
+        db: Optional[AsyncSession] = None,
+        metrics: Optional[dict] = None,
+        user_id: Optional[str] = None,
+        use_cache: bool = True
     ):
         """
-        Stream chat response word by word.
+        Stream chat response token by token from Mistral's streaming API.
+        
+        The pre-LLM pipeline (history, intent, search) runs concurrently
+        before generation starts; deltas are yielded as soon as Mistral
+        sends them. Cached context-free answers are yielded in one chunk.
         
         Args:
             user_message: User's message
             conversation_id: Optional conversation ID for context
             db: Database session
+            metrics: Optional dict filled with model and token usage
+            user_id: Optional user ID for personalization
+            use_cache: Set False to bypass the response cache
             
         Yields:
             String chunks
         """
+        if metrics is None:
+            metrics = {}
+        
+        yielded = False
         try:
-            # Get complete response with timeout (route handler sends "Thinking..." indicator)
-            import asyncio
+            turn = await self._prepare_turn(user_message, conversation_id, db, user_id)
+            
+            cached, cache_context = await self._lookup_cached_response(user_message, turn, use_cache)
+            if cached:
+                metrics["cache"] = "hit"
+                yield cached
+                return
+            if cache_context:
+                metrics["cache"] = "miss"
+            
+            messages = self._build_messages(turn["prompt"], turn["history"], turn["summary"])
+            
+            route = self._route_turn(user_message, turn)
+            model = route["model"]
+            metrics["model"] = model
+            metrics["tier"] = route["tier"]
+            
+            response_parts = []
+            started_at = time.perf_counter()
+            ttft_ms = None
             try:
-                response = await asyncio.wait_for(
-                    self.chat(user_message, conversation_id, db),
-                    timeout=25.0  # 25 seconds max for API call
-                )
+                # The client bounds the wait for the stream to open
+                # (route handler sends "Thinking..." indicator meanwhile).
+                # A duplicate send attaches to the generation already running.
+                async for delta in llm_flights.stream(
+                    fingerprint(user_id, conversation_id, user_message, model),
+                    lambda usage: self.llm.stream(
+                        messages=messages,
+                        model=model,
+                        temperature=0.7,
+                        max_tokens=route["max_tokens"],
+                        timeout=settings.LLM_TIMEOUT_SECONDS,
+                        usage=usage,
+                        user_id=user_id
+                    ),
+                    usage=metrics
+                ):
+                    if ttft_ms is None:
+                        ttft_ms = (time.perf_counter() - started_at) * 1000
+                    yielded = True
+                    response_parts.append(delta)
+                    yield delta
+            except LLMRateLimitError:
+                logger.warning(f"🚦 LLM stream not admitted for user {user_id}")
+                yield RATE_LIMITED_MESSAGE
+                return
             except asyncio.TimeoutError:
-                logger.error("❌ Chat timeout (25s)")
+                if yielded:
+                    raise
+                logger.error(f"❌ Mistral stream timeout ({settings.LLM_TIMEOUT_SECONDS:.0f}s)")
                 yield "I apologize, but the response is taking too long. Please try again."
                 return
-            except Exception as api_error:
-                logger.error(f"❌ Chat API error: {api_error}")
-                yield f"I encountered an error. Please try again."
-                return
             
-            # Stream word by word with small delay
-            if response:
-                words = response.split()
-                for i, word in enumerate(words):
-                    if i < len(words) - 1:
-                        yield word + " "
-                    else:
-                        yield word
-                    # Small delay for smooth streaming
-                    await asyncio.sleep(0.02)
-            else:
+            if not yielded:
                 yield "I apologize, but I couldn't generate a response. Please try again."
+                return
+            
+            self.model_router.record_latency(
+                route["tier"], (time.perf_counter() - started_at) * 1000, ttft_ms=ttft_ms
+            )
+            if cache_context:
+                self.response_cache.store(cache_context, "".join(response_parts))
                     
         except Exception as e:
             logger.error(f"Streaming error: {e}")
             import traceback
             traceback.print_exc()
-            yield f"I encountered an error: {str(e)}"
+            if yielded:
+                # Partial answer already sent - let the route report the failure
+                raise
+            yield f"I encountered an error. Please try again."
 
 
 # Global orchestrator instance
@@ -5,8 +5,11 @@ Manages user preferences and personalization settings.
 """
 
 from typing import Optional, Dict, List
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user_preference import UserPreference
+import hashlib
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,65 +19,94 @@ class PreferencesService:
     """Service for managing user preferences."""
     
     @staticmethod
-    def get_or_create_preferences(user_id: str, db: Session) -> UserPreference:
+    async def get_or_create_preferences(user_id: str, db: AsyncSession) -> UserPreference:
         """Get user preferences or create default ones."""
-        prefs = db.query(UserPreference).filter(
-            UserPreference.user_id == user_id
-        ).first()
+        prefs = await db.scalar(
+            select(UserPreference).where(UserPreference.user_id == user_id)
+        )
         
         if not prefs:
             prefs = UserPreference(user_id=user_id)
             db.add(prefs)
-            db.commit()
-            db.refresh(prefs)
+            await db.commit()
+            await db.refresh(prefs)
             logger.info(f"Created default preferences for user {user_id}")
         
         return prefs
     
     @staticmethod
-    def update_preferences(
+    async def get_preferences(user_id: str, db: AsyncSession) -> Optional[Dict]:
+        """Get user preferences as a dict without creating defaults (read-only)."""
+        prefs = await db.scalar(
+            select(UserPreference).where(UserPreference.user_id == user_id)
+        )
+        return prefs.to_dict() if prefs else None
+    
+    @staticmethod
+    def fingerprint(preferences: Optional[Dict]) -> str:
+        """
+        Short stable hash of the preferences that shape AI responses.
+        
+        Users with identical personalization share a fingerprint.
+        """
+        if not preferences:
+            return "default"
+        
+        relevant = {
+            key: preferences.get(key)
+            for key in (
+                "preferred_language", "preferred_tone", "conversation_style",
+                "response_length", "name", "custom_context"
+            )
+        }
+        payload = json.dumps(relevant, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+    
+    @staticmethod
+    async def update_preferences(
         user_id: str,
-        db: Session,
+        db: AsyncSession,
         **kwargs
     ) -> UserPreference:
         """Update user preferences."""
-        prefs = PreferencesService.get_or_create_preferences(user_id, db)
+        prefs = await PreferencesService.get_or_create_preferences(user_id, db)
         
         # Update fields
         for key, value in kwargs.items():
             if hasattr(prefs, key):
                 setattr(prefs, key, value)
         
-        db.commit()
-        db.refresh(prefs)
+        await db.commit()
+        await db.refresh(prefs)
         logger.info(f"Updated preferences for user {user_id}")
         
         return prefs
     
     @staticmethod
-    def add_topic_of_interest(
+    async def add_topic_of_interest(
         user_id: str,
         topic: str,
-        db: Session
+        db: AsyncSession
     ) -> UserPreference:
         """Add a topic to user's interests."""
-        prefs = PreferencesService.get_or_create_preferences(user_id, db)
+        prefs = await PreferencesService.get_or_create_preferences(user_id, db)
         
         if not prefs.topics_of_interest:
             prefs.topics_of_interest = []
         
         if topic not in prefs.topics_of_interest:
-            prefs.topics_of_interest.append(topic)
-            db.commit()
-            db.refresh(prefs)
+            # Reassign so the JSON column is flagged as changed
+            prefs.topics_of_interest = prefs.topics_of_interest + [topic]
+            await db.commit()
+            await db.refresh(prefs)
             logger.info(f"Added topic '{topic}' for user {user_id}")
         
         return prefs
     
     @staticmethod
-    def get_personalization_context(user_id: str, db: Session) -> str:
+    async def get_personalization_context(user_id: str, db: AsyncSession) -> str:
         """Get personalization context for AI prompts."""
-        prefs = PreferencesService.get_or_create_preferences(user_id, db)
+        prefs = await PreferencesService.get_or_create_preferences(user_id, db)
         
         context = []
         
@@ -0,0 +1,220 @@
+"""
+Response Cache - Semantic cache for context-free chat turns
+
+Greetings and small talk ("hi", "how are you", "kaise ho") don't need a
+fresh mistral-large call every time. Responses for context-free turns (no
+history, no search) are cached by normalized text + language +
+personalization fingerprint. On an exact miss, the MiniLM embedding of the
+message is compared against cached entries in the same language/fingerprint
+bucket.
+
+Cached replies are shared across users, so only short small-talk messages
+without first-person words are eligible (see cacheable()). A long or personal
+opener is never stored, and never answered from the cache.
+
+Opt-in via RESPONSE_CACHE_ENABLED; entries expire by TTL and are evicted LRU.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+from app.services.embeddings import embed_texts, embeddings_available, np
+from app.services.intent_detector import match_keyword_groups
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]", re.UNICODE)
+_REPEATED_CHAR_RE = re.compile(r"(\w)\1{2,}", re.UNICODE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# First-person words (English, Roman Urdu, Urdu): a message about the user
+# may carry personal details and is never answered with a shared reply
+_PERSONAL_WORDS = frozenset("""
+    i im ive id me my mine myself main mein mera meri mere mujhe mujh
+    میں میرا میری میرے مجھے
+""".split())
+
+
+class ResponseCache:
+    """
+    In-process LRU + TTL cache with embedding-similarity lookup.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600,
+        similarity_threshold: float = 0.92,
+        max_chars: int = 40
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum cached responses (least recently used evicted first)
+            ttl_seconds: Seconds before an entry expires
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            max_chars: Longest (normalized) message eligible for caching
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.max_chars = max_chars
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._stats = {
+            "hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "ineligible": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lowercase, drop punctuation/emoji, squeeze repeats ("hiii!!" -> "hi")."""
+        text = _PUNCTUATION_RE.sub(" ", text.lower())
+        text = _REPEATED_CHAR_RE.sub(r"\1", text)
+        return _WHITESPACE_RE.sub(" ", text).strip()
+
+    def cacheable(self, message: str) -> bool:
+        """
+        Whether a message is generic enough to share one reply across users.
+
+        Only short small talk qualifies; longer or first-person messages may
+        carry personal details that a similar message must never get back.
+        """
+        normalized = self.normalize(message)
+        eligible = (
+            0 < len(normalized) <= self.max_chars
+            and not _PERSONAL_WORDS.intersection(normalized.split())
+            and match_keyword_groups(normalized) == {"smalltalk"}
+        )
+        if not eligible:
+            self._stats["ineligible"] += 1
+        return eligible
+
+    @staticmethod
+    def _key(normalized: str, language: str, fingerprint: str) -> str:
+        return f"{language}|{fingerprint}|{normalized}"
+
+    def _expired(self, entry: Dict[str, Any]) -> bool:
+        return entry["expires_at"] < time.monotonic()
+
+    async def lookup(
+        self,
+        message: str,
+        language: str,
+        fingerprint: str
+    ) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Args:
+            message: User's message
+            language: Detected language bucket
+            fingerprint: Personalization fingerprint
+
+        Returns:
+            Tuple of (cached response or None, lookup context to pass to store())
+        """
+        normalized = self.normalize(message)
+        key = self._key(normalized, language, fingerprint)
+        context = {
+            "key": key,
+            "language": language,
+            "fingerprint": fingerprint,
+            "embedding": None,
+        }
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if not self._expired(entry):
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry["response"], context
+            del self._entries[key]
+
+        if embeddings_available and normalized:
+            candidates = [
+                (k, e) for k, e in self._entries.items()
+                if e["language"] == language
+                and e["fingerprint"] == fingerprint
+                and e["embedding"] is not None
+                and not self._expired(e)
+            ]
+            embedding = await asyncio.to_thread(embed_texts, [normalized])
+            if embedding is not None:
+                context["embedding"] = embedding[0]
+                if candidates:
+                    matrix = np.stack([e["embedding"] for _, e in candidates])
+                    similarities = matrix @ embedding[0]
+                    best = int(similarities.argmax())
+                    if similarities[best] >= self.similarity_threshold:
+                        best_key, best_entry = candidates[best]
+                        self._entries.move_to_end(best_key)
+                        self._stats["semantic_hits"] += 1
+                        return best_entry["response"], context
+
+        self._stats["misses"] += 1
+        return None, context
+
+    def store(self, context: Dict[str, Any], response: str) -> None:
+        """
+        Cache a response under the key computed by lookup().
+
+        Args:
+            context: Lookup context returned by lookup()
+            response: Response to cache
+        """
+        self._entries[context["key"]] = {
+            "response": response,
+            "language": context["language"],
+            "fingerprint": context["fingerprint"],
+            "embedding": context["embedding"],
+            "expires_at": time.monotonic() + self.ttl_seconds,
+        }
+        self._entries.move_to_end(context["key"])
+        self._stats["stores"] += 1
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def record_bypass(self) -> None:
+        """Count a request that explicitly skipped the cache."""
+        self._stats["bypassed"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        lookups = self._stats["hits"] + self._stats["semantic_hits"] + self._stats["misses"]
+        hits = self._stats["hits"] + self._stats["semantic_hits"]
+        return {
+            **self._stats,
+            "size": len(self._entries),
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "semantic": embeddings_available,
+        }
+
+
+# Global response cache instance
+_response_cache = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get or create global response cache instance."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+            similarity_threshold=settings.RESPONSE_CACHE_SIMILARITY,
+            max_chars=settings.RESPONSE_CACHE_MAX_CHARS
+        )
+    return _response_cache
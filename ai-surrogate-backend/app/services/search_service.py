@@ -11,6 +11,7 @@ from typing import Dict, Any, List, Optional
 import httpx
 
 from app.config import settings
+from app.services.single_flight import fingerprint, search_flights
 
 logger = logging.getLogger(__name__)
 
@@ -62,6 +63,14 @@ class SearchService:
         # Limit results
         num_results = min(num_results, 20)
         
+        # Identical searches already in flight share one API call
+        return await search_flights.do(
+            fingerprint(" ".join(query.lower().split()), num_results),
+            lambda: self._search_providers(query, num_results)
+        )
+    
+    async def _search_providers(self, query: str, num_results: int) -> Dict[str, Any]:
+        """Query Brave first, then SerpAPI."""
         # Try Brave Search first
         if self.use_brave:
             result = await self._search_brave(query, num_results)
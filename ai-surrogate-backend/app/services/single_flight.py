@@ -0,0 +1,189 @@
+"""
+Single-Flight Request Coalescing
+
+When the mobile app retries or a user double-taps send, the same LLM
+generation or web search would otherwise run twice. A SingleFlight group
+runs one call per key; concurrent duplicates attach to the call already in
+flight and receive the same result (or the same stream, replayed from the
+start).
+"""
+
+import asyncio
+import hashlib
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable key for a request from its identifying parts."""
+    payload = "\x1f".join("" if part is None else str(part) for part in parts)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Broadcast:
+    """One upstream stream fanned out to every subscriber."""
+
+    def __init__(self, factory: Callable[[dict], AsyncIterator[str]]):
+        self.chunks: List[str] = []
+        self.usage: dict = {}
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self._changed = asyncio.Condition()
+        self.task = asyncio.create_task(self._pump(factory))
+
+    async def _pump(self, factory: Callable[[dict], AsyncIterator[str]]) -> None:
+        try:
+            async for chunk in factory(self.usage):
+                self.chunks.append(chunk)
+                async with self._changed:
+                    self._changed.notify_all()
+        except BaseException as e:
+            self.error = e
+        finally:
+            self.done = True
+            async with self._changed:
+                self._changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        """Replay chunks received so far, then follow the live stream."""
+        self.subscribers += 1
+        index = 0
+        try:
+            while True:
+                if index < len(self.chunks):
+                    yield self.chunks[index]
+                    index += 1
+                    continue
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                async with self._changed:
+                    await self._changed.wait_for(
+                        lambda: index < len(self.chunks) or self.done
+                    )
+        finally:
+            self.subscribers -= 1
+            # Nobody is listening any more: stop paying for the generation
+            if self.subscribers == 0 and not self.done:
+                self.task.cancel()
+
+
+class _Call:
+    """One in-flight call shared by its waiters."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls by key.
+    """
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: Group name used in logs and metrics
+        """
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+        self._streams: Dict[str, _Broadcast] = {}
+        self._stats = {"leaders": 0, "followers": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``fn`` once per key; concurrent callers share its result.
+
+        The call runs as its own task, so a caller that is cancelled does not
+        cancel it for the others. It is cancelled once every caller has gone.
+        """
+        call = self._calls.get(key)
+        if call is None:
+            self._stats["leaders"] += 1
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda t: self._finish_call(key, call))
+        else:
+            self._stats["followers"] += 1
+            logger.info(f"🔗 Coalesced duplicate {self.name} call")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            # Nobody is waiting any more: stop paying for the call
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def _finish_call(self, key: str, call: _Call) -> None:
+        task = call.task
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Mark the exception as retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    async def stream(
+        self,
+        key: str,
+        factory: Callable[[dict], AsyncIterator[str]],
+        usage: Optional[dict] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream from ``factory`` once per key; concurrent callers share the chunks.
+
+        Args:
+            key: Request fingerprint
+            factory: Called with a usage dict, returns the upstream async iterator
+            usage: Optional dict updated with the upstream's usage at the end
+
+        Yields:
+            Chunks from the shared stream
+        """
+        broadcast = self._streams.get(key)
+        if broadcast is None or broadcast.done:
+            self._stats["leaders"] += 1
+            broadcast = _Broadcast(factory)
+            self._streams[key] = broadcast
+            broadcast.task.add_done_callback(lambda _: self._finish_stream(key, broadcast))
+        else:
+            self._stats["followers"] += 1
+            if usage is not None:
+                usage["coalesced"] = True
+            logger.info(f"🔗 Attached to in-flight {self.name} stream")
+
+        async for chunk in broadcast.subscribe():
+            yield chunk
+
+        if usage is not None:
+            usage.update(broadcast.usage)
+
+    def _finish_stream(self, key: str, broadcast: _Broadcast) -> None:
+        if self._streams.get(key) is broadcast:
+            del self._streams[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Leader/follower counters and calls currently in flight."""
+        return {
+            **self._stats,
+            "in_flight": len(self._calls) + len(self._streams),
+        }
+
+
+# Shared groups
+llm_flights = SingleFlight("llm")
+search_flights = SingleFlight("search")
+
+
+def get_single_flight_stats() -> Dict[str, Dict[str, int]]:
+    """Stats for all single-flight groups."""
+    return {
+        "llm": llm_flights.stats(),
+        "search": search_flights.stats(),
+    }
@@ -0,0 +1,174 @@
+"""
+Conversation Summary Service
+
+Keeps an incremental rolling summary for each conversation so the prompt can
+carry "summary + last few turns" instead of raw history. The summary is
+refreshed in the background every SUMMARY_EVERY_N_TURNS turns, never on the
+request path.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Conversation, Message
+from app.services.history_cache import get_history_cache
+from app.services.llm_client import get_llm_client
+from app.services.llm_scheduler import BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+# Conversations with a summary refresh currently running
+_in_progress: set = set()
+
+
+def _load_pending(conversation_id: str) -> Optional[Dict]:
+    """
+    Load the summary state and the messages that should be folded into it.
+
+    Returns None when fewer than SUMMARY_EVERY_N_TURNS turns are waiting
+    beyond the recent messages kept verbatim.
+    """
+    db = SessionLocal()
+    try:
+        conversation = db.query(Conversation).filter(
+            Conversation.id == conversation_id
+        ).first()
+        if not conversation:
+            return None
+
+        query = db.query(Message).filter(Message.conversation_id == conversation_id)
+        if conversation.summarized_until is not None:
+            query = query.filter(Message.created_at > conversation.summarized_until)
+
+        unsummarized = query.with_entities(func.count(Message.id)).scalar() or 0
+        threshold = settings.SUMMARY_EVERY_N_TURNS * 2 + settings.SUMMARY_KEEP_RECENT_MESSAGES
+        if unsummarized < threshold:
+            return None
+
+        # Fold everything except the most recent messages, which stay verbatim
+        to_fold = (
+            query.order_by(Message.created_at.asc(), Message.id.asc())
+            .limit(unsummarized - settings.SUMMARY_KEEP_RECENT_MESSAGES)
+            .all()
+        )
+
+        return {
+            "summary": conversation.summary,
+            "messages": [
+                {"role": "user" if m.is_from_user else "assistant", "content": m.content}
+                for m in to_fold
+            ],
+            "summarized_until": to_fold[-1].created_at,
+        }
+    finally:
+        db.close()
+
+
+def _save_summary(conversation_id: str, summary: str, summarized_until) -> None:
+    """Persist the new summary and the point it covers."""
+    db = SessionLocal()
+    try:
+        # Keep updated_at: a background summary is not activity, and bumping it
+        # would reorder the conversation list and shift its keyset cursors
+        db.query(Conversation).filter(
+            Conversation.id == conversation_id
+        ).update(
+            {
+                "summary": summary,
+                "summarized_until": summarized_until,
+                "updated_at": Conversation.updated_at,
+            },
+            synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+async def generate_summary(previous_summary: Optional[str], messages: List[Dict]) -> str:
+    """
+    Fold new messages into an existing summary.
+
+    Args:
+        previous_summary: Current summary (None for the first one)
+        messages: Messages to fold in, chronological
+
+    Returns:
+        Updated summary text
+    """
+    transcript = "\n".join(
+        f"{'User' if m['role'] == 'user' else 'Assistant'}: {m['content']}"
+        for m in messages
+    )
+
+    prompt = f"""You maintain a running summary of a conversation between a user and an AI assistant.
+
+Current summary:
+{previous_summary or "(none yet)"}
+
+New messages:
+{transcript}
+
+Write the updated summary in under {settings.SUMMARY_MAX_WORDS} words. Keep facts about the user (name, preferences, situation, feelings), open questions and commitments. Write it in English, even if the conversation is in Urdu or Punjabi. Return ONLY the summary."""
+
+    return await get_llm_client().complete(
+        messages=[{"role": "user", "content": prompt}],
+        model=settings.MISTRAL_TITLE_MODEL,
+        temperature=0.3,
+        max_tokens=settings.SUMMARY_MAX_WORDS * 2,
+        timeout=settings.LLM_TIMEOUT_SECONDS,
+        priority=BACKGROUND
+    )
+
+
+async def refresh_conversation_summary(conversation_id: str) -> None:
+    """
+    Update the rolling summary if enough new turns have accumulated.
+
+    Runs as a background task with its own database sessions.
+    """
+    if conversation_id in _in_progress:
+        return
+    _in_progress.add(conversation_id)
+
+    try:
+        pending = await asyncio.to_thread(_load_pending, conversation_id)
+        if not pending:
+            return
+
+        summary = await generate_summary(pending["summary"], pending["messages"])
+        if not summary.strip():
+            logger.warning(f"⚠️ Empty summary for conversation {conversation_id}, keeping previous one")
+            return
+
+        await asyncio.to_thread(
+            _save_summary, conversation_id, summary.strip(), pending["summarized_until"]
+        )
+        if settings.HISTORY_CACHE_ENABLED:
+            await get_history_cache().update_summary(
+                conversation_id, summary.strip(), pending["summarized_until"]
+            )
+        logger.info(f"📝 Summarized {len(pending['messages'])} messages for conversation {conversation_id}")
+
+    except Exception as e:
+        logger.error(f"❌ Summary refresh failed for conversation {conversation_id}: {e}")
+        # Don't raise - this is a background task
+    finally:
+        _in_progress.discard(conversation_id)
+
+
+def trigger_summary_refresh(conversation_id: str) -> None:
+    """
+    Schedule a rolling summary refresh in the background (non-blocking).
+
+    Args:
+        conversation_id: Conversation ID
+    """
+    if not settings.SUMMARY_ENABLED:
+        return
+    asyncio.create_task(refresh_conversation_summary(str(conversation_id)))
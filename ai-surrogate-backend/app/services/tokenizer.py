@@ -0,0 +1,90 @@
+"""
+Tokenizer Service
+
+Counts tokens the way Mistral does, using the official Tekken tokenizer from
+mistral-common. The old ``len(text) // 4`` rule undercounts Urdu and Punjabi
+script by 2-4x, so prompts built on it could overflow the budget.
+
+If mistral-common is not installed, a script-aware estimate is used instead.
+"""
+
+import logging
+import re
+from functools import lru_cache
+from typing import List
+
+try:
+    from mistral_common.tokens.tokenizers.mistral import MistralTokenizer
+    mistral_tokenizer_available = True
+except ImportError:
+    MistralTokenizer = None
+    mistral_tokenizer_available = False
+
+logger = logging.getLogger(__name__)
+
+# Non-Latin scripts we serve (Arabic/Urdu, Gurmukhi, Devanagari) tokenize far
+# denser than English
+_NON_LATIN_RE = re.compile(r'[\u0600-\u06FF\u0750-\u077F\uFB50-\uFDFF\uFE70-\uFEFF\u0A00-\u0A7F\u0900-\u097F]')
+
+_tokenizer = None
+
+
+def _get_tokenizer():
+    """Load the Tekken tokenizer once (None if unavailable)."""
+    global _tokenizer
+    if _tokenizer is None and mistral_tokenizer_available:
+        try:
+            _tokenizer = MistralTokenizer.v3(is_tekken=True).instruct_tokenizer.tokenizer
+            logger.info("✅ Mistral Tekken tokenizer loaded")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load Mistral tokenizer, using estimate: {e}")
+    return _tokenizer
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Script-aware token estimate used when the real tokenizer is unavailable.
+
+    Latin text averages ~4 characters per token; Urdu/Punjabi/Hindi script
+    averages ~2.
+    """
+    if not text:
+        return 0
+    non_latin = len(_NON_LATIN_RE.findall(text))
+    latin = len(text) - non_latin
+    return latin // 4 + non_latin // 2 + 1
+
+
+@lru_cache(maxsize=1024)
+def _count_cached(text: str) -> int:
+    """Count tokens for short, frequently repeated strings (prompts, greetings)."""
+    return _count(text)
+
+
+def _count(text: str) -> int:
+    tokenizer = _get_tokenizer()
+    if tokenizer is None:
+        return estimate_tokens(text)
+    return len(tokenizer.encode(text, bos=False, eos=False))
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens in text.
+
+    Args:
+        text: Text to count tokens for
+
+    Returns:
+        Token count
+    """
+    if not text:
+        return 0
+    if len(text) <= 512:
+        return _count_cached(text)
+    return _count(text)
+
+
+def count_tokens_batch(texts: List[str]) -> List[int]:
+    """Count tokens for several texts."""
+    return [count_tokens(text) for text in texts]
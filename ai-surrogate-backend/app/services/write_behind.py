@@ -0,0 +1,193 @@
+"""
+Write-Behind Buffer - Batched inserts for non-critical rows
+
+Emotion history and LLM usage rows are telemetry: a chat turn should not
+wait for them. Callers ``add`` rows here and return immediately; a
+background task writes them with one multi-row INSERT per table whenever a
+table has WRITE_BEHIND_FLUSH_ROWS rows waiting or WRITE_BEHIND_FLUSH_INTERVAL_MS
+has passed. Pending rows are flushed on application shutdown.
+
+Rows live in process memory until flushed, so a hard crash can lose up to
+one interval's worth. If a batch fails (e.g. its conversation was deleted
+meanwhile) the rows are retried one by one and only the failing rows are
+dropped.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional, Type
+
+from sqlalchemy import insert
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """
+    Collects rows per model and bulk-inserts them in the background.
+    """
+
+    def __init__(
+        self,
+        flush_rows: int = 100,
+        flush_interval_ms: float = 500,
+        max_rows: int = 10000,
+        session_factory=AsyncSessionLocal
+    ):
+        """
+        Args:
+            flush_rows: Rows waiting in one table that trigger an early flush
+            flush_interval_ms: Maximum time a row waits before being written
+            max_rows: Rows held in memory before new rows are dropped
+            session_factory: Async session factory used for flushes
+        """
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_rows = max_rows
+        self._session_factory = session_factory
+        self._pending: Dict[Type, List[Dict]] = {}
+        self._pending_count = 0
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._closed = False
+        self._stats = {"added": 0, "written": 0, "dropped": 0, "flushes": 0, "failed_batches": 0}
+
+    def add(self, model: Type, row: Dict) -> bool:
+        """
+        Queue one row for insertion into ``model``'s table.
+
+        Must be called from the event loop. Never blocks and never raises.
+
+        Args:
+            model: ORM model class (e.g. EmotionHistory)
+            row: Column values; Python-side column defaults apply on insert
+
+        Returns:
+            True if queued, False if the buffer is full or closed
+        """
+        if self._closed or self._pending_count >= self.max_rows:
+            self._stats["dropped"] += 1
+            logger.warning(f"⚠️ Write-behind buffer full, dropped {model.__tablename__} row")
+            return False
+
+        rows = self._pending.setdefault(model, [])
+        rows.append(row)
+        self._pending_count += 1
+        self._stats["added"] += 1
+
+        self._ensure_started()
+        if len(rows) >= self.flush_rows:
+            self._wake.set()
+        return True
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        """Flush whenever a table fills up or the interval elapses."""
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"❌ Write-behind flush failed: {e}")
+
+    async def flush(self) -> int:
+        """
+        Write every pending row now.
+
+        Returns:
+            Number of rows written
+        """
+        if not self._pending_count:
+            return 0
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            self._pending_count = 0
+
+            written = 0
+            for model, rows in pending.items():
+                written += await self._insert(model, rows)
+            self._stats["flushes"] += 1
+            self._stats["written"] += written
+            return written
+
+    async def _insert(self, model: Type, rows: List[Dict]) -> int:
+        """One multi-row INSERT; row by row if the batch is rejected."""
+        async with self._session_factory() as db:
+            try:
+                await db.execute(insert(model), rows)
+                await db.commit()
+                return len(rows)
+            except Exception as e:
+                await db.rollback()
+                self._stats["failed_batches"] += 1
+                logger.warning(f"⚠️ Batch insert into {model.__tablename__} failed ({e}), retrying row by row")
+
+            written = 0
+            for row in rows:
+                try:
+                    await db.execute(insert(model), [row])
+                    await db.commit()
+                    written += 1
+                except Exception as e:
+                    await db.rollback()
+                    self._stats["dropped"] += 1
+                    logger.error(f"❌ Dropped {model.__tablename__} row: {e}")
+            return written
+
+    async def close(self) -> None:
+        """Stop the background task and flush everything still pending."""
+        self._closed = True
+        if self._task is not None:
+            self._wake.set()
+            try:
+                await self._task
+            except Exception as e:
+                logger.error(f"❌ Write-behind task failed: {e}")
+            self._task = None
+        written = await self.flush()
+        if written:
+            logger.info(f"💾 Write-behind buffer flushed {written} rows on shutdown")
+
+    def stats(self) -> Dict:
+        """Counters plus rows currently waiting."""
+        return {**self._stats, "pending": self._pending_count}
+
+
+# Global write-behind buffer instance
+_write_behind = None
+
+
+def get_write_behind() -> WriteBehindBuffer:
+    """Get or create global write-behind buffer instance."""
+    global _write_behind
+    if _write_behind is None:
+        _write_behind = WriteBehindBuffer(
+            flush_rows=settings.WRITE_BEHIND_FLUSH_ROWS,
+            flush_interval_ms=settings.WRITE_BEHIND_FLUSH_INTERVAL_MS,
+            max_rows=settings.WRITE_BEHIND_MAX_ROWS
+        )
+    return _write_behind
+
+
+async def close_write_behind() -> None:
+    """Flush and stop the global buffer (called on application shutdown)."""
+    global _write_behind
+    if _write_behind is not None:
+        await _write_behind.close()
+        _write_behind = None
@@ -0,0 +1,156 @@
+"""
+Emotion Backfill - Standalone Script
+
+Re-analyses chat history with the local emotion classifier
+(app/services/emotion_classifier.py) instead of the LLM:
+
+- streams messages with a server-side cursor, conversation by conversation
+- pairs each user message with the AI reply that followed it
+- scores emotion + intensity a batch at a time
+- bulk-upserts into emotion_history on message_id (source = 'local')
+
+Rows tagged live by the model (source = 'llm') are kept unless --replace-llm
+is given. Insights and mood summaries read emotion_history directly, so they
+reflect the new scores as soon as the script finishes.
+
+Run from the backend directory:
+    python backfill_emotions.py --days 180 --batch-size 1000
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database import SessionLocal
+from app.models import EmotionHistory, Message
+from app.services.emotion_classifier import get_emotion_classifier
+
+
+def iter_turns(db, batch_size: int, since=None, user_id=None):
+    """
+    Yield (user message, AI reply) pairs, streaming rows from the database.
+
+    Rows come ordered by conversation and time through a server-side cursor,
+    so memory stays flat however much history there is.
+    """
+    stmt = select(
+        Message.id,
+        Message.user_id,
+        Message.conversation_id,
+        Message.content,
+        Message.is_from_user,
+    ).order_by(Message.conversation_id, Message.created_at)
+    if since:
+        stmt = stmt.where(Message.created_at >= since)
+    if user_id:
+        stmt = stmt.where(Message.user_id == user_id)
+
+    result = db.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    pending_user = None
+    for row in result:
+        if row.is_from_user:
+            pending_user = row
+        elif pending_user is not None and pending_user.conversation_id == row.conversation_id:
+            yield pending_user, row
+            pending_user = None
+
+
+def upsert_batch(db, turns: List, replace_llm: bool) -> int:
+    """Score a batch of turns and upsert the results into emotion_history."""
+    classifier = get_emotion_classifier()
+    scores = classifier.classify_batch([user_row.content for user_row, _ in turns])
+    now = datetime.utcnow()
+
+    rows: List[Dict] = []
+    for (user_row, ai_row), score in zip(turns, scores):
+        rows.append({
+            "user_id": user_row.user_id,
+            "conversation_id": ai_row.conversation_id,
+            "message_id": ai_row.id,
+            "emotion": score["emotion"],
+            "confidence": score["confidence"],
+            "intensity": score["intensity"],
+            "source": "local",
+            "detected_at": now,
+        })
+
+    stmt = insert(EmotionHistory).values(rows)
+    update_where = None if replace_llm else EmotionHistory.source != "llm"
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[EmotionHistory.message_id],
+        set_={
+            "emotion": stmt.excluded.emotion,
+            "confidence": stmt.excluded.confidence,
+            "intensity": stmt.excluded.intensity,
+            "source": stmt.excluded.source,
+            "detected_at": stmt.excluded.detected_at,
+        },
+        where=update_where,
+    )
+    db.execute(stmt)
+    return len(rows)
+
+
+def _flush(db, batch: List, args) -> int:
+    """Score one batch, then write and commit it unless this is a dry run."""
+    if args.dry_run:
+        get_emotion_classifier().classify_batch([user_row.content for user_row, _ in batch])
+        count = len(batch)
+    else:
+        count = upsert_batch(db, batch, args.replace_llm)
+        db.commit()
+    print(f"📦 {count} turns processed")
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill emotion_history with the local classifier")
+    parser.add_argument("--days", type=int, default=None, help="Only messages from the last N days")
+    parser.add_argument("--user-id", default=None, help="Only this user's messages")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Turns scored and upserted per batch")
+    parser.add_argument("--replace-llm", action="store_true", help="Also overwrite rows tagged live by the model")
+    parser.add_argument("--dry-run", action="store_true", help="Score but do not write")
+    args = parser.parse_args()
+
+    since = datetime.utcnow() - timedelta(days=args.days) if args.days else None
+
+    print(f"\n{'='*70}")
+    print("🧠 EMOTION BACKFILL (local classifier)")
+    print(f"{'='*70}")
+
+    classifier = get_emotion_classifier()
+    if not classifier.fit():
+        print("⚠️ sentence-transformers not available: scoring with the keyword lexicon only")
+
+    # Separate sessions: one streams rows, the other writes batches,
+    # so committing a batch does not close the open cursor
+    read_db = SessionLocal()
+    write_db = SessionLocal()
+    started_at = time.perf_counter()
+    total = 0
+    try:
+        batch = []
+        for turn in iter_turns(read_db, args.batch_size, since, args.user_id):
+            batch.append(turn)
+            if len(batch) >= args.batch_size:
+                total += _flush(write_db, batch, args)
+                batch = []
+        if batch:
+            total += _flush(write_db, batch, args)
+    finally:
+        read_db.close()
+        write_db.close()
+
+    elapsed = time.perf_counter() - started_at
+    rate = total / elapsed if elapsed > 0 else 0
+    action = "scored (dry run)" if args.dry_run else "upserted"
+    print(f"\n✅ {total} turns {action} in {elapsed:.1f}s ({rate:.0f} turns/s)")
+    print(f"{'='*70}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Tests for streaming EMOTION tag stripping.
+"""
+
+import pytest
+
+from app.services.emotion_service import EmotionTagStripper, extract_emotion_from_response
+
+RESPONSE = "I'm sorry you're feeling down. I'm here for you. 💙\n\nEMOTION: sad"
+
+
+def _stream(chunks):
+    stripper = EmotionTagStripper()
+    sent = [stripper.feed(chunk) for chunk in chunks]
+    sent.append(stripper.finish())
+    return stripper, "".join(sent)
+
+
+@pytest.mark.parametrize("split", range(len(RESPONSE) + 1))
+def test_tag_split_at_every_boundary_is_stripped(split):
+    stripper, sent = _stream([RESPONSE[:split], RESPONSE[split:]])
+
+    assert "EMOTION" not in sent
+    assert sent.strip() == "I'm sorry you're feeling down. I'm here for you. 💙"
+    assert stripper.emotion == "sad"
+
+
+def test_character_by_character_stream_matches_batch_extraction():
+    stripper, sent = _stream(list(RESPONSE))
+
+    clean, emotion_data = extract_emotion_from_response("I feel low", RESPONSE)
+    assert stripper.clean_response == clean
+    assert "EMOTION" not in sent
+    assert stripper.emotion_data("I feel low")["emotion"] == emotion_data["emotion"] == "sad"
+
+
+def test_tag_text_mid_response_is_kept():
+    response = "You wrote emotion: happy in your diary, that's lovely!\nEMOTION: grateful"
+    stripper, sent = _stream([response[i:i + 3] for i in range(0, len(response), 3)])
+
+    assert sent.strip() == "You wrote emotion: happy in your diary, that's lovely!"
+    assert stripper.emotion == "grateful"
+
+
+def test_untagged_response_is_released_whole():
+    response = "Sure, here is the answer. Emotional support matters."
+    stripper, sent = _stream([response[:20], response[20:]])
+
+    assert sent == response
+    assert stripper.emotion is None
+    assert stripper.emotion_data("hi")["emotion"] == "neutral"
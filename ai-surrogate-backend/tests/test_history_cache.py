@@ -0,0 +1,89 @@
+"""
+Tests for the history cache's load/append interleaving.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services import history_cache
+from app.services.history_cache import HistoryCache
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def _message(cache: HistoryCache, content: str, minutes: int):
+    return cache.message_entry("user", content, None, T0 + timedelta(minutes=minutes))
+
+
+async def _interleave_load_and_append(cache: HistoryCache, other: HistoryCache):
+    """Worker A loads from the database while worker B appends a new message."""
+    assert await cache.get("c1") is None
+    token = await cache.begin_load("c1")
+    snapshot = [_message(cache, "old", 0)]  # what A read from the database
+
+    # B commits a message and appends it; nothing is cached yet
+    await other.append("c1", _message(other, "new", 1))
+
+    stored = await cache.store("c1", None, None, snapshot, token)
+    return stored
+
+
+def test_append_during_load_discards_stale_snapshot():
+    cache = HistoryCache(max_messages=10)
+
+    stored = asyncio.run(_interleave_load_and_append(cache, cache))
+
+    assert stored is False
+    assert cache.stats()["stale_stores"] == 1
+    assert asyncio.run(cache.get("c1")) is None
+
+
+def test_store_without_interleaving_is_cached():
+    cache = HistoryCache(max_messages=10)
+
+    async def run():
+        token = await cache.begin_load("c1")
+        assert await cache.store("c1", "summary", None, [_message(cache, "old", 0)], token)
+        await cache.append("c1", _message(cache, "new", 1))
+        return await cache.get("c1")
+
+    entry = asyncio.run(run())
+
+    assert [m["content"] for m in entry["messages"]] == ["old", "new"]
+    assert entry["summary"] == "summary"
+
+
+def test_append_during_load_on_another_worker_discards_stale_snapshot():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+
+    async def run():
+        server = fakeredis.FakeServer()
+        workers = []
+        for _ in range(2):
+            worker = HistoryCache(max_messages=10)
+            worker._redis = fakeredis.aioredis.FakeRedis(server=server)
+            worker._store_script = worker._redis.register_script(history_cache._STORE_SCRIPT)
+            worker._append_script = worker._redis.register_script(history_cache._APPEND_SCRIPT)
+            worker._summary_script = worker._redis.register_script(history_cache._SUMMARY_SCRIPT)
+            workers.append(worker)
+        worker_a, worker_b = workers
+
+        stored = await _interleave_load_and_append(worker_a, worker_b)
+        assert stored is False
+        assert await worker_a.get("c1") is None
+        assert await worker_b.get("c1") is None
+
+        # The next load sees B's message and is kept
+        token = await worker_a.begin_load("c1")
+        fresh = [_message(worker_a, "old", 0), _message(worker_a, "new", 1)]
+        assert await worker_a.store("c1", None, None, fresh, token)
+        entry = await worker_b.get("c1")
+        assert [m["content"] for m in entry["messages"]] == ["old", "new"]
+
+        for worker in workers:
+            await worker.aclose()
+
+    asyncio.run(run())
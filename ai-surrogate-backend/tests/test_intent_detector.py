@@ -0,0 +1,31 @@
+"""
+Tests for the keyword intent matcher.
+"""
+
+import pytest
+
+from app.services.intent_detector import match_keyword_groups
+
+
+@pytest.mark.parametrize("message, group", [
+    ("is it scheduled?", "calendar"),
+    ("I reserved a table for two", "calendar"),
+    ("show my reminders", "calendar"),
+    ("scheduling a call tomorrow", "calendar"),
+    ("we booked the hall", "calendar"),
+    ("any meetings today?", "calendar"),
+    ("I googled it already", "search"),
+    ("searching for flights", "search"),
+    ("hello there", "smalltalk"),
+])
+def test_keywords_and_inflections_match(message, group):
+    assert group in match_keyword_groups(message)
+
+
+@pytest.mark.parametrize("message", [
+    "I saw it on facebook",
+    "how to prevent this",
+    "his car broke down",
+])
+def test_keywords_match_whole_words_only(message):
+    assert not match_keyword_groups(message) - {"question"}
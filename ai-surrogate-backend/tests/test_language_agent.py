@@ -0,0 +1,33 @@
+"""
+Tests for local language detection.
+"""
+
+from app.services.language_agent import (
+    AMBIGUITY_THRESHOLD,
+    ENGLISH,
+    OTHER,
+    URDU,
+    detect_language_local,
+)
+
+
+def test_english_sentence():
+    language, confidence = detect_language_local("I am feeling really tired today, can you help me?")
+    assert language == ENGLISH
+    assert confidence >= AMBIGUITY_THRESHOLD
+
+
+def test_roman_urdu_sentence():
+    language, confidence = detect_language_local("aap kaise ho? mujhe aaj bohat pareshani hai")
+    assert language == URDU
+    assert confidence >= AMBIGUITY_THRESHOLD
+
+
+def test_other_latin_languages_are_not_english():
+    for message in (
+        "Je suis très fatigué et il a dit que je ne peux pas venir demain",
+        "Hola, me gustaría saber cómo está el tiempo hoy en Madrid",
+        "Ich habe heute keine Zeit, aber morgen vielleicht",
+    ):
+        language, confidence = detect_language_local(message)
+        assert language == OTHER or confidence < AMBIGUITY_THRESHOLD, message
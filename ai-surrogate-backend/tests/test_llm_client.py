@@ -0,0 +1,136 @@
+"""
+Tests for the LLM client's deadline and circuit breaker handling.
+"""
+
+import asyncio
+import time
+
+from app.config import settings
+from app.services.llm_client import LLMClient
+from app.services.llm_resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def _client(monkeypatch, fallbacks: str) -> LLMClient:
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "fake")
+    monkeypatch.setattr(settings, "LLM_FALLBACK_MODELS", fallbacks)
+    monkeypatch.setattr(settings, "LLM_HEDGE_ENABLED", False)
+    return LLMClient()
+
+
+def test_spent_deadline_leaves_fallback_breakers_closed(monkeypatch):
+    client = _client(monkeypatch, "fallback-a,fallback-b")
+    called = []
+
+    async def slow_complete_once(model, messages, temperature, max_tokens, usage):
+        called.append(model)
+        await asyncio.sleep(1)
+        return "too late"
+
+    monkeypatch.setattr(client, "_complete_once", slow_complete_once)
+
+    async def run():
+        try:
+            await client._complete([], "primary", 0.7, 10, timeout=0.05, usage=None)
+        except asyncio.TimeoutError:
+            pass
+        else:
+            raise AssertionError("expected the deadline to expire")
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+
+    # The primary was sent and timed out; the fallbacks were never sent
+    assert called == ["primary"]
+    assert client._breaker("primary").failures == 1
+    for fallback in ("fallback-a", "fallback-b"):
+        assert client._breaker(fallback).state == CLOSED
+        assert client._breaker(fallback).failures == 0
+
+
+def test_spent_deadline_releases_half_open_trial(monkeypatch):
+    client = _client(monkeypatch, "")
+    breaker = client._breaker("primary")
+    breaker.state = HALF_OPEN
+
+    async def run():
+        loop_time = asyncio.get_running_loop().time()
+        assert breaker.allow()
+        try:
+            client._start_attempt(breaker, deadline=loop_time - 1)
+        except asyncio.TimeoutError:
+            pass
+        await client.aclose()
+
+    asyncio.run(run())
+
+    # Nothing was recorded and the next caller may run the trial
+    assert breaker.failures == 0
+    assert breaker.allow()
+
+
+def _half_open(breaker) -> None:
+    breaker.state = OPEN
+    breaker.opened_at = time.monotonic() - breaker.reset_seconds
+
+
+def test_cancelled_half_open_trial_is_released(monkeypatch):
+    client = _client(monkeypatch, "")
+    breaker = client._breaker("primary")
+    _half_open(breaker)
+
+    async def run():
+        sent = asyncio.Event()
+
+        async def slow_complete_once(model, messages, temperature, max_tokens, usage):
+            sent.set()
+            await asyncio.sleep(10)
+
+        monkeypatch.setattr(client, "_complete_once", slow_complete_once)
+        call = asyncio.create_task(client._complete([], "primary", 0.7, 10, timeout=5, usage=None))
+        await sent.wait()
+        assert not breaker.allow()  # the trial is in flight
+        call.cancel()
+        try:
+            await call
+        except asyncio.CancelledError:
+            pass
+        await client.aclose()
+
+    asyncio.run(run())
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_cancelled_half_open_stream_trial_is_released(monkeypatch):
+    client = _client(monkeypatch, "")
+    breaker = client._breaker("primary")
+    _half_open(breaker)
+
+    async def run():
+        async def stream_once(model, messages, temperature, max_tokens, usage):
+            yield "first"
+            await asyncio.sleep(10)
+            yield "never"
+
+        monkeypatch.setattr(client, "_stream_once", stream_once)
+        deltas = client._stream([], "primary", 0.7, 10, timeout=5, usage=None)
+        assert await deltas.__anext__() == "first"
+        await deltas.aclose()  # client disconnected mid-stream
+        await client.aclose()
+
+    asyncio.run(run())
+
+    assert breaker.allow()
+
+
+def test_lost_half_open_trial_expires():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30, trial_timeout=0.01)
+    breaker.record_failure()
+    breaker.opened_at -= 30
+
+    assert breaker.allow()
+    assert not breaker.allow()
+    time.sleep(0.02)
+    assert breaker.allow()
@@ -0,0 +1,121 @@
+"""
+Tests for LLM admission: global cap, priorities and per-user rate limits.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.llm_scheduler import BACKGROUND, INTERACTIVE, LLMRateLimitError, LLMScheduler
+
+
+async def _hold(scheduler: LLMScheduler, release: asyncio.Event, admitted: list, name: str,
+                user_id=None, priority=INTERACTIVE) -> None:
+    async with scheduler.slot(user_id, priority):
+        admitted.append(name)
+        await release.wait()
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_cancelled_queued_waiter_releases_its_slot():
+    async def run():
+        scheduler = LLMScheduler(max_concurrency=1, max_wait_seconds=5)
+        release = asyncio.Event()
+        admitted = []
+
+        holder = asyncio.create_task(_hold(scheduler, release, admitted, "holder"))
+        await _settle()
+        queued = asyncio.create_task(_hold(scheduler, asyncio.Event(), admitted, "queued"))
+        await _settle()
+        assert scheduler.stats()["queue_depth"]["interactive"] == 1
+
+        queued.cancel()
+        await _settle()
+        release.set()
+        await holder
+
+        assert admitted == ["holder"]
+        assert scheduler.stats()["in_flight"] == 0
+        # The slot is free again: the next call is admitted at once
+        async with scheduler.slot():
+            assert scheduler.stats()["in_flight"] == 1
+        assert scheduler.stats()["in_flight"] == 0
+
+    asyncio.run(run())
+
+
+def test_interactive_is_admitted_before_background():
+    async def run():
+        scheduler = LLMScheduler(max_concurrency=1, max_wait_seconds=5)
+        release = asyncio.Event()
+        admitted = []
+
+        holder = asyncio.create_task(_hold(scheduler, release, admitted, "holder"))
+        await _settle()
+        waiters = [
+            asyncio.create_task(_hold(scheduler, release, admitted, "background", priority=BACKGROUND)),
+            asyncio.create_task(_hold(scheduler, release, admitted, "interactive", priority=INTERACTIVE)),
+        ]
+        await _settle()
+
+        release.set()
+        await asyncio.gather(holder, *waiters)
+        assert admitted == ["holder", "interactive", "background"]
+
+    asyncio.run(run())
+
+
+def test_user_burst_is_rate_limited_without_starving_others():
+    async def run():
+        scheduler = LLMScheduler(
+            max_concurrency=10, user_rate_per_minute=60, user_burst=2, max_wait_seconds=0.1
+        )
+
+        # The burst is admitted, the call after it would wait ~1s and fails fast
+        for _ in range(2):
+            async with scheduler.slot("noisy"):
+                pass
+        with pytest.raises(LLMRateLimitError):
+            async with scheduler.slot("noisy"):
+                pass
+
+        # Other users are unaffected
+        for user_id in ("quiet-1", "quiet-2"):
+            async with scheduler.slot(user_id):
+                pass
+
+        stats = scheduler.stats()
+        assert stats["admitted"] == 4
+        assert stats["rejected"] == 1
+        assert stats["in_flight"] == 0
+
+    asyncio.run(run())
+
+
+def test_users_with_fewer_calls_in_flight_go_first():
+    async def run():
+        scheduler = LLMScheduler(max_concurrency=2, max_wait_seconds=5)
+        release = asyncio.Event()
+        admitted = []
+
+        # One user holds both slots
+        holders = [
+            asyncio.create_task(_hold(scheduler, release, admitted, f"busy-{i}", user_id="busy"))
+            for i in range(2)
+        ]
+        await _settle()
+        waiters = [
+            asyncio.create_task(_hold(scheduler, release, admitted, "busy-2", user_id="busy")),
+            asyncio.create_task(_hold(scheduler, release, admitted, "other", user_id="other")),
+        ]
+        await _settle()
+
+        release.set()
+        await asyncio.gather(*holders, *waiters)
+        assert admitted.index("other") < admitted.index("busy-2")
+
+    asyncio.run(run())
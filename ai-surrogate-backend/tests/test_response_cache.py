@@ -0,0 +1,68 @@
+"""
+Tests for response cache eligibility.
+
+Cached replies are shared across users, so only short, impersonal small talk
+may be stored or served.
+"""
+
+import asyncio
+
+from app.services.orchestrator import ChatOrchestrator
+from app.services.response_cache import ResponseCache
+
+LONG_OPENER = (
+    "my name is Ali and my wife passed away last month, "
+    "I don't know how to tell our kids"
+)
+
+
+def _orchestrator(cache: ResponseCache) -> ChatOrchestrator:
+    orchestrator = ChatOrchestrator.__new__(ChatOrchestrator)
+    orchestrator.response_cache = cache
+    return orchestrator
+
+
+def _first_turn(message: str) -> dict:
+    return {"history": [], "summary": None, "prompt": message, "preferences": None}
+
+
+def _lookup(orchestrator: ChatOrchestrator, message: str):
+    return asyncio.run(
+        orchestrator._lookup_cached_response(message, _first_turn(message), use_cache=True)
+    )
+
+
+def test_small_talk_is_cacheable(monkeypatch):
+    monkeypatch.setattr("app.config.settings.RESPONSE_CACHE_ENABLED", True)
+    orchestrator = _orchestrator(ResponseCache())
+
+    cached, context = _lookup(orchestrator, "Hi!!")
+    assert cached is None and context is not None
+    orchestrator.response_cache.store(context, "Hello! How can I help?")
+
+    cached, _ = _lookup(orchestrator, "hi")
+    assert cached == "Hello! How can I help?"
+
+
+def test_long_first_message_is_neither_stored_nor_served(monkeypatch):
+    monkeypatch.setattr("app.config.settings.RESPONSE_CACHE_ENABLED", True)
+    cache = ResponseCache()
+    orchestrator = _orchestrator(cache)
+
+    # Not stored: no cache context comes back for the caller to store under
+    cached, context = _lookup(orchestrator, LONG_OPENER)
+    assert cached is None and context is None
+
+    # Not served: even a reply already cached under its key is not returned
+    _, planted = asyncio.run(cache.lookup(LONG_OPENER, language="en", fingerprint="default"))
+    cache.store(planted, "I'm so sorry for your loss, Ali.")
+    cached, context = _lookup(orchestrator, LONG_OPENER)
+    assert cached is None and context is None
+
+
+def test_personal_or_non_small_talk_messages_are_not_cacheable():
+    cache = ResponseCache()
+    for message in ("hi, my name is Ali", "hi I'm feeling sad", "mujhe madad chahiye", "book a table"):
+        assert not cache.cacheable(message), message
+    for message in ("hello", "how are you?", "kaise ho", "thanks!"):
+        assert cache.cacheable(message), message
@@ -0,0 +1,53 @@
+"""
+Tests for single-flight coalescing of awaited calls.
+"""
+
+import asyncio
+
+from app.services.single_flight import SingleFlight
+
+
+def test_cancelling_one_caller_keeps_the_shared_call():
+    flights = SingleFlight("test")
+
+    async def run():
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 42
+
+        first = asyncio.create_task(flights.do("k", work))
+        second = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, len(calls)
+
+    assert asyncio.run(run()) == (42, 1)
+
+
+def test_call_is_cancelled_when_its_last_caller_leaves():
+    flights = SingleFlight("test")
+
+    async def run():
+        upstream = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def work():
+            upstream.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        callers = [asyncio.create_task(flights.do("k", work)) for _ in range(2)]
+        await upstream.wait()
+        for caller in callers:
+            caller.cancel()
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        await asyncio.sleep(0)
+        return flights.stats()["in_flight"]
+
+    assert asyncio.run(run()) == 0